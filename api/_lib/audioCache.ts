@@ -0,0 +1,93 @@
+import crypto from 'crypto'
+
+// LRU cache for synthesized audio, bounded by total bytes rather than entry
+// count, with coalescing: concurrent loads of one key share a single upstream
+// call. Lives at module scope, so it is per warm serverless instance.
+
+export type CacheSource = 'hit' | 'miss' | 'coalesced'
+
+export interface AudioCacheStats {
+  hits: number
+  misses: number
+  coalesced: number
+  evictions: number
+  entries: number
+  bytes: number
+  maxBytes: number
+}
+
+export function audioCacheKey(text: string, voiceId: string, format: string): string {
+  const normalized = text.normalize('NFC').trim().replace(/\s+/g, ' ')
+  return crypto
+    .createHash('sha256')
+    .update(`${voiceId}\n${format.toLowerCase()}\n${normalized}`)
+    .digest('hex')
+}
+
+export class AudioCache {
+  private entries = new Map<string, Buffer>()
+  private inflight = new Map<string, Promise<Buffer>>()
+  private bytes = 0
+  private counters = { hits: 0, misses: 0, coalesced: 0, evictions: 0 }
+
+  constructor(private maxBytes: number, private maxEntryBytes = Math.floor(maxBytes / 4)) {}
+
+  get(key: string): Buffer | undefined {
+    const audio = this.entries.get(key)
+    if (audio) {
+      // Map keeps insertion order; re-inserting marks the entry most recently used
+      this.entries.delete(key)
+      this.entries.set(key, audio)
+    }
+    return audio
+  }
+
+  set(key: string, audio: Buffer) {
+    if (audio.byteLength === 0 || audio.byteLength > this.maxEntryBytes) return
+    const previous = this.entries.get(key)
+    if (previous) {
+      this.entries.delete(key)
+      this.bytes -= previous.byteLength
+    }
+    this.entries.set(key, audio)
+    this.bytes += audio.byteLength
+
+    for (const [oldest, evicted] of this.entries) {
+      if (this.bytes <= this.maxBytes) break
+      this.entries.delete(oldest)
+      this.bytes -= evicted.byteLength
+      this.counters.evictions++
+    }
+  }
+
+  // Returns cached audio, joins an in-flight load of the same key, or runs
+  // `load` and caches its result. A failed load is not cached.
+  async load(key: string, load: () => Promise<Buffer>): Promise<{ audio: Buffer; source: CacheSource }> {
+    const cached = this.get(key)
+    if (cached) {
+      this.counters.hits++
+      return { audio: cached, source: 'hit' }
+    }
+
+    const pending = this.inflight.get(key)
+    if (pending) {
+      this.counters.coalesced++
+      return { audio: await pending, source: 'coalesced' }
+    }
+
+    this.counters.misses++
+    const promise = load()
+    this.inflight.set(key, promise)
+    try {
+      const audio = await promise
+      this.set(key, audio)
+      return { audio, source: 'miss' }
+    } finally {
+      this.inflight.delete(key)
+    }
+  }
+
+  stats(): AudioCacheStats {
+    return { ...this.counters, entries: this.entries.size, bytes: this.bytes, maxBytes: this.maxBytes }
+  }
+}
@@ -0,0 +1,142 @@
+import { upstreamFetch } from './upstream'
+
+// Buffers accepted events and forwards them to n8n in bulk, as
+// { type: 'batch', events } (the workflow's "Code: Unbatch Events" node fans
+// them back out). Events from concurrent requests on a warm instance share
+// upstream calls. The queue is bounded: when n8n falls behind, enqueue
+// refuses new events and the caller answers 503 so clients back off.
+
+export interface EventForwarderOptions {
+  maxBatch: number
+  maxQueue: number
+  lingerMs: number
+  maxAttempts: number
+  backoffMs: number
+}
+
+const DEFAULT_OPTIONS: EventForwarderOptions = {
+  maxBatch: 200,
+  maxQueue: 5000,
+  lingerMs: 100,
+  maxAttempts: 4,
+  backoffMs: 250
+}
+
+const sleep = (ms: number) => new Promise(resolve => setTimeout(resolve, ms))
+
+export class EventForwarder {
+  private queue: unknown[] = []
+  private timer: ReturnType<typeof setTimeout> | null = null
+  private draining: Promise<void> | null = null
+  private waiters: Array<() => void> = []
+  private options: EventForwarderOptions
+  private counters = { received: 0, rejected: 0, forwarded: 0, batches: 0, retries: 0, dropped: 0 }
+
+  constructor(private url: string, options: Partial<EventForwarderOptions> = {}) {
+    this.options = { ...DEFAULT_OPTIONS, ...options }
+  }
+
+  // Returns false (and keeps nothing) when the queue has no room for `events`
+  enqueue(events: unknown[]): boolean {
+    if (this.queue.length + events.length > this.options.maxQueue) {
+      this.counters.rejected += events.length
+      return false
+    }
+    this.queue.push(...events)
+    this.counters.received += events.length
+
+    if (this.queue.length >= this.options.maxBatch) {
+      this.flush()
+    } else if (!this.timer && !this.draining) {
+      this.timer = setTimeout(() => this.flush(), this.options.lingerMs)
+    }
+    return true
+  }
+
+  // Resolves once everything queued so far has been sent (or given up on)
+  whenFlushed(): Promise<void> {
+    if (!this.queue.length && !this.draining) return Promise.resolve()
+    const flushed = new Promise<void>(resolve => this.waiters.push(resolve))
+    if (!this.timer && !this.draining) this.flush()
+    return flushed
+  }
+
+  flush(): Promise<void> {
+    if (this.timer) {
+      clearTimeout(this.timer)
+      this.timer = null
+    }
+    if (!this.draining) {
+      this.draining = this.drain().finally(() => {
+        this.draining = null
+        const waiters = this.waiters
+        this.waiters = []
+        waiters.forEach(resolve => resolve())
+      })
+    }
+    return this.draining
+  }
+
+  private async drain() {
+    while (this.queue.length) {
+      const batch = this.queue.splice(0, this.options.maxBatch)
+      if (await this.send(batch)) continue
+
+      // n8n is down: keep what fits for the next request to retry, drop the rest
+      const room = Math.max(0, this.options.maxQueue - this.queue.length)
+      this.queue.unshift(...batch.slice(0, room))
+      this.counters.dropped += batch.length - Math.min(room, batch.length)
+      return
+    }
+  }
+
+  private async send(batch: unknown[]): Promise<boolean> {
+    const body = JSON.stringify({ type: 'batch', count: batch.length, events: batch })
+
+    for (let attempt = 0; attempt < this.options.maxAttempts; attempt++) {
+      if (attempt > 0) {
+        this.counters.retries++
+        await sleep(this.options.backoffMs * 2 ** (attempt - 1) * (0.5 + Math.random()))
+      }
+      try {
+        const response = await upstreamFetch(this.url, {
+          method: 'POST',
+          headers: { 'Content-Type': 'application/json' },
+          body
+        })
+        await response.arrayBuffer()
+
+        if (response.ok) {
+          this.counters.forwarded += batch.length
+          this.counters.batches++
+          return true
+        }
+        if (response.status !== 429 && response.status < 500) {
+          // Retrying a rejected payload will not help
+          console.error('N8N rejected event batch:', response.status)
+          this.counters.dropped += batch.length
+          return true
+        }
+        console.error('N8N webhook error:', response.status)
+      } catch (error) {
+        console.error('N8N webhook unreachable:', error)
+      }
+    }
+    return false
+  }
+
+  stats() {
+    return { ...this.counters, queued: this.queue.length }
+  }
+}
+
+const forwarders = new Map<string, EventForwarder>()
+
+export function getEventForwarder(url: string): EventForwarder {
+  let forwarder = forwarders.get(url)
+  if (!forwarder) {
+    forwarder = new EventForwarder(url)
+    forwarders.set(url, forwarder)
+  }
+  return forwarder
+}
@@ -0,0 +1,196 @@
+import type { VercelRequest, VercelResponse } from '@vercel/node'
+import { upstreamFetch } from './upstream'
+
+// Token-bucket rate limiting shared by the API handlers. A bucket holds
+// `limit` tokens and refills continuously over `windowMs`, so a client gets
+// `limit` requests per window without the burst at window edges that a
+// fixed counter allows.
+//
+// The store is pluggable: MemoryStore is bounded and per instance, and
+// RemoteStore talks to a shared service (RATE_LIMIT_STORE_URL; dev-server.js
+// serves a local stand-in at /_ratelimit) so every instance enforces one limit.
+
+export interface RateLimitPolicy {
+  name: string
+  limit: number
+  windowMs: number
+  // Tokens this request takes (default 1). Fractional costs meter volume
+  // rather than calls, e.g. characters synthesized.
+  cost?: number
+}
+
+export interface RateLimitDecision {
+  allowed: boolean
+  limit: number
+  remaining: number
+  resetSeconds: number
+  retryAfterSeconds: number
+}
+
+export interface RateLimitStats {
+  store: 'memory' | 'remote'
+  keys: number
+  maxKeys: number
+  sweeps: number
+  expired: number
+  evicted: number
+  remoteErrors?: number
+}
+
+export interface RateLimitStore {
+  take(key: string, policy: RateLimitPolicy, now?: number): Promise<RateLimitDecision>
+  stats(): RateLimitStats
+}
+
+interface Bucket {
+  tokens: number
+  updated: number
+  full: number // when the bucket will have refilled, i.e. can be forgotten
+}
+
+export function takeToken(bucket: Bucket | undefined, policy: RateLimitPolicy, now: number): { bucket: Bucket; decision: RateLimitDecision } {
+  const rate = policy.limit / policy.windowMs // tokens per ms
+  const cost = policy.cost ?? 1
+  const elapsed = bucket ? Math.max(0, now - bucket.updated) : 0
+  let tokens = bucket ? Math.min(policy.limit, bucket.tokens + elapsed * rate) : policy.limit
+
+  const allowed = tokens >= cost
+  if (allowed) tokens -= cost
+
+  const msUntilFull = (policy.limit - tokens) / rate
+  return {
+    bucket: { tokens, updated: now, full: now + msUntilFull },
+    decision: {
+      allowed,
+      limit: policy.limit,
+      remaining: Math.floor(tokens),
+      resetSeconds: Math.ceil(msUntilFull / 1000),
+      retryAfterSeconds: allowed ? 0 : Math.ceil((cost - tokens) / rate / 1000)
+    }
+  }
+}
+
+// At capacity, evict down to this share of maxKeys so the next full sweep is
+// thousands of new keys away rather than one
+const EVICT_TO_RATIO = 0.9
+
+export class MemoryStore implements RateLimitStore {
+  private buckets = new Map<string, Bucket>()
+  private nextSweep = 0
+  private counters = { sweeps: 0, expired: 0, evicted: 0 }
+
+  constructor(private maxKeys = 10000, private sweepIntervalMs = 10000) {}
+
+  async take(key: string, policy: RateLimitPolicy, now = Date.now()): Promise<RateLimitDecision> {
+    if (now >= this.nextSweep || this.buckets.size >= this.maxKeys) {
+      this.sweep(now)
+    }
+
+    const { bucket, decision } = takeToken(this.buckets.get(key), policy, now)
+    // Re-insert so Map order is least recently used first
+    this.buckets.delete(key)
+    this.buckets.set(key, bucket)
+    return decision
+  }
+
+  // Forget buckets that have refilled (they behave exactly like a new one),
+  // then, if still at capacity, evict the least recently used down to the
+  // low-water mark.
+  private sweep(now: number) {
+    this.counters.sweeps++
+    this.nextSweep = now + this.sweepIntervalMs
+    for (const [key, bucket] of this.buckets) {
+      if (bucket.full <= now) {
+        this.buckets.delete(key)
+        this.counters.expired++
+      }
+    }
+    if (this.buckets.size < this.maxKeys) return
+    const lowWater = Math.floor(this.maxKeys * EVICT_TO_RATIO)
+    for (const key of this.buckets.keys()) {
+      if (this.buckets.size <= lowWater) break
+      this.buckets.delete(key)
+      this.counters.evicted++
+    }
+  }
+
+  stats(): RateLimitStats {
+    return { store: 'memory', keys: this.buckets.size, maxKeys: this.maxKeys, ...this.counters }
+  }
+}
+
+export class RemoteStore implements RateLimitStore {
+  private fallback: MemoryStore
+  private remoteErrors = 0
+
+  constructor(private url: string, maxKeys?: number, private timeoutMs = 250) {
+    this.fallback = new MemoryStore(maxKeys)
+  }
+
+  async take(key: string, policy: RateLimitPolicy, now = Date.now()): Promise<RateLimitDecision> {
+    const controller = new AbortController()
+    const timeoutId = setTimeout(() => controller.abort(), this.timeoutMs)
+    try {
+      const response = await upstreamFetch(this.url, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ key, limit: policy.limit, windowMs: policy.windowMs, cost: policy.cost ?? 1 }),
+        signal: controller.signal
+      })
+      if (!response.ok) throw new Error(`rate limit store returned ${response.status}`)
+      return await response.json() as RateLimitDecision
+    } catch (error) {
+      // Keep limiting locally rather than failing open while the store is down
+      this.remoteErrors++
+      console.error('Rate limit store unavailable:', error)
+      return this.fallback.take(key, policy, now)
+    } finally {
+      clearTimeout(timeoutId)
+    }
+  }
+
+  stats(): RateLimitStats {
+    return { ...this.fallback.stats(), store: 'remote', remoteErrors: this.remoteErrors }
+  }
+}
+
+let defaultStore: RateLimitStore | undefined
+
+export function getRateLimitStore(): RateLimitStore {
+  if (!defaultStore) {
+    const maxKeys = Number(process.env.RATE_LIMIT_MAX_KEYS) || undefined
+    defaultStore = process.env.RATE_LIMIT_STORE_URL
+      ? new RemoteStore(process.env.RATE_LIMIT_STORE_URL, maxKeys)
+      : new MemoryStore(maxKeys)
+  }
+  return defaultStore
+}
+
+// The first x-forwarded-for hop is the client; the rest are proxies.
+export function clientKey(req: VercelRequest): string {
+  const forwarded = req.headers['x-forwarded-for']
+  const first = (Array.isArray(forwarded) ? forwarded[0] : forwarded || '').split(',')[0].trim()
+  return first ||
+         (req.headers['x-real-ip'] as string | undefined)?.trim() ||
+         req.socket?.remoteAddress ||
+         'unknown'
+}
+
+// Applies `policy` to the request's client and sets the RateLimit-* headers
+// (plus Retry-After when denied). The caller sends the 429 itself.
+export async function checkRateLimit(
+  req: VercelRequest,
+  res: VercelResponse,
+  policy: RateLimitPolicy,
+  store: RateLimitStore = getRateLimitStore()
+): Promise<RateLimitDecision> {
+  const decision = await store.take(`${policy.name}:${clientKey(req)}`, policy)
+  res.setHeader('RateLimit-Limit', String(decision.limit))
+  res.setHeader('RateLimit-Remaining', String(decision.remaining))
+  res.setHeader('RateLimit-Reset', String(decision.resetSeconds))
+  res.setHeader('RateLimit-Policy', `${policy.limit};w=${Math.round(policy.windowMs / 1000)}`)
+  if (!decision.allowed) {
+    res.setHeader('Retry-After', String(decision.retryAfterSeconds))
+  }
+  return decision
+}
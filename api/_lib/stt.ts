@@ -0,0 +1,223 @@
+import crypto from 'crypto'
+
+// Streaming speech-to-text. A client opens a session, uploads audio chunks
+// while it is still recording and gets a partial transcript back for each;
+// the final request returns the final transcript. Engines plug in through
+// registerRecognizer and are picked with ODIADEV_STT_ENGINE.
+//
+// The built-in 'deterministic' engine is a stand-in for tests and local
+// development: it picks a phrase from a hash of the first chunk and reveals
+// one word per BYTES_PER_WORD of audio, so the same upload always produces
+// the same partials and final transcript.
+
+export interface Transcript {
+  text: string
+  final: boolean
+  confidence: number
+  language: string
+}
+
+export interface RecognizerSession {
+  accept(chunk: Buffer): Promise<Transcript>
+  finish(): Promise<Transcript>
+}
+
+export interface RecognizerOptions {
+  mimeType: string
+  language: string
+}
+
+export type RecognizerFactory = (options: RecognizerOptions) => RecognizerSession
+
+const PHRASES = [
+  'Hello, how are you today?',
+  'I need help with my account',
+  'Can you tell me about your services?',
+  'What are your business hours?',
+  'I want to speak to a human agent',
+  'Thank you for your help',
+  'Goodbye',
+  "I don't understand",
+  'Can you repeat that?',
+  "Yes, that's correct"
+]
+
+// About a quarter second of 128 kbit/s audio
+const BYTES_PER_WORD = 4000
+
+class DeterministicSession implements RecognizerSession {
+  private words: string[] | null = null
+  private bytes = 0
+
+  constructor(private options: RecognizerOptions) {}
+
+  private transcript(final: boolean): Transcript {
+    const words = this.words || []
+    const heard = final ? words.length : Math.min(words.length, Math.floor(this.bytes / BYTES_PER_WORD))
+    return {
+      text: words.slice(0, heard).join(' '),
+      final,
+      confidence: final ? 0.95 : 0.6,
+      language: this.options.language
+    }
+  }
+
+  async accept(chunk: Buffer): Promise<Transcript> {
+    if (!this.words && chunk.byteLength) {
+      const digest = crypto.createHash('sha256').update(chunk).digest()
+      this.words = PHRASES[digest.readUInt32BE(0) % PHRASES.length].split(' ')
+    }
+    this.bytes += chunk.byteLength
+    return this.transcript(false)
+  }
+
+  async finish(): Promise<Transcript> {
+    return this.transcript(true)
+  }
+}
+
+const recognizers = new Map<string, RecognizerFactory>([
+  ['deterministic', options => new DeterministicSession(options)]
+])
+
+export function registerRecognizer(name: string, factory: RecognizerFactory) {
+  recognizers.set(name, factory)
+}
+
+export function createRecognizer(options: RecognizerOptions): RecognizerSession {
+  const engine = process.env.ODIADEV_STT_ENGINE || 'deterministic'
+  const factory = recognizers.get(engine)
+  if (!factory) throw new Error(`Unknown STT engine: ${engine}`)
+  return factory(options)
+}
+
+// Sessions live in memory on the warm instance that received the first chunk.
+// Chunks may arrive out of order when the client pipelines uploads, so they
+// are fed to the recognizer strictly by sequence number.
+
+const SESSION_TTL_MS = 30000
+const MAX_SESSIONS = 1000
+const FINAL_WAIT_MS = 5000
+// Chunks held back waiting for an earlier one: at most SEQ_WINDOW sequence
+// numbers ahead (the widget uploads one chunk per 250 ms, so that is seconds
+// of stragglers) and MAX_PENDING_BYTES in total per session
+const SEQ_WINDOW = 32
+const MAX_PENDING_BYTES = 2 * 1024 * 1024
+
+interface StreamSession {
+  recognizer: RecognizerSession
+  nextSeq: number
+  pending: Map<number, Buffer>
+  pendingBytes: number
+  latest: Transcript
+  feeding: Promise<void>
+  waiters: Array<() => void>
+  touched: number
+}
+
+const sessions = new Map<string, StreamSession>()
+
+function sweep(now: number) {
+  for (const [id, session] of sessions) {
+    if (now - session.touched > SESSION_TTL_MS || sessions.size > MAX_SESSIONS) {
+      sessions.delete(id)
+    }
+  }
+}
+
+function openSession(id: string, options: RecognizerOptions): StreamSession {
+  const now = Date.now()
+  let session = sessions.get(id)
+  if (!session) {
+    sweep(now)
+    session = {
+      recognizer: createRecognizer(options),
+      nextSeq: 0,
+      pending: new Map(),
+      pendingBytes: 0,
+      latest: { text: '', final: false, confidence: 0, language: options.language },
+      feeding: Promise.resolve(),
+      waiters: [],
+      touched: now
+    }
+    sessions.set(id, session)
+  }
+  session.touched = now
+  return session
+}
+
+function feed(session: StreamSession): Promise<void> {
+  session.feeding = session.feeding.then(async () => {
+    while (session.pending.has(session.nextSeq)) {
+      const chunk = session.pending.get(session.nextSeq)!
+      session.pending.delete(session.nextSeq)
+      session.pendingBytes -= chunk.byteLength
+      session.latest = await session.recognizer.accept(chunk)
+      session.nextSeq++
+    }
+    const waiters = session.waiters
+    session.waiters = []
+    waiters.forEach(resolve => resolve())
+  })
+  return session.feeding
+}
+
+// A chunk the session will not hold: too far ahead of the next expected
+// sequence number, or more buffered audio than a session may keep
+export class ChunkRejectedError extends Error {
+  constructor(public status: number, message: string) {
+    super(message)
+  }
+}
+
+export async function acceptChunk(id: string, seq: number, chunk: Buffer, options: RecognizerOptions): Promise<Transcript & { seq: number }> {
+  const session = openSession(id, options)
+  if (seq >= session.nextSeq + SEQ_WINDOW) {
+    throw new ChunkRejectedError(400, `seq ${seq} is more than ${SEQ_WINDOW} ahead of ${session.nextSeq}`)
+  }
+  if (seq >= session.nextSeq && !session.pending.has(seq)) {
+    // The chunk it is waiting for is fed straight away, so it is always taken
+    if (seq > session.nextSeq && session.pendingBytes + chunk.byteLength > MAX_PENDING_BYTES) {
+      throw new ChunkRejectedError(413, `More than ${MAX_PENDING_BYTES} bytes of audio are waiting for chunk ${session.nextSeq}`)
+    }
+    session.pending.set(seq, chunk)
+    session.pendingBytes += chunk.byteLength
+  }
+  await feed(session)
+  return { ...session.latest, seq: session.nextSeq - 1 }
+}
+
+// The final request arrived without every chunk: the rest went to another
+// instance or were lost, so the transcript would be partial or empty
+export class IncompleteStreamError extends Error {
+  constructor(public received: number, public expected: number) {
+    super(`Received ${received} of ${expected} audio chunks`)
+  }
+}
+
+// `chunks` is how many chunks the client sent; waits (bounded) for stragglers
+// and throws IncompleteStreamError if some never arrive
+export async function finishStream(id: string, chunks: number, options: RecognizerOptions): Promise<Transcript> {
+  const session = openSession(id, options)
+  const deadline = Date.now() + FINAL_WAIT_MS
+  while (session.nextSeq < chunks && Date.now() < deadline) {
+    let timer: ReturnType<typeof setTimeout> | undefined
+    await Promise.race([
+      new Promise<void>(resolve => session.waiters.push(resolve)),
+      new Promise<void>(resolve => { timer = setTimeout(resolve, Math.max(0, deadline - Date.now())) })
+    ])
+    clearTimeout(timer)
+  }
+  await session.feeding
+  sessions.delete(id)
+  if (session.nextSeq < chunks) {
+    throw new IncompleteStreamError(session.nextSeq, chunks)
+  }
+  return session.recognizer.finish()
+}
+
+export async function transcribe(audio: Buffer, options: RecognizerOptions): Promise<Transcript> {
+  const recognizer = createRecognizer(options)
+  await recognizer.accept(audio)
+  return recognizer.finish()
+}
@@ -0,0 +1,133 @@
+import http from 'http'
+import https from 'https'
+import { Readable } from 'stream'
+
+// Shared client for the hosts the API handlers call (n8n, the TTS API, the
+// Render brain). Each host gets a keep-alive agent with a bounded socket pool,
+// so a warm instance reuses connections instead of paying a TCP/TLS handshake
+// per request. upstreamFetch returns a standard Response, so callers use it
+// exactly like fetch.
+//
+// UPSTREAM_KEEP_ALIVE=0 turns pooling off (for A/B benchmarks);
+// UPSTREAM_MAX_SOCKETS caps concurrent connections per host (default 16).
+
+const KEEP_ALIVE = process.env.UPSTREAM_KEEP_ALIVE !== '0'
+const MAX_SOCKETS = Number(process.env.UPSTREAM_MAX_SOCKETS) || 16
+const MAX_FREE_SOCKETS = Math.min(MAX_SOCKETS, 8)
+const FREE_SOCKET_TIMEOUT_MS = 15000
+
+export interface UpstreamInit {
+  method?: string
+  headers?: Record<string, string>
+  body?: string | Buffer
+  signal?: AbortSignal
+}
+
+export interface HostStats {
+  requests: number
+  newConnections: number
+  reusedConnections: number
+  errors: number
+  active: number
+  idle: number
+  queued: number
+}
+
+interface Pool {
+  agent: http.Agent
+  seen: WeakSet<object>
+  counters: { requests: number; newConnections: number; reusedConnections: number; errors: number }
+}
+
+const pools = new Map<string, Pool>()
+
+function poolFor(url: URL): Pool {
+  let pool = pools.get(url.origin)
+  if (!pool) {
+    const options = {
+      keepAlive: KEEP_ALIVE,
+      maxSockets: MAX_SOCKETS,
+      maxFreeSockets: MAX_FREE_SOCKETS,
+      timeout: FREE_SOCKET_TIMEOUT_MS,
+      scheduling: 'lifo' as const
+    }
+    pool = {
+      agent: url.protocol === 'https:' ? new https.Agent(options) : new http.Agent(options),
+      seen: new WeakSet(),
+      counters: { requests: 0, newConnections: 0, reusedConnections: 0, errors: 0 }
+    }
+    pools.set(url.origin, pool)
+  }
+  return pool
+}
+
+function toHeaders(raw: http.IncomingHttpHeaders): Headers {
+  const headers = new Headers()
+  for (const [name, value] of Object.entries(raw)) {
+    if (Array.isArray(value)) value.forEach(v => headers.append(name, v))
+    else if (value !== undefined) headers.set(name, value)
+  }
+  return headers
+}
+
+export function upstreamFetch(input: string, init: UpstreamInit = {}): Promise<Response> {
+  const url = new URL(input)
+  const pool = poolFor(url)
+  const transport = url.protocol === 'https:' ? https : http
+  pool.counters.requests++
+
+  return new Promise((resolve, reject) => {
+    const req = transport.request(url, {
+      method: init.method || 'GET',
+      headers: init.headers,
+      agent: pool.agent,
+      signal: init.signal
+    })
+
+    // req.reusedSocket misses sockets handed straight to a queued request
+    req.on('socket', socket => {
+      if (pool.seen.has(socket)) {
+        pool.counters.reusedConnections++
+      } else {
+        pool.seen.add(socket)
+        pool.counters.newConnections++
+      }
+    })
+
+    req.on('response', incoming => {
+      const status = incoming.statusCode || 502
+      // Response forbids a body on these statuses; drain so the socket is reusable
+      const noBody = req.method === 'HEAD' || status === 204 || status === 205 || status === 304
+      if (noBody) incoming.resume()
+      resolve(new Response(noBody ? null : (Readable.toWeb(incoming) as ReadableStream<Uint8Array>), {
+        status,
+        statusText: incoming.statusMessage,
+        headers: toHeaders(incoming.headers)
+      }))
+    })
+
+    req.on('error', error => {
+      pool.counters.errors++
+      reject(error)
+    })
+
+    req.end(init.body)
+  })
+}
+
+function countSockets(sockets: NodeJS.ReadOnlyDict<unknown[]>): number {
+  return Object.values(sockets).reduce((total, list) => total + (list?.length || 0), 0)
+}
+
+export function upstreamStats(): { keepAlive: boolean; maxSockets: number; hosts: Record<string, HostStats> } {
+  const hosts: Record<string, HostStats> = {}
+  for (const [origin, { agent, counters }] of pools) {
+    hosts[origin] = {
+      ...counters,
+      active: countSockets(agent.sockets),
+      idle: countSockets(agent.freeSockets),
+      queued: countSockets(agent.requests)
+    }
+  }
+  return { keepAlive: KEEP_ALIVE, maxSockets: MAX_SOCKETS, hosts }
+}
@@ -1,5 +1,6 @@
 ﻿import { withCors } from './_lib/cors'
 import { VercelRequest, VercelResponse } from '@vercel/node'
+import { upstreamFetch } from '../_lib/upstream'
 
 async function _handler(req: VercelRequest, res: VercelResponse) {
   if (req.method !== 'POST') return res.status(405).json({ error: 'Method not allowed' })
@@ -16,7 +17,7 @@ async function _handler(req: VercelRequest, res: VercelResponse) {
       return res.json({ qualified: score >= 40, score, notes: 'Default heuristic (no Brain URL configured)' })
     }
 
-    const r = await fetch(`${brainUrl}/api/qualify`, {
+    const r = await upstreamFetch(`${brainUrl}/api/qualify`, {
       method: 'POST',
       headers: {
         'Content-Type': 'application/json',
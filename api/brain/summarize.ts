@@ -1,28 +1,38 @@
 ﻿import { withCors } from './_lib/cors'
 import { VercelRequest, VercelResponse } from '@vercel/node'
+import { upstreamFetch } from '../_lib/upstream'
 
+// Two modes: { transcript } summarizes a whole conversation, and
+// { session_id, turns, reset? } adds only the new turns to the summary state
+// render-brain keeps for that session (/api/summarize/incremental), so the
+// cost of an update does not grow with the conversation.
 async function _handler(req: VercelRequest, res: VercelResponse) {
   if (req.method !== 'POST') return res.status(405).json({ error: 'Method not allowed' })
   try {
-    const { transcript } = req.body || {}
-    if (!transcript) return res.status(400).json({ error: 'Missing required field: transcript' })
+    const { transcript, session_id, turns, reset } = req.body || {}
+    const incremental = session_id !== undefined
+    if (incremental && !Array.isArray(turns)) {
+      return res.status(400).json({ error: 'turns must be an array of { role, content }' })
+    }
+    if (!incremental && !transcript) return res.status(400).json({ error: 'Missing required field: transcript' })
 
     const brainUrl = process.env.BRAIN_BASE_URL
     const brainKey = process.env.BRAIN_API_KEY
 
     if (!brainUrl) {
       // Fallback: return first 50 words as "summary"
-      const words = String(transcript).split(/\s+/).slice(0, 50).join(' ')
-      return res.json({ summary: words + (String(transcript).split(/\s+/).length > 50 ? 'â€¦' : ''), topics: [] })
+      const text = incremental ? turns.map((turn: { content?: string }) => turn.content || '').join(' ') : String(transcript)
+      const words = text.split(/\s+/).slice(0, 50).join(' ')
+      return res.json({ summary: words + (text.split(/\s+/).length > 50 ? 'â€¦' : ''), topics: [] })
     }
 
-    const r = await fetch(`${brainUrl}/api/summarize`, {
+    const r = await upstreamFetch(`${brainUrl}/api/summarize${incremental ? '/incremental' : ''}`, {
       method: 'POST',
       headers: {
         'Content-Type': 'application/json',
         ...(brainKey ? { 'Authorization': `Bearer ${brainKey}` } : {})
       },
-      body: JSON.stringify({ transcript })
+      body: JSON.stringify(incremental ? { session_id: String(session_id), turns, reset: !!reset } : { transcript })
     })
     if (!r.ok) {
       const t = await r.text()
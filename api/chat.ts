@@ -1,39 +1,106 @@
 ﻿import type { VercelRequest, VercelResponse } from '@vercel/node'
+import { upstreamFetch } from './_lib/upstream'
 
 const N8N_WEBHOOK_URL = process.env.N8N_WEBHOOK_URL || 'https://austyneguale.app.n8n.cloud/webhook/your-webhook-id'
 
-export default async function handler(req: VercelRequest, res: VercelResponse) {
-  // Set CORS headers
-  res.setHeader('Access-Control-Allow-Origin', '*')
-  res.setHeader('Access-Control-Allow-Methods', 'POST, OPTIONS')
-  res.setHeader('Access-Control-Allow-Headers', 'Content-Type')
+const MAX_BATCH = 20
+const BATCH_CONCURRENCY = 4
+const STREAM_CHUNK_TYPES = new Set(['begin', 'item', 'end', 'error']) // n8n streaming responses
 
-  if (req.method === 'OPTIONS') {
-    return res.status(200).end()
-  }
+interface ChatReply {
+  reply: string
+  source: string
+  timestamp: string
+  sessionId?: string
+}
 
-  if (req.method !== 'POST') {
-    return res.status(405).json({ error: 'Method not allowed' })
-  }
+// Pulls the reply text out of a webhook JSON body or stream chunk
+function replyText(data: any): string | undefined {
+  if (typeof data === 'string') return data
+  const text = data?.reply ?? data?.message ?? data?.response ?? data?.text ?? data?.content ?? data?.delta
+  return typeof text === 'string' ? text : undefined
+}
 
-  try {
-    const { message, sessionId } = req.body
+// Reads the webhook response as it arrives. n8n streaming responses (JSON
+// lines of { type: 'begin' | 'item' | 'end', content }) and SSE bodies are
+// passed to onDelta piece by piece; a plain JSON body yields no deltas.
+// Resolves with the whole reply, or undefined if there was none.
+async function readReply(response: Response, onDelta?: (text: string) => void): Promise<string | undefined> {
+  if (!response.body) return replyText(await response.json().catch(() => null))
+
+  const sse = (response.headers.get('content-type') || '').includes('text/event-stream')
+  const reader = response.body.getReader()
+  const decoder = new TextDecoder()
+  let body = ''
+  let pending = ''
+  let streamed = ''
+  let jsonLines: boolean | undefined
+
+  const emit = (text: string | undefined) => {
+    if (!text) return
+    streamed += text
+    onDelta?.(text)
+  }
 
-    if (!message) {
-      return res.status(400).json({ error: 'Message is required' })
+  for (;;) {
+    const { done, value } = await reader.read()
+    const text = decoder.decode(value, { stream: !done })
+    body += text
+    pending += text
+    if (sse) {
+      // Events end with a blank line; only their data: lines matter here
+      const events = pending.split(/\r?\n\r?\n/)
+      pending = done ? '' : events.pop()!
+      for (const event of events) {
+        const data = event.split(/\r?\n/).filter(line => line.startsWith('data:')).map(line => line.slice(5).replace(/^ /, '')).join('\n')
+        if (!data || data === '[DONE]') continue
+        let parsed: unknown = data
+        try { parsed = JSON.parse(data) } catch { /* plain text data */ }
+        emit(replyText(parsed))
+      }
+    } else if (jsonLines !== false) {
+      const lines = pending.split('\n')
+      pending = done ? '' : lines.pop()!
+      for (const line of lines.filter(line => line.trim())) {
+        let chunk: any
+        try { chunk = JSON.parse(line) } catch { chunk = undefined }
+        if (!STREAM_CHUNK_TYPES.has(chunk?.type)) {
+          jsonLines = false // an ordinary (possibly pretty-printed) JSON body
+          break
+        }
+        jsonLines = true
+        if (chunk.type === 'item') emit(replyText(chunk))
+      }
     }
+    if (done) break
+  }
 
+  if (sse || jsonLines) return streamed || undefined
+  let data: unknown = null
+  try { data = JSON.parse(body) } catch { /* not JSON */ }
+  return replyText(data)
+}
+
+// One message through the n8n webhook, with the fallback replies when it fails.
+// When the webhook streams its reply, onDelta receives it piece by piece.
+async function chatReply(
+  message: string,
+  sessionId: string | undefined,
+  userAgent: string,
+  onDelta?: (text: string) => void
+): Promise<ChatReply> {
+  try {
     // Prepare payload for n8n webhook
     const payload = {
       message,
       sessionId: sessionId || `adaqua-${Date.now()}`,
       timestamp: new Date().toISOString(),
       source: 'adaqua-chat-widget',
-      userAgent: req.headers['user-agent'] || 'Unknown'
+      userAgent
     }
 
     // Call n8n webhook
-    const webhookResponse = await fetch(N8N_WEBHOOK_URL, {
+    const webhookResponse = await upstreamFetch(N8N_WEBHOOK_URL, {
       method: 'POST',
       headers: {
         'Content-Type': 'application/json',
@@ -55,37 +122,121 @@ export default async function handler(req: VercelRequest, res: VercelResponse) {
       
       const randomResponse = fallbackResponses[Math.floor(Math.random() * fallbackResponses.length)]
       
-      return res.status(200).json({
+      return {
         reply: randomResponse,
         source: 'fallback',
         timestamp: new Date().toISOString()
-      })
+      }
     }
 
-    const webhookData = await webhookResponse.json()
-    
     // Extract response from webhook
-    const reply = webhookData.reply || 
-                  webhookData.message || 
-                  webhookData.response || 
-                  webhookData.text ||
+    const reply = await readReply(webhookResponse, onDelta) ||
                   "I received your message and I'm processing it. Please give me a moment."
 
-    return res.status(200).json({
+    return {
       reply,
       source: 'n8n-webhook',
       timestamp: new Date().toISOString(),
       sessionId: payload.sessionId
-    })
+    }
 
   } catch (error) {
     console.error('Chat Handler Error:', error)
     
     // Fallback response on error
-    return res.status(200).json({
+    return {
       reply: "I'm experiencing some technical difficulties right now. Please try again in a moment, or contact support if the issue persists.",
       source: 'error-fallback',
       timestamp: new Date().toISOString()
-    })
+    }
+  }
+}
+
+// Messages queued offline by the widget (src/lib/outbox.ts) arrive together as
+// { batch: [{ key, message, sessionId }] }; replies come back in the same order.
+// Turns of one session go to the webhook one after another, in queue order,
+// so its conversation memory sees them as they were sent; only different
+// sessions run side by side.
+async function batchReplies(batch: { key?: string, message: string, sessionId?: string }[], userAgent: string) {
+  const results: (ChatReply & { key?: string })[] = new Array(batch.length)
+  const sessions = new Map<string, number[]>()
+  batch.forEach((item, i) => {
+    const session = item.sessionId ?? `#${i}`
+    sessions.set(session, [...(sessions.get(session) ?? []), i])
+  })
+  const queues = [...sessions.values()]
+  let next = 0
+  const worker = async () => {
+    while (next < queues.length) {
+      for (const i of queues[next++]) {
+        results[i] = { key: batch[i].key, ...await chatReply(batch[i].message, batch[i].sessionId, userAgent) }
+      }
+    }
   }
+  await Promise.all(Array.from({ length: Math.min(BATCH_CONCURRENCY, queues.length) }, worker))
+  return results
+}
+
+// Streaming is opted into with ?stream=1 or an event-stream Accept header;
+// everything else keeps the single JSON response.
+function wantsStream(req: VercelRequest): boolean {
+  const stream = req.query?.stream
+  if (stream === '1' || stream === 'true') return true
+  return (req.headers.accept || '').toLowerCase().includes('text/event-stream')
+}
+
+// Relays the reply as Server-Sent Events: a `delta` event ({ text }) per piece
+// the webhook streams, then one `done` event with the same body as the JSON
+// response. A webhook that does not stream produces only the `done` event.
+async function streamReply(res: VercelResponse, message: string, sessionId: string | undefined, userAgent: string) {
+  res.status(200)
+  res.setHeader('Content-Type', 'text/event-stream; charset=utf-8')
+  res.setHeader('Cache-Control', 'no-cache, no-transform')
+  res.setHeader('X-Accel-Buffering', 'no') // keep proxies from buffering the stream
+  res.flushHeaders?.()
+
+  const send = (event: string, data: unknown) => res.write(`event: ${event}\ndata: ${JSON.stringify(data)}\n\n`)
+  const result = await chatReply(message, sessionId, userAgent, text => send('delta', { text }))
+  send('done', result)
+  res.end()
+}
+
+export default async function handler(req: VercelRequest, res: VercelResponse) {
+  // Set CORS headers
+  res.setHeader('Access-Control-Allow-Origin', '*')
+  res.setHeader('Access-Control-Allow-Methods', 'POST, OPTIONS')
+  res.setHeader('Access-Control-Allow-Headers', 'Content-Type, Accept')
+
+  if (req.method === 'OPTIONS') {
+    return res.status(200).end()
+  }
+
+  if (req.method !== 'POST') {
+    return res.status(405).json({ error: 'Method not allowed' })
+  }
+
+  const userAgent = String(req.headers['user-agent'] || 'Unknown')
+  const { message, sessionId, batch } = req.body || {}
+
+  if (batch !== undefined) {
+    const valid = Array.isArray(batch) && batch.length > 0
+      && batch.every((item: { message?: unknown } | null) => item && item.message)
+    if (!valid) {
+      return res.status(400).json({ error: 'batch must be a non-empty array of { key, message, sessionId }' })
+    }
+    if (batch.length > MAX_BATCH) {
+      return res.status(413).json({ error: `At most ${MAX_BATCH} messages per batch` })
+    }
+    return res.status(200).json({ results: await batchReplies(batch, userAgent) })
+  }
+
+  if (!message) {
+    return res.status(400).json({ error: 'Message is required' })
+  }
+
+  if (wantsStream(req)) {
+    return streamReply(res, message, sessionId, userAgent)
+  }
+
+  return res.status(200).json(await chatReply(message, sessionId, userAgent))
 }
\ No newline at end of file
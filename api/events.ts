@@ -1,43 +1,72 @@
 ﻿import { withCors } from './_lib/cors'
+import { getEventForwarder } from './_lib/eventForwarder'
 import { VercelRequest, VercelResponse } from '@vercel/node'
 
+const MAX_EVENTS_PER_REQUEST = 100
+
+// Accepts one event, an array of events, or { events: [...] }. sendBeacon
+// posts text/plain, so string bodies are parsed here.
+function parseEvents(body: unknown): unknown[] | null {
+  if (typeof body === 'string') {
+    try {
+      body = JSON.parse(body)
+    } catch {
+      return null
+    }
+  }
+  if (Array.isArray(body)) return body
+  if (body && typeof body === 'object') {
+    const { events } = body as { events?: unknown }
+    return Array.isArray(events) ? events : [body]
+  }
+  return null
+}
+
 async function _handler(req: VercelRequest, res: VercelResponse) {
   if (req.method !== 'POST') {
     return res.status(405).json({ error: 'Method not allowed' })
   }
 
   try {
-    const eventData = req.body
+    const events = parseEvents(req.body)
 
-    if (!eventData.type) {
-      return res.status(400).json({ error: 'Missing required field: type' })
+    if (!events || events.length === 0) {
+      return res.status(400).json({ error: 'Body must be an event or an array of events' })
+    }
+
+    if (events.length > MAX_EVENTS_PER_REQUEST) {
+      return res.status(413).json({ error: `At most ${MAX_EVENTS_PER_REQUEST} events per request` })
+    }
+
+    const invalid = events.findIndex(event => !event || typeof (event as { type?: unknown }).type !== 'string')
+    if (invalid !== -1) {
+      return res.status(400).json({ error: 'Missing required field: type', index: invalid })
     }
 
     const n8nWebhookUrl = process.env.N8N_WEBHOOK_URL
 
     if (!n8nWebhookUrl) {
       console.warn('N8N_WEBHOOK_URL not configured, skipping event forwarding')
-      return res.json({ ok: true, message: 'Event logged locally (n8n not configured)' })
+      return res.json({ ok: true, accepted: events.length, message: 'Events logged locally (n8n not configured)' })
     }
 
-    // Forward event to n8n webhook
-    const n8nResponse = await fetch(n8nWebhookUrl, {
-      method: 'POST',
-      headers: {
-        'Content-Type': 'application/json',
-      },
-      body: JSON.stringify(eventData),
-    })
-
-    if (!n8nResponse.ok) {
-      throw new Error(`N8N webhook error: ${n8nResponse.status}`)
+    const forwarder = getEventForwarder(n8nWebhookUrl)
+    if (!forwarder.enqueue(events)) {
+      res.setHeader('Retry-After', '5')
+      return res.status(503).json({ error: 'Event queue full', message: 'Please retry shortly.' })
     }
 
-    res.json({ ok: true })
+    // Acknowledge right away; forwarding to n8n happens in bulk after the response
+    res.status(202).json({ ok: true, accepted: events.length })
+
+    // Keep this invocation alive until its events have been handed to n8n
+    await forwarder.whenFlushed()
 
   } catch (error) {
     console.error('Events Error:', error)
-    res.status(500).json({ error: 'Failed to process event' })
+    if (!res.headersSent) {
+      res.status(500).json({ error: 'Failed to process event' })
+    }
   }
 }
 
@@ -1,4 +1,17 @@
 import type { VercelRequest, VercelResponse } from '@vercel/node'
+import { ChunkRejectedError, IncompleteStreamError, acceptChunk, finishStream, transcribe } from './_lib/stt'
+
+const MAX_CHUNK_BYTES = 512 * 1024
+
+// Raw chunk uploads arrive as application/octet-stream (a Buffer once parsed);
+// read the stream ourselves if the body parser left it alone.
+async function readBody(req: VercelRequest): Promise<Buffer> {
+  if (Buffer.isBuffer(req.body)) return req.body
+  if (typeof req.body === 'string') return Buffer.from(req.body, 'binary')
+  const chunks: Buffer[] = []
+  for await (const chunk of req) chunks.push(Buffer.from(chunk))
+  return Buffer.concat(chunks)
+}
 
 export default async function handler(req: VercelRequest, res: VercelResponse) {
   // Set CORS headers
@@ -15,6 +28,35 @@ export default async function handler(req: VercelRequest, res: VercelResponse) {
   }
 
   try {
+    const session = typeof req.query.session === 'string' ? req.query.session : ''
+    const language = typeof req.query.language === 'string' ? req.query.language : 'en'
+
+    // Streaming mode: POST /api/stt?session=<id>&seq=<n> with a raw audio chunk
+    // returns the partial transcript so far; ?session=<id>&final=1&chunks=<n>
+    // returns the final transcript once all n chunks are in.
+    if (session) {
+      const mimeType = typeof req.query.mimeType === 'string' ? req.query.mimeType : 'audio/webm'
+
+      if (req.query.final) {
+        const chunks = Number(req.query.chunks) || 0
+        const result = await finishStream(session, chunks, { mimeType, language })
+        return res.status(200).json({ ...result, session })
+      }
+
+      const seq = Number(req.query.seq)
+      if (!Number.isInteger(seq) || seq < 0) {
+        return res.status(400).json({ error: 'seq must be a non-negative integer' })
+      }
+
+      const chunk = await readBody(req)
+      if (chunk.byteLength > MAX_CHUNK_BYTES) {
+        return res.status(413).json({ error: `Chunks are limited to ${MAX_CHUNK_BYTES} bytes` })
+      }
+
+      const partial = await acceptChunk(session, seq, chunk, { mimeType, language })
+      return res.status(200).json({ ...partial, session })
+    }
+
     const { audioBase64, mimeType = 'audio/webm' } = req.body
 
     if (!audioBase64) {
@@ -23,40 +65,36 @@ export default async function handler(req: VercelRequest, res: VercelResponse) {
 
     // Convert base64 to buffer
     const audioBuffer = Buffer.from(audioBase64, 'base64')
-    
-    // For now, we'll use a mock transcription
-    // In production, you would integrate with a real STT service like OpenAI Whisper
-    const mockTranscriptions = [
-      "Hello, how are you today?",
-      "I need help with my account",
-      "Can you tell me about your services?",
-      "What are your business hours?",
-      "I want to speak to a human agent",
-      "Thank you for your help",
-      "Goodbye",
-      "I don't understand",
-      "Can you repeat that?",
-      "Yes, that's correct"
-    ]
-
-    // Simulate processing delay
-    await new Promise(resolve => setTimeout(resolve, 1000))
-
-    // Return a random mock transcription
-    const randomTranscription = mockTranscriptions[Math.floor(Math.random() * mockTranscriptions.length)]
+
+    // Whole-recording upload, kept for older widget builds
+    const result = await transcribe(audioBuffer, { mimeType, language })
 
     return res.status(200).json({
-      text: randomTranscription,
-      confidence: 0.95,
-      language: 'en',
+      text: result.text,
+      confidence: result.confidence,
+      language: result.language,
       duration: audioBuffer.length / 1000 // Mock duration
     })
 
   } catch (error) {
+    if (error instanceof ChunkRejectedError) {
+      return res.status(error.status).json({ error: error.message })
+    }
+
+    if (error instanceof IncompleteStreamError) {
+      // The client still has the whole recording and can upload it instead
+      return res.status(409).json({
+        error: 'Incomplete audio stream',
+        message: error.message,
+        received: error.received,
+        expected: error.expected
+      })
+    }
+
     console.error('STT Handler Error:', error)
-    return res.status(500).json({ 
+    return res.status(500).json({
       error: 'Internal server error',
       message: error instanceof Error ? error.message : 'Unknown error'
     })
   }
-}
\ No newline at end of file
+}
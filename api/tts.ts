@@ -1,15 +1,38 @@
 ﻿import type { VercelRequest, VercelResponse } from '@vercel/node'
+import crypto from 'crypto'
+import { PassThrough } from 'stream'
+import { pipeline } from 'stream/promises'
+import { AudioCache, audioCacheKey } from './_lib/audioCache'
+import { checkRateLimit, getRateLimitStore } from './_lib/rateLimit'
+import { upstreamFetch, upstreamStats } from './_lib/upstream'
 
 // ODIADEV TTS API Configuration
 const TTS_API_URL = 'http://13.247.221.39/v1/tts'
 const TTS_API_KEY = process.env.ODIADEV_TTS_KEY || ''
 const DEFAULT_VOICE_ID = 'naija_female_warm'
 const FORMAT = 'mp3'
+const AUDIO_MIME_TYPES: Record<string, string> = {
+  mp3: 'audio/mpeg',
+  wav: 'audio/wav',
+  ogg: 'audio/ogg'
+}
+
+// Repeated phrases (greetings, fallbacks, confirmations) are served from memory
+const TTS_CACHE_BYTES = Number(process.env.ODIADEV_TTS_CACHE_BYTES) || 32 * 1024 * 1024
+const ttsCache = new AudioCache(TTS_CACHE_BYTES)
+
+// Upstream audio that stops arriving for this long is treated as a timeout
+const STREAM_IDLE_TIMEOUT_MS = 10000
 
-// Rate limiting configuration
-const RATE_LIMIT_WINDOW = 60 * 1000 // 1 minute
-const RATE_LIMIT_MAX_REQUESTS = 3 // 3 requests per minute per IP
-const rateLimitMap = new Map<string, { count: number; resetTime: number }>()
+// GET ?stats=1 requires `Authorization: Bearer <ODIADEV_STATS_TOKEN>`; unset disables it
+const STATS_TOKEN = process.env.ODIADEV_STATS_TOKEN || ''
+
+// Rate limiting configuration: 3 full-length (1000 character) clips per minute
+// per IP. A request costs its share of a full clip, at least MIN_TTS_COST, so a
+// reply spoken sentence by sentence costs about the same as one spoken whole.
+const RATE_LIMIT = { name: 'tts', limit: 3, windowMs: 60 * 1000 }
+const TTS_CHARS_PER_TOKEN = 1000
+const MIN_TTS_COST = 0.1
 
 // CORS origins allowed
 const ALLOWED_ORIGINS = [
@@ -29,30 +52,29 @@ function isAllowedOrigin(origin: string): boolean {
   })
 }
 
-function checkRateLimit(ip: string): boolean {
-  const now = Date.now()
-  const clientData = rateLimitMap.get(ip)
-  
-  if (!clientData || now > clientData.resetTime) {
-    rateLimitMap.set(ip, { count: 1, resetTime: now + RATE_LIMIT_WINDOW })
-    return true
-  }
-  
-  if (clientData.count >= RATE_LIMIT_MAX_REQUESTS) {
-    return false
+function isStatsAuthorized(req: VercelRequest): boolean {
+  if (!STATS_TOKEN) return false
+  const given = Buffer.from(String(req.headers.authorization || ''))
+  const expected = Buffer.from(`Bearer ${STATS_TOKEN}`)
+  return given.length === expected.length && crypto.timingSafeEqual(given, expected)
+}
+
+class UpstreamError extends Error {
+  constructor(public status: number, public body: { error: string; message: string }) {
+    super(body.error)
   }
-  
-  clientData.count++
-  return true
 }
 
-export default async function handler(req: VercelRequest, res: VercelResponse) {
-  // Get client IP for rate limiting
-  const clientIP = req.headers['x-forwarded-for'] as string || 
-                   req.headers['x-real-ip'] as string || 
-                   req.connection?.remoteAddress || 
-                   'unknown'
+// Streaming is opted into with ?stream=1 or an audio Accept header; everything
+// else keeps the original JSON + data URL response for older widget builds.
+function wantsStream(req: VercelRequest): boolean {
+  const stream = req.query?.stream
+  if (stream === '1' || stream === 'true') return true
+  const accept = (req.headers.accept || '').toLowerCase()
+  return accept.startsWith('audio/')
+}
 
+export default async function handler(req: VercelRequest, res: VercelResponse) {
   // Set CORS headers
   const origin = req.headers.origin || ''
   if (isAllowedOrigin(origin)) {
@@ -61,29 +83,51 @@ export default async function handler(req: VercelRequest, res: VercelResponse) {
     res.setHeader('Access-Control-Allow-Origin', 'https://odia.dev')
   }
   
-  res.setHeader('Access-Control-Allow-Methods', 'POST, OPTIONS')
+  res.setHeader('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
   res.setHeader('Access-Control-Allow-Headers', 'Content-Type, Authorization')
+  res.setHeader('Access-Control-Expose-Headers', 'RateLimit-Limit, RateLimit-Remaining, RateLimit-Reset, RateLimit-Policy, Retry-After, X-TTS-Cache')
   res.setHeader('Access-Control-Max-Age', '86400')
 
   if (req.method === 'OPTIONS') {
     return res.status(200).end()
   }
 
-  if (req.method !== 'POST') {
+  if (req.method === 'GET' && req.query?.stats) {
+    if (!isStatsAuthorized(req)) {
+      return res.status(401).json({ error: 'Unauthorized' })
+    }
+    return res.status(200).json({
+      cache: ttsCache.stats(),
+      rateLimit: getRateLimitStore().stats(),
+      upstream: upstreamStats()
+    })
+  }
+
+  // GET is only for streaming, so an <audio src> can play while audio arrives
+  const streaming = wantsStream(req)
+  if (req.method !== 'POST' && !(req.method === 'GET' && streaming)) {
     return res.status(405).json({ error: 'Method not allowed' })
   }
 
   // Rate limiting check
-  if (!checkRateLimit(clientIP)) {
+  const requestText = (req.method === 'GET' ? req.query : req.body)?.text
+  const cost = typeof requestText === 'string'
+    ? Math.min(1, Math.max(MIN_TTS_COST, requestText.length / TTS_CHARS_PER_TOKEN))
+    : 1
+  const rateLimit = await checkRateLimit(req, res, { ...RATE_LIMIT, cost })
+  if (!rateLimit.allowed) {
     return res.status(429).json({ 
       error: 'Rate limit exceeded',
       message: 'Too many requests. Please try again later.',
-      retryAfter: RATE_LIMIT_WINDOW / 1000
+      retryAfter: rateLimit.retryAfterSeconds
     })
   }
 
   try {
-    const { text, voice_id = DEFAULT_VOICE_ID, format = FORMAT } = req.body
+    const params = req.method === 'GET' ? req.query : req.body
+    const text = params?.text
+    const voice_id = typeof params?.voice_id === 'string' ? params.voice_id : DEFAULT_VOICE_ID
+    const format = typeof params?.format === 'string' ? params.format : FORMAT
 
     // Input validation
     if (!text || typeof text !== 'string') {
@@ -103,93 +147,186 @@ export default async function handler(req: VercelRequest, res: VercelResponse) {
     const validVoices = ['naija_female_warm', 'naija_male_strong']
     const selectedVoice = validVoices.includes(voice_id) ? voice_id : DEFAULT_VOICE_ID
 
-    // Call ODIADEV TTS API with timeout
-    const controller = new AbortController()
-    const timeoutId = setTimeout(() => controller.abort(), 10000) // 10 second timeout
+    const audioFormat = format.toLowerCase()
+    const key = audioCacheKey(text, selectedVoice, audioFormat)
+
+    // The first request for a phrase calls upstream (streaming it through when
+    // asked to); identical requests meanwhile wait for it, later ones hit the cache.
+    // The upstream read fills the cache at its own pace: this response only gets
+    // a copy through `relay`, so a slow or vanished client cannot hold up the
+    // requests coalesced onto it.
+    let relay: PassThrough | undefined
+    let relayed: Promise<void> | undefined
+    const onChunk = (chunk: Buffer) => {
+      if (!relay) {
+        res.status(200)
+        res.setHeader('Content-Type', AUDIO_MIME_TYPES[audioFormat] || 'application/octet-stream')
+        res.setHeader('Cache-Control', 'no-store')
+        res.setHeader('X-Content-Type-Options', 'nosniff')
+        res.setHeader('X-TTS-Cache', 'miss')
+        relay = new PassThrough()
+        // pipeline() waits on drain and gives up on close/error; the cache fill carries on either way
+        relayed = pipeline(relay, res).catch(() => {})
+      }
+      if (!relay.destroyed) relay.write(chunk)
+    }
 
+    let audio: Buffer
+    let source: string
     try {
-      const ttsResponse = await fetch(TTS_API_URL, {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-          'x-api-key': TTS_API_KEY,
-        },
-        body: JSON.stringify({
-          text: text.trim(),
-          voice_id: selectedVoice,
-          format: format.toLowerCase()
-        }),
-        signal: controller.signal
+      ({ audio, source } = await ttsCache.load(key, () =>
+        synthesize(text.trim(), selectedVoice, audioFormat, streaming ? onChunk : undefined)))
+    } catch (error) {
+      if (relay) {
+        // Failed mid-stream; the client already has a partial body
+        console.error('TTS stream interrupted:', error)
+        relay.destroy()
+        return
+      }
+      throw error
+    }
+
+    if (relay) {
+      relay.end()
+      return relayed
+    }
+    res.setHeader('X-TTS-Cache', source)
+
+    if (streaming) {
+      res.setHeader('Content-Type', AUDIO_MIME_TYPES[audioFormat] || 'application/octet-stream')
+      res.setHeader('Cache-Control', 'no-store')
+      res.setHeader('X-Content-Type-Options', 'nosniff')
+      return res.status(200).end(audio)
+    }
+
+    const base64Audio = audio.toString('base64')
+
+    // Return as data URL for immediate playback
+    const audioUrl = `data:audio/${format};base64,${base64Audio}`
+
+    return res.status(200).json({
+      audioUrl,
+      format: audioFormat,
+      voice_id: selectedVoice,
+      text: text.substring(0, 100) + (text.length > 100 ? '...' : ''),
+      size: audio.byteLength,
+      timestamp: new Date().toISOString()
+    })
+
+  } catch (error) {
+    if (error instanceof UpstreamError) {
+      return res.status(error.status).json(error.body)
+    }
+
+    if (error instanceof Error && error.name === 'AbortError') {
+      return res.status(504).json({ 
+        error: 'TTS service timeout',
+        message: 'The TTS service took too long to respond. Please try again.'
       })
+    }
 
-      clearTimeout(timeoutId)
-
-      if (!ttsResponse.ok) {
-        const errorText = await ttsResponse.text()
-        console.error('ODIADEV TTS API Error:', ttsResponse.status, errorText)
-        
-        if (ttsResponse.status === 401) {
-          return res.status(500).json({ 
-            error: 'TTS service authentication failed',
-            message: 'Service configuration error'
-          })
-        }
-        
-        if (ttsResponse.status === 429) {
-          return res.status(429).json({ 
-            error: 'TTS service rate limited',
-            message: 'TTS service is temporarily unavailable. Please try again later.'
-          })
-        }
-        
-        return res.status(502).json({ 
-          error: 'TTS service unavailable',
-          message: 'The text-to-speech service is temporarily down. Please try again later.'
-        })
-      }
+    console.error('TTS Handler Error:', error)
+    return res.status(500).json({ 
+      error: 'Internal server error',
+      message: 'An unexpected error occurred. Please try again later.'
+    })
+  }
+}
+
+// Call ODIADEV TTS API with timeout; non-2xx responses become UpstreamErrors
+async function fetchSpeech(text: string, voiceId: string, format: string): Promise<Response> {
+  const controller = new AbortController()
+  const timeoutId = setTimeout(() => controller.abort(), 10000) // 10 second timeout
 
-      // Get the audio data
-      const audioBuffer = await ttsResponse.arrayBuffer()
+  try {
+    const ttsResponse = await upstreamFetch(TTS_API_URL, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        'x-api-key': TTS_API_KEY,
+      },
+      body: JSON.stringify({
+        text,
+        voice_id: voiceId,
+        format
+      }),
+      signal: controller.signal
+    })
+
+    if (!ttsResponse.ok) {
+      const errorText = await ttsResponse.text()
+      console.error('ODIADEV TTS API Error:', ttsResponse.status, errorText)
       
-      if (audioBuffer.byteLength === 0) {
-        return res.status(502).json({ 
-          error: 'Empty audio response',
-          message: 'The TTS service returned empty audio data'
+      if (ttsResponse.status === 401) {
+        throw new UpstreamError(500, { 
+          error: 'TTS service authentication failed',
+          message: 'Service configuration error'
         })
       }
-
-      const base64Audio = Buffer.from(audioBuffer).toString('base64')
       
-      // Return as data URL for immediate playback
-      const audioUrl = `data:audio/${format};base64,${base64Audio}`
-
-      return res.status(200).json({
-        audioUrl,
-        format: format.toLowerCase(),
-        voice_id: selectedVoice,
-        text: text.substring(0, 100) + (text.length > 100 ? '...' : ''),
-        size: audioBuffer.byteLength,
-        timestamp: new Date().toISOString()
-      })
-
-    } catch (fetchError) {
-      clearTimeout(timeoutId)
-      
-      if (fetchError instanceof Error && fetchError.name === 'AbortError') {
-        return res.status(504).json({ 
-          error: 'TTS service timeout',
-          message: 'The TTS service took too long to respond. Please try again.'
+      if (ttsResponse.status === 429) {
+        throw new UpstreamError(429, { 
+          error: 'TTS service rate limited',
+          message: 'TTS service is temporarily unavailable. Please try again later.'
         })
       }
       
-      throw fetchError
+      throw new UpstreamError(502, { 
+        error: 'TTS service unavailable',
+        message: 'The text-to-speech service is temporarily down. Please try again later.'
+      })
     }
 
-  } catch (error) {
-    console.error('TTS Handler Error:', error)
-    return res.status(500).json({ 
-      error: 'Internal server error',
-      message: 'An unexpected error occurred. Please try again later.'
+    return ttsResponse
+  } finally {
+    clearTimeout(timeoutId)
+  }
+}
+
+// Synthesize `text` and read the whole clip, passing each chunk to `onChunk`
+// as it arrives (chunked transfer), so playback can start on the first chunk
+// instead of after the whole clip. Rejects if the stream breaks or stalls.
+async function synthesize(text: string, voiceId: string, format: string, onChunk?: (chunk: Buffer) => void): Promise<Buffer> {
+  const ttsResponse = await fetchSpeech(text, voiceId, format)
+  const chunks: Buffer[] = []
+  if (ttsResponse.body) {
+    const reader = ttsResponse.body.getReader()
+    for (;;) {
+      const { done, value } = await readWithTimeout(reader)
+      if (done) break
+      if (!value?.byteLength) continue
+      const chunk = Buffer.from(value)
+      chunks.push(chunk)
+      onChunk?.(chunk)
+    }
+  }
+
+  const audio = Buffer.concat(chunks)
+  if (audio.byteLength === 0) {
+    throw new UpstreamError(502, {
+      error: 'Empty audio response',
+      message: 'The TTS service returned empty audio data'
     })
   }
-}
\ No newline at end of file
+  return audio
+}
+
+// fetchSpeech's timeout ends once headers arrive; this bounds each body read
+async function readWithTimeout(reader: ReadableStreamDefaultReader<Uint8Array>) {
+  let timeoutId: ReturnType<typeof setTimeout> | undefined
+  const stalled = new Promise<never>((_, reject) => {
+    timeoutId = setTimeout(() => {
+      const error = new Error('TTS audio stream stalled')
+      error.name = 'AbortError'
+      reject(error)
+    }, STREAM_IDLE_TIMEOUT_MS)
+  })
+  try {
+    return await Promise.race([reader.read(), stalled])
+  } catch (error) {
+    reader.cancel().catch(() => {})
+    throw error
+  } finally {
+    clearTimeout(timeoutId)
+  }
+}
@@ -12,19 +12,16 @@ const PORT = 3001
 // Middleware
 app.use(cors())
 app.use(express.json())
+app.use(express.text()) // sendBeacon posts event batches as text/plain
+app.use(express.raw({ type: 'application/octet-stream', limit: '1mb' })) // streamed STT chunks
 
 // Mock API endpoints for development
-app.post('/api/chat', (req, res) => {
-  console.log('Chat API called:', req.body)
-  
-  const { messages } = req.body;
-  const lastMessage = messages && messages.length > 0 ? messages[messages.length - 1] : null;
-  
+function devReply(text) {
   // Simple response based on last message
   let reply = "Hello! I'm ODIADEV's voice assistant. How can I help you today?";
   
-  if (lastMessage && lastMessage.content) {
-    const content = lastMessage.content.toLowerCase();
+  if (text) {
+    const content = text.toLowerCase();
     if (content.includes('hello') || content.includes('hi')) {
       reply = "Hello! Welcome to ODIADEV. I'm here to help you with voice AI solutions.";
     } else if (content.includes('voice') || content.includes('ai')) {
@@ -32,52 +29,163 @@ app.post('/api/chat', (req, res) => {
     } else if (content.includes('demo') || content.includes('test')) {
       reply = "I'd be happy to help you test our voice capabilities. Try speaking into the microphone!";
     } else {
-      reply = `I understand you're asking about "${lastMessage.content}". Let me help you with that.`;
+      reply = `I understand you're asking about "${text}". Let me help you with that.`;
     }
   }
+  return reply
+}
+
+app.post('/api/chat', (req, res) => {
+  console.log('Chat API called:', req.body)
   
-  res.json({
-    reply: reply
-  });
+  // Offline queue replay: { batch: [{ key, message, sessionId }] }
+  if (Array.isArray(req.body.batch)) {
+    return res.json({
+      results: req.body.batch.map(item => ({ key: item.key, reply: devReply(item.message), sessionId: item.sessionId }))
+    })
+  }
+
+  const { messages, message } = req.body;
+  const lastMessage = messages && messages.length > 0 ? messages[messages.length - 1] : null;
+  const reply = devReply(lastMessage ? lastMessage.content : message)
+
+  // Streaming variant (see api/chat.ts): the reply word by word as `delta` events, then `done`
+  if (req.query.stream === '1' || (req.headers.accept || '').includes('text/event-stream')) {
+    res.writeHead(200, { 'Content-Type': 'text/event-stream; charset=utf-8', 'Cache-Control': 'no-cache' })
+    const send = (event, data) => res.write(`event: ${event}\ndata: ${JSON.stringify(data)}\n\n`)
+    const words = reply.match(/\S+\s*/g) || []
+    let i = 0
+    const timer = setInterval(() => {
+      if (i < words.length) return send('delta', { text: words[i++] })
+      clearInterval(timer)
+      send('done', { reply, source: 'dev-server' })
+      res.end()
+    }, 30)
+    res.on('close', () => clearInterval(timer))
+    return
+  }
+
+  res.json({ reply });
+})
+
+// Summary stand-in for api/brain/summarize: whole transcript or incremental turns
+app.post('/api/brain/summarize', (req, res) => {
+  const { transcript, turns } = req.body || {}
+  const text = Array.isArray(turns) ? turns.map(turn => turn.content || '').join(' ') : String(transcript || '')
+  res.json({ summary: text.split(/\s+/).slice(0, 50).join(' '), topics: [] })
 })
 
 app.post('/api/events', (req, res) => {
-  console.log('Events API called:', req.body)
+  let body = req.body
+  if (typeof body === 'string') {
+    try { body = JSON.parse(body) } catch { return res.status(400).json({ error: 'Invalid JSON' }) }
+  }
+  const events = Array.isArray(body) ? body : Array.isArray(body?.events) ? body.events : [body]
+  console.log(`Events API called: ${events.length} event(s)`, events.map(e => e?.type))
   
-  // Mock successful response
-  res.json({
+  // Mock successful response - accepted for forwarding, like the real handler
+  res.status(202).json({
     ok: true,
-    message: 'Event processed successfully'
+    accepted: events.length
   })
 })
 
-app.post('/api/tts', (req, res) => {
-  console.log('TTS API called:', req.body)
+const ttsHandler = (req, res) => {
+  const params = req.method === 'GET' ? req.query : req.body
+  console.log('TTS API called:', params)
   
-  const { text, voice_id } = req.body
+  const { text, voice_id } = params
+  const mockAudio = Buffer.from(`Mock audio for: ${text} with voice: ${voice_id}`)
   
-  // Mock audio response - simulate real TTS
-  const mockAudio = Buffer.from(`Mock audio for: ${text} with voice: ${voice_id}`).toString('base64')
+  // Streaming mode - raw audio/mpeg, chunked like the real handler
+  const accept = String(req.headers.accept || '')
+  if (req.query.stream === '1' || req.query.stream === 'true' || accept.startsWith('audio/')) {
+    res.setHeader('Content-Type', 'audio/mpeg')
+    res.setHeader('Cache-Control', 'no-store')
+    res.write(mockAudio.subarray(0, 16))
+    res.end(mockAudio.subarray(16))
+    return
+  }
   
+  // Mock audio response - simulate real TTS
   res.json({
-    audioUrl: `data:audio/mpeg;base64,${mockAudio}`
+    audioUrl: `data:audio/mpeg;base64,${mockAudio.toString('base64')}`
   })
-})
+}
+
+app.get('/api/tts', ttsHandler)
+app.post('/api/tts', ttsHandler)
 
 // Mock STT API
+const mockTranscription = "Hello, this is a mock transcription from the development server"
+const sttSessions = new Map()
+
 app.post('/api/stt', (req, res) => {
+  // Streaming mode - one word of partial transcript per ~4 KB of audio, like the deterministic engine
+  const { session, seq, final } = req.query
+  if (session) {
+    const words = mockTranscription.split(' ')
+    if (final) {
+      sttSessions.delete(session)
+      return res.json({ text: mockTranscription, final: true, confidence: 0.95, language: 'en', session })
+    }
+    const received = (sttSessions.get(session) || 0) + (Buffer.isBuffer(req.body) ? req.body.length : 0)
+    sttSessions.set(session, received)
+    return res.json({
+      text: words.slice(0, Math.floor(received / 4000)).join(' '),
+      final: false,
+      confidence: 0.6,
+      language: 'en',
+      seq: Number(seq),
+      session
+    })
+  }
+  
   console.log('STT API called:', req.body)
   
   const { audioBase64, mimeType } = req.body
   
   // Mock transcription response
-  const mockTranscription = "Hello, this is a mock transcription from the development server"
-  
   res.json({
     text: mockTranscription
   })
 })
 
+// Shared rate limit store stand-in for RATE_LIMIT_STORE_URL=http://localhost:3001/_ratelimit.
+// Same token bucket as MemoryStore in api/_lib/rateLimit.ts, so every local
+// function instance draws from one set of buckets.
+const RATE_LIMIT_MAX_KEYS = Number(process.env.RATE_LIMIT_MAX_KEYS) || 10000
+const rateLimitBuckets = new Map()
+
+app.post('/_ratelimit', (req, res) => {
+  const { key, limit, windowMs, cost = 1 } = req.body
+  if (!key || !(limit > 0) || !(windowMs > 0) || !(cost > 0)) {
+    return res.status(400).json({ error: 'key, limit and windowMs are required, and cost must be positive' })
+  }
+  
+  const now = Date.now()
+  const rate = limit / windowMs
+  const bucket = rateLimitBuckets.get(key)
+  let tokens = bucket ? Math.min(limit, bucket.tokens + (now - bucket.updated) * rate) : limit
+  const allowed = tokens >= cost
+  if (allowed) tokens -= cost
+  
+  rateLimitBuckets.delete(key)
+  rateLimitBuckets.set(key, { tokens, updated: now })
+  for (const oldest of rateLimitBuckets.keys()) {
+    if (rateLimitBuckets.size <= RATE_LIMIT_MAX_KEYS) break
+    rateLimitBuckets.delete(oldest)
+  }
+  
+  res.json({
+    allowed,
+    limit,
+    remaining: Math.floor(tokens),
+    resetSeconds: Math.ceil((limit - tokens) / rate / 1000),
+    retryAfterSeconds: allowed ? 0 : Math.ceil((cost - tokens) / rate / 1000)
+  })
+})
+
 app.get('/healthz', (req, res) => {
   res.json({ ok: true, service: 'odiadev-dev-server' })
 })
@@ -99,6 +207,7 @@ app.listen(PORT, () => {
   console.log(`   POST /api/chat`)
   console.log(`   POST /api/events`)
   console.log(`   POST /api/tts`)
+  console.log(`   POST /_ratelimit`)
   console.log(`   GET /healthz`)
   console.log(`   GET /api/voices`)
 })
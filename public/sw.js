@@ -1,50 +1,105 @@
-// Adaqua AI Service Worker
-const CACHE_NAME = 'adaqua-ai-v1'
-const urlsToCache = [
-  '/',
-  '/static/js/bundle.js',
-  '/static/css/main.css',
-  '/manifest.json',
-  '/icons/icon-192x192.png',
-  '/icons/icon-512x512.png'
-]
-
-// Install event
+// ODIADEV Service Worker
+//
+// Precaches the hashed Vite build and routes requests by strategy:
+//   navigations          stale-while-revalidate, falling back to the precached shell
+//   /api/tts?canned=1    cache-first (fixed phrases such as the widget greeting)
+//   other /api/*         network-only (chat replies, events, STT are never cached)
+//   precached assets     cache-first
+//
+// The manifest placeholder below is filled in at build time by the
+// precache-manifest plugin in vite.config.ts with { version, urls }. Caches are
+// named by version and anything else with our prefix is deleted on activate.
+// That includes the pages cache: a page cached by an older build references
+// hashed chunks the new precache no longer has.
+const MANIFEST = self.__PRECACHE_MANIFEST || { version: 'dev', urls: [] }
+
+const PREFIX = 'odiadev-'
+const PRECACHE = `${PREFIX}precache-${MANIFEST.version}`
+const PAGES = `${PREFIX}pages-${MANIFEST.version}`
+const AUDIO = `${PREFIX}tts-v1`
+const CURRENT = new Set([PRECACHE, PAGES, AUDIO])
+// Caches left behind by the CRA-era worker
+const LEGACY = /^adaqua-ai-/
+
+const MAX_AUDIO_ENTRIES = 30
+const PRECACHED = new Set(MANIFEST.urls)
+
 self.addEventListener('install', (event) => {
   event.waitUntil(
-    caches.open(CACHE_NAME)
-      .then((cache) => {
-        console.log('Opened cache')
-        return cache.addAll(urlsToCache)
-      })
+    caches.open(PRECACHE)
+      .then((cache) => cache.addAll(MANIFEST.urls.map((url) => new Request(url, { cache: 'reload' }))))
+      .then(() => self.skipWaiting())
   )
 })
 
-// Fetch event
-self.addEventListener('fetch', (event) => {
-  event.respondWith(
-    caches.match(event.request)
-      .then((response) => {
-        // Return cached version or fetch from network
-        return response || fetch(event.request)
-      }
-    )
+self.addEventListener('activate', (event) => {
+  event.waitUntil(
+    caches.keys()
+      .then((names) => Promise.all(
+        names
+          .filter((name) => (name.startsWith(PREFIX) && !CURRENT.has(name)) || LEGACY.test(name))
+          .map((name) => caches.delete(name))
+      ))
+      .then(() => self.clients.claim())
   )
 })
 
-// Activate event
-self.addEventListener('activate', (event) => {
+async function staleWhileRevalidate(event) {
+  const cache = await caches.open(PAGES)
+  // Every route renders from the same SPA shell, so the precached one stands
+  // in until the route itself has been fetched once
+  const cached = await cache.match(event.request) || await caches.match('/', { cacheName: PRECACHE })
+  const network = fetch(event.request)
+  const update = network.then((response) => response.ok && cache.put(event.request, response.clone()))
+  event.waitUntil(update.catch(() => {}))
+  return cached || network
+}
+
+async function cacheFirst(request, cacheName) {
+  const cached = await caches.match(request, { cacheName })
+  return cached || fetch(request)
+}
+
+async function cannedAudio(request) {
+  const cache = await caches.open(AUDIO)
+  const cached = await cache.match(request.url)
+  if (cached) return cached
+
+  // <audio> asks for byte ranges; fetch and store the whole clip once instead
+  const response = await fetch(request.url)
+  if (response.status === 200) {
+    await cache.put(request.url, response.clone())
+    const keys = await cache.keys()
+    await Promise.all(keys.slice(0, Math.max(0, keys.length - MAX_AUDIO_ENTRIES)).map((key) => cache.delete(key)))
+  }
+  return response
+}
+
+self.addEventListener('fetch', (event) => {
+  const { request } = event
+  if (request.method !== 'GET') return
+
+  const url = new URL(request.url)
+  if (url.origin !== self.location.origin) return
+
+  if (url.pathname === '/api/tts' && url.searchParams.get('canned') === '1') {
+    event.respondWith(cannedAudio(request))
+  } else if (url.pathname.startsWith('/api/')) {
+    return // network-only
+  } else if (request.mode === 'navigate') {
+    event.respondWith(staleWhileRevalidate(event))
+  } else if (PRECACHED.has(url.pathname)) {
+    event.respondWith(cacheFirst(request, PRECACHE))
+  }
+})
+
+// Background Sync for the outbound queue (src/lib/outbox.ts). The queue and
+// its replay live in the page, so wake any open page to replay it; with no
+// page open it is replayed on the next visit.
+self.addEventListener('sync', (event) => {
+  if (event.tag !== 'odiadev-outbox') return
   event.waitUntil(
-    caches.keys().then((cacheNames) => {
-      return Promise.all(
-        cacheNames.map((cacheName) => {
-          if (cacheName !== CACHE_NAME) {
-            console.log('Deleting old cache:', cacheName)
-            return caches.delete(cacheName)
-          }
-        })
-      )
-    })
+    self.clients.matchAll({ type: 'window' })
+      .then((clients) => clients.forEach((client) => client.postMessage({ type: 'outbox-replay' })))
   )
 })
-
@@ -0,0 +1,75 @@
+// render-brain/qualify.js
+// Feature-based lead scoring, shared by /api/qualify and /api/qualify/batch.
+// Each feature adds a weighted amount to a 0-100 score; change WEIGHTS (and
+// bump SCORER_VERSION) to re-tune, then re-score history through the batch route.
+
+export const SCORER_VERSION = 2
+export const QUALIFY_THRESHOLD = 40
+
+const WEIGHTS = {
+  messageLength: 20,   // scaled by log length, saturating around 400 characters
+  intent: 8,           // per buying-intent keyword, capped at 3
+  channel: 6,          // per channel we sell (WhatsApp, phone, web...), capped at 2
+  urgency: 10,
+  businessEmail: 15,
+  phone: 10,
+  spam: -40,
+}
+
+const SOURCE_WEIGHTS = { referral: 15, website: 10, whatsapp: 10, telegram: 5, ads: 0 }
+
+const FREE_MAIL = new Set([
+  'gmail.com', 'yahoo.com', 'ymail.com', 'outlook.com', 'hotmail.com', 'live.com',
+  'icloud.com', 'aol.com', 'proton.me', 'protonmail.com', 'mail.com'
+])
+
+const INTENT = /\b(price|pricing|cost|quote|budget|demo|trial|buy|purchase|subscribe|contract|integrat\w*|deploy\w*|onboard\w*|customers?|clients?|sales|support team|call cent(?:er|re))\b/g
+const CHANNELS = /\b(whatsapp|telegram|instagram|phone calls?|ivr|website|web chat|sms)\b/g
+const URGENCY = /\b(asap|urgent\w*|immediately|this week|today|tomorrow|right away)\b/
+const LINKS = /https?:\/\//g
+const EMAIL = /^[^\s@]+@([^\s@]+\.[^\s@]+)$/
+
+function count(regex, text, cap) {
+  regex.lastIndex = 0
+  let n = 0
+  while (n < cap && regex.exec(text)) n++
+  return n
+}
+
+export function extractFeatures(lead) {
+  const message = String(lead.message || '')
+  const lower = message.toLowerCase()
+  const domain = (EMAIL.exec(String(lead.email || '').trim().toLowerCase()) || [])[1] || ''
+  const letters = message.replace(/[^a-z]/gi, '')
+  const upper = letters.replace(/[^A-Z]/g, '').length
+
+  return {
+    messageLength: Math.min(1, Math.log1p(message.length) / Math.log1p(400)),
+    intent: count(INTENT, lower, 3),
+    channel: count(CHANNELS, lower, 2),
+    urgency: URGENCY.test(lower) ? 1 : 0,
+    businessEmail: domain && !FREE_MAIL.has(domain) ? 1 : 0,
+    phone: String(lead.phone || '').replace(/\D/g, '').length >= 7 ? 1 : 0,
+    spam: count(LINKS, lower, 3) >= 3 || (letters.length > 20 && upper / letters.length > 0.7) ? 1 : 0,
+    source: SOURCE_WEIGHTS[String(lead.source || 'website').toLowerCase()] ?? 0,
+  }
+}
+
+export function scoreLead(lead) {
+  if (!lead || !lead.name || !lead.email) {
+    return { error: 'Missing name/email' }
+  }
+  const features = extractFeatures(lead)
+  let score = features.source
+  for (const [name, weight] of Object.entries(WEIGHTS)) {
+    score += weight * features[name]
+  }
+  score = Math.max(0, Math.min(100, Math.round(score)))
+  return {
+    qualified: score >= QUALIFY_THRESHOLD,
+    score,
+    features,
+    version: SCORER_VERSION,
+    notes: 'Feature score from Brain service',
+  }
+}
@@ -2,12 +2,109 @@
 import express from 'express'
 import compression from 'compression'
 import cors from 'cors'
+import { scoreLead } from './qualify.js'
+import { parseTurns, summarize, updateSession } from './summarize.js'
+
+const BATCH_PATH = '/api/qualify/batch'
+const MAX_LINE_CHARS = 1024 * 1024 // one NDJSON lead, same as the single-lead JSON limit
 
 const app = express()
-app.use(express.json({ limit: '1mb' }))
-app.use(compression())
+// The batch route streams results line by line; gzip would hold them back
+app.use(compression({ filter: (req, res) => req.path !== BATCH_PATH && compression.filter(req, res) }))
 app.use(cors({ origin: '*', methods: ['GET','POST'] }))
 
+// Batch qualify: takes a JSON array of leads (up to 50 MB) or an NDJSON stream
+// of any length, and streams one NDJSON result line per lead, in input order.
+// Registered before the 1 MB JSON parser so it can read its own body.
+app.post(BATCH_PATH, (req, res, next) => {
+  if (req.is('application/x-ndjson') || req.is('application/jsonl')) return qualifyNdjson(req, res)
+  express.json({ limit: '50mb' })(req, res, err => {
+    if (err) return next(err)
+    if (!Array.isArray(req.body)) return res.status(400).json({ error: 'Expected an array of leads' })
+    qualifyArray(req.body, res).catch(next)
+  })
+})
+
+function resultLine(index, lead) {
+  const result = scoreLead(lead)
+  const id = lead && lead.id !== undefined ? { id: lead.id } : {}
+  return JSON.stringify({ index, ...id, ...result }) + '\n'
+}
+
+// Resolves true when the client can take more output, false once it has gone away
+function drained(res) {
+  if (res.destroyed || res.writableEnded) return Promise.resolve(false)
+  return new Promise(resolve => {
+    const done = ok => {
+      res.off('drain', onDrain)
+      res.off('close', onClose)
+      resolve(ok)
+    }
+    const onDrain = () => done(true)
+    const onClose = () => done(false)
+    res.once('drain', onDrain)
+    res.once('close', onClose)
+  })
+}
+
+async function qualifyArray(leads, res) {
+  res.status(200).type('application/x-ndjson')
+  for (let i = 0; i < leads.length; i++) {
+    if (!res.write(resultLine(i, leads[i])) && !(await drained(res))) return
+  }
+  res.end()
+}
+
+function qualifyNdjson(req, res) {
+  res.status(200).type('application/x-ndjson')
+  let index = 0
+  let rest = ''
+  const handle = line => {
+    if (!line.trim()) return
+    let lead
+    try {
+      lead = JSON.parse(line)
+    } catch {
+      res.write(JSON.stringify({ index: index++, error: 'Invalid JSON' }) + '\n')
+      return
+    }
+    return res.write(resultLine(index++, lead))
+  }
+
+  // A line with no newline in sight would otherwise be buffered without limit
+  let stopped = false
+  const tooLong = () => {
+    stopped = true
+    const error = `NDJSON lines are limited to ${MAX_LINE_CHARS} characters`
+    if (res.headersSent) res.end(JSON.stringify({ index, error }) + '\n')
+    else res.status(413).json({ error })
+    req.resume() // discard the rest of the upload
+  }
+
+  req.setEncoding('utf8')
+  req.on('data', chunk => {
+    if (stopped) return
+    const lines = (rest + chunk).split('\n')
+    rest = lines.pop()
+    if (rest.length > MAX_LINE_CHARS) return tooLong()
+    let writable = true
+    for (const line of lines) writable = handle(line) !== false && writable
+    // Stop reading while the client is slow to take results
+    if (!writable) {
+      req.pause()
+      drained(res).then(ok => (ok ? req.resume() : req.destroy()))
+    }
+  })
+  req.on('end', () => {
+    if (stopped) return
+    handle(rest)
+    res.end()
+  })
+  req.on('error', () => res.end())
+}
+
+app.use(express.json({ limit: '1mb' }))
+
 // root + healthz for Render health checks
 app.get('/', (_req, res) => {
   res.type('text/plain').send('ODIADEV Brain OK')
@@ -16,21 +113,37 @@ app.get('/healthz', (_req, res) => {
   res.json({ ok: true, service: 'odiadev-brain' })
 })
 
-// Qualify endpoint (simple heuristic)
+// Qualify endpoint (one lead; same scorer as the batch route)
 app.post('/api/qualify', (req, res) => {
-  const { name, email, message = '', source = 'website' } = req.body || {}
-  if (!name || !email) return res.status(400).json({ error: 'Missing name/email' })
-  const score = Math.min(100, message.length + (source === 'website' ? 20 : 0))
-  res.json({ qualified: score >= 40, score, notes: 'Heuristic score from Brain service' })
+  const result = scoreLead(req.body)
+  if (result.error) return res.status(400).json(result)
+  res.json(result)
 })
 
-// Summarize endpoint (first 60 words)
+function timed(res, fn) {
+  const started = process.hrtime.bigint()
+  const result = fn()
+  const ms = Number(process.hrtime.bigint() - started) / 1e6
+  res.set('Server-Timing', `summarize;dur=${ms.toFixed(3)}`)
+  return result
+}
+
+// Summarize endpoint (extractive summary + topics of a whole transcript)
 app.post('/api/summarize', (req, res) => {
   const { transcript } = req.body || {}
   if (!transcript) return res.status(400).json({ error: 'Missing transcript' })
-  const words = String(transcript).split(/\s+/)
-  const summary = words.slice(0, 60).join(' ') + (words.length > 60 ? '…' : '')
-  res.json({ summary, topics: [] })
+  res.json(timed(res, () => summarize(transcript)))
+})
+
+// Incremental summarize: post only the new turns of a conversation; the
+// session's term counts and candidate sentences are kept between calls.
+app.post('/api/summarize/incremental', (req, res) => {
+  const { session_id, turns, transcript_delta, reset } = req.body || {}
+  if (!session_id) return res.status(400).json({ error: 'Missing session_id' })
+  const newTurns = Array.isArray(turns) ? turns : transcript_delta ? parseTurns(transcript_delta) : null
+  if (!newTurns) return res.status(400).json({ error: 'Missing turns or transcript_delta' })
+  const result = timed(res, () => updateSession(String(session_id), newTurns, { reset: !!reset }))
+  res.json({ ...result, session_id })
 })
 
 const port = process.env.PORT || 3000
@@ -0,0 +1,178 @@
+// render-brain/summarize.js
+// Extractive summaries and topics for chat transcripts.
+//
+// Sentences are scored by the weight of their content words across the whole
+// conversation (log term frequency, normalised by sentence length), and the
+// best few are returned in transcript order. Topics are the heaviest terms.
+//
+// All state is incremental and bounded, so adding a turn costs the same at
+// turn 10 as at turn 10,000: term counts are pruned at MAX_TERMS, the summary
+// is chosen from a pool of at most POOL_SIZE candidate sentences, and topics
+// come from a small candidate set kept up to date as counts change.
+
+const SUMMARY_SENTENCES = 3
+const TOPICS = 5
+const POOL_SIZE = 40
+const TOPIC_CANDIDATES = 25
+const MAX_TERMS = 5000
+const MIN_SENTENCE_WORDS = 4
+const USER_BOOST = 1.2 // what the visitor says carries more of the conversation
+
+const STOPWORDS = new Set(`a about above after again all also am an and any are as at be because been before
+being below between both but by can could did do does doing down during each few for from further had has
+have having he her here hers him his how i if in into is it its itself just let me more most my no nor not
+now of off on once only or other our ours out over own same she should so some such than that the their
+theirs them then there these they this those through to too under until up very was we were what when where
+which while who whom why will with would you your yours yourself hello hi hey thanks thank please okay ok
+yes yeah sure well like get got want need know think really can't don't i'm it's that's i'll we're you're`.split(/\s+/))
+
+const TURN = /^\s*(user|assistant|agent|bot|customer|visitor)\s*:\s*/i
+const SENTENCE_END = /(?<=[.!?])\s+/
+
+export function tokenize(text) {
+  return (String(text).toLowerCase().match(/[a-z][a-z'-]+/g) || [])
+    .filter(word => word.length > 2 && !STOPWORDS.has(word))
+}
+
+export function createState() {
+  return { turns: 0, sentences: 0, terms: new Map(), pool: [], topics: new Map() }
+}
+
+function weight(state, term) {
+  return Math.log1p(state.terms.get(term) || 0)
+}
+
+function scoreSentence(state, sentence) {
+  let score = 0
+  for (const term of sentence.terms) score += weight(state, term)
+  return (score / Math.sqrt(sentence.terms.length)) * (sentence.role === 'user' ? USER_BOOST : 1)
+}
+
+// Keep the TOPIC_CANDIDATES most frequent terms; O(TOPIC_CANDIDATES) per update
+function noteTopic(state, term, count) {
+  const { topics } = state
+  if (topics.has(term) || topics.size < TOPIC_CANDIDATES) {
+    topics.set(term, count)
+    return
+  }
+  let minTerm = null
+  let minCount = Infinity
+  for (const [candidate, n] of topics) {
+    if (n < minCount) {
+      minTerm = candidate
+      minCount = n
+    }
+  }
+  if (count > minCount) {
+    topics.delete(minTerm)
+    topics.set(term, count)
+  }
+}
+
+// Drop the rarest terms once the vocabulary is full; amortised O(1) per term
+function pruneTerms(state) {
+  const keep = Math.floor(MAX_TERMS * 0.8)
+  const sorted = [...state.terms].sort((a, b) => b[1] - a[1])
+  state.terms = new Map(sorted.slice(0, keep))
+}
+
+export function addTurn(state, role, content) {
+  state.turns++
+  for (const text of String(content).split(SENTENCE_END)) {
+    const trimmed = text.trim()
+    if (!trimmed) continue
+    const terms = tokenize(trimmed)
+    for (const term of terms) {
+      const count = (state.terms.get(term) || 0) + 1
+      state.terms.set(term, count)
+      noteTopic(state, term, count)
+    }
+    if (state.terms.size > MAX_TERMS) pruneTerms(state)
+
+    const distinct = [...new Set(terms)]
+    if (trimmed.split(/\s+/).length < MIN_SENTENCE_WORDS || distinct.length === 0) continue
+    const sentence = { text: trimmed, role, order: state.sentences++, terms: distinct }
+
+    // Candidate pool: rescored against current weights, weakest dropped
+    state.pool.push(sentence)
+    if (state.pool.length > POOL_SIZE) {
+      let weakest = 0
+      let weakestScore = Infinity
+      state.pool.forEach((candidate, i) => {
+        const score = scoreSentence(state, candidate)
+        if (score < weakestScore) {
+          weakest = i
+          weakestScore = score
+        }
+      })
+      state.pool.splice(weakest, 1)
+    }
+  }
+  return state
+}
+
+export function parseTurns(transcript) {
+  const turns = []
+  for (const line of String(transcript).split(/\n+/)) {
+    if (!line.trim()) continue
+    const match = TURN.exec(line)
+    if (match) {
+      const role = match[1].toLowerCase()
+      turns.push({ role: role === 'user' || role === 'customer' || role === 'visitor' ? 'user' : 'assistant',
+                   content: line.slice(match[0].length) })
+    } else if (turns.length) {
+      turns[turns.length - 1].content += ' ' + line.trim()
+    } else {
+      turns.push({ role: 'user', content: line })
+    }
+  }
+  return turns
+}
+
+export function summarizeState(state) {
+  const picked = state.pool
+    .map(sentence => ({ sentence, score: scoreSentence(state, sentence) }))
+    .sort((a, b) => b.score - a.score)
+    .slice(0, SUMMARY_SENTENCES)
+    .map(({ sentence }) => sentence)
+    .sort((a, b) => a.order - b.order)
+
+  const topics = [...state.topics]
+    .filter(([term]) => state.terms.has(term))
+    .sort((a, b) => b[1] - a[1])
+    .slice(0, TOPICS)
+    .map(([term]) => term)
+
+  return { summary: picked.map(s => s.text).join(' '), topics, turns: state.turns }
+}
+
+export function summarize(transcript) {
+  const state = createState()
+  for (const { role, content } of parseTurns(transcript)) addTurn(state, role, content)
+  return summarizeState(state)
+}
+
+// Incremental sessions: callers post new turns under a session_id and get the
+// updated summary without resending the transcript. Least recently used
+// sessions are dropped past MAX_SESSIONS or after SESSION_TTL_MS idle.
+
+const MAX_SESSIONS = 2000
+const SESSION_TTL_MS = 2 * 60 * 60 * 1000
+const sessions = new Map()
+
+export function updateSession(sessionId, turns, { reset = false } = {}) {
+  const now = Date.now()
+  let entry = sessions.get(sessionId)
+  if (!entry || reset || now - entry.touched > SESSION_TTL_MS) {
+    entry = { state: createState(), touched: now }
+  }
+  sessions.delete(sessionId)
+  entry.touched = now
+  sessions.set(sessionId, entry)
+  if (sessions.size > MAX_SESSIONS) sessions.delete(sessions.keys().next().value)
+
+  for (const { role, content } of turns) {
+    addTurn(entry.state, role === 'user' ? 'user' : 'assistant', content || '')
+  }
+  return summarizeState(entry.state)
+}
@@ -1,6 +1,10 @@
 import React, { useState, useRef, useEffect } from 'react'
 import { motion, AnimatePresence } from 'framer-motion'
 import { Mic, MicOff, Send, Volume2, VolumeX, X, MessageCircle, User, Bot } from 'lucide-react'
+import { enqueue, onReplayed } from '../../lib/outbox'
+import { onPlaybackChange, playClip, unlockAudioContext } from '../../lib/audio'
+import { cancelSpeech, speakPipelined } from '../../lib/speech'
+import { streamChat } from '../../lib/chatStream'
 
 interface Message {
   id: string
@@ -21,6 +25,11 @@ const VOICE_OPTIONS: VoiceOption[] = [
   { id: 'naija_male_strong', name: 'Naija Male (Strong)', gender: 'male' }
 ]
 
+const WELCOME_MESSAGE = "Hello! I'm Agent ODIADEV, your AI assistant. How can I help you today?"
+
+// Fixed phrases whose audio the service worker may cache (see public/sw.js)
+const CANNED_PHRASES = new Set([WELCOME_MESSAGE])
+
 const AdaquaChatWidget = () => {
   const [isOpen, setIsOpen] = useState(false)
   const [messages, setMessages] = useState<Message[]>([])
@@ -53,6 +62,17 @@ const AdaquaChatWidget = () => {
     }
   }, [])
 
+  // Clips played through the Web Audio engine report their own start and end
+  useEffect(() => onPlaybackChange(setIsPlaying), [])
+
+  // Replies to messages queued while offline arrive when the outbox replays
+  useEffect(() => onReplayed('chat-widget', (_item, result) => {
+    const reply = (result as { reply?: string } | undefined)?.reply
+    if (reply) {
+      addMessage({ content: reply, role: 'assistant', isAudio: true })
+    }
+  }), [])
+
   // Scroll to bottom when new messages arrive
   useEffect(() => {
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' })
@@ -62,7 +82,7 @@ const AdaquaChatWidget = () => {
   useEffect(() => {
     if (messages.length === 0) {
       addMessage({
-        content: "Hello! I'm Agent ODIADEV, your AI assistant. How can I help you today?",
+        content: WELCOME_MESSAGE,
         role: 'assistant',
         isAudio: true
       })
@@ -79,20 +99,36 @@ const AdaquaChatWidget = () => {
     return newMessage
   }
 
-  const playAudio = async (audioUrl: string) => {
+  const updateMessage = (id: string, content: string) => {
+    setMessages(prev => prev.map(message => message.id === id ? { ...message, content } : message))
+  }
+
+  // Plays through the decoded-clip engine (src/lib/audio.ts), so a clip heard
+  // before under the same key plays again without a fetch or decode. The
+  // <audio> element is the fallback where the clip cannot be decoded.
+  const playAudio = async (audioUrl: string, key = audioUrl): Promise<boolean> => {
+    try {
+      await playClip(audioUrl, { key }) // false only means it was stopped first
+      return true
+    } catch (error) {
+      console.error('Audio decode failed:', error)
+    }
     if (audioRef.current) {
       audioRef.current.src = audioUrl
       setIsPlaying(true)
       try {
         await audioRef.current.play()
+        return true
       } catch (error) {
         console.error('Audio play failed:', error)
         setIsPlaying(false)
       }
     }
+    return false
   }
 
   const stopAudio = () => {
+    cancelSpeech()
     if (audioRef.current) {
       audioRef.current.pause()
       audioRef.current.currentTime = 0
@@ -143,48 +179,69 @@ const AdaquaChatWidget = () => {
     }
   }
 
+  // Speaks the reply sentence by sentence (src/lib/speech.ts), so audio starts
+  // once the first sentence is synthesized and replaying a message is instant;
+  // falls back to one JSON data URL for the whole reply if that fails.
+  const speak = async (text: string) => {
+    try {
+      await speakPipelined(text, { voiceId: selectedVoice.id, canned: CANNED_PHRASES.has(text) })
+      return
+    } catch (error) {
+      console.error('Sentence TTS failed:', error)
+    }
+
+    const audioUrl = await generateTTS(text)
+    if (audioUrl) {
+      await playAudio(audioUrl, `${selectedVoice.id}:${text}`)
+    }
+  }
+
   const sendToAI = async (text: string) => {
     setIsTyping(true)
     
+    // The reply is shown as it streams in: its message appears with the first
+    // piece of text and grows with each one after
+    let streamedId: string | null = null
+
     try {
       // Send to n8n webhook for AI processing
-      const response = await fetch('/api/chat', {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({
-          message: text,
-          sessionId: 'adaqua-session-' + Date.now()
-        })
+      const data = await streamChat('/api/chat', {
+        message: text,
+        sessionId: 'adaqua-session-' + Date.now()
+      }, (partial) => {
+        if (streamedId) {
+          updateMessage(streamedId, partial)
+          return
+        }
+        setIsTyping(false)
+        streamedId = addMessage({ content: partial, role: 'assistant', isAudio: true }).id
       })
-
-      if (!response.ok) {
-        throw new Error('AI API failed')
-      }
-
-      const data = await response.json()
       const aiResponse = data.reply || data.message || "I'm sorry, I couldn't process that request."
 
-      // Add AI response
-      const assistantMessage = addMessage({
-        content: aiResponse,
-        role: 'assistant',
-        isAudio: true
-      })
+      // Add AI response, or settle the streamed one on the final text
+      if (streamedId) {
+        updateMessage(streamedId, aiResponse)
+      } else {
+        addMessage({
+          content: aiResponse,
+          role: 'assistant',
+          isAudio: true
+        })
+      }
 
       // Generate and play TTS
       if (isVoiceEnabled) {
-        const audioUrl = await generateTTS(aiResponse)
-        if (audioUrl) {
-          await playAudio(audioUrl)
-        }
+        await speak(aiResponse)
       }
 
     } catch (error) {
       console.error('AI Error:', error)
+      // A reply that broke off mid-stream was delivered; queueing would send it twice
+      const queued = !streamedId && (!navigator.onLine || error instanceof TypeError)
+        && await enqueue('chat', { message: text, sessionId: 'adaqua-session-' + Date.now() }, { origin: 'chat-widget' })
+          .catch(() => false)
       addMessage({
-        content: isOffline 
+        content: queued
           ? "I'm offline right now. Your message has been queued and will be sent when I'm back online."
           : "I'm sorry, I'm having trouble connecting right now. Please try again.",
         role: 'assistant',
@@ -197,6 +254,7 @@ const AdaquaChatWidget = () => {
 
   const handleSendMessage = async () => {
     if (!inputText.trim()) return
+    unlockAudioContext()
 
     const userMessage = addMessage({
       content: inputText,
@@ -208,6 +266,9 @@ const AdaquaChatWidget = () => {
   }
 
   const startRecording = async () => {
+    // Barge-in: the user talking over a reply cuts it off
+    cancelSpeech()
+    unlockAudioContext()
     try {
       const stream = await navigator.mediaDevices.getUserMedia({ audio: true })
       const mediaRecorder = new MediaRecorder(stream, { mimeType: 'audio/webm' })
@@ -215,44 +276,84 @@ const AdaquaChatWidget = () => {
       mediaRecorderRef.current = mediaRecorder
       chunksRef.current = []
 
-      mediaRecorder.ondataavailable = (event) => {
-        if (event.data.size > 0) {
-          chunksRef.current.push(event.data)
+      // Stream chunks to /api/stt while recording so the transcript is
+      // (nearly) ready when the user stops talking
+      const sttSession = crypto.randomUUID()
+      const uploads: Promise<boolean>[] = []
+      let latestSeq = -1
+
+      const uploadChunk = async (chunk: Blob, seq: number) => {
+        try {
+          const response = await fetch(`/api/stt?session=${sttSession}&seq=${seq}`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/octet-stream' },
+            body: chunk
+          })
+          if (!response.ok) return false
+          const partial = await response.json()
+          if (partial.seq >= latestSeq && partial.text) {
+            latestSeq = partial.seq
+            setInputText(partial.text)
+          }
+          return true
+        } catch {
+          return false
         }
       }
 
-      mediaRecorder.onstop = async () => {
+      const transcribeWhole = async () => {
         const audioBlob = new Blob(chunksRef.current, { type: 'audio/webm' })
-        const audioUrl = URL.createObjectURL(audioBlob)
-        
+
         // Convert to base64 for STT
         const arrayBuffer = await audioBlob.arrayBuffer()
         const base64 = btoa(String.fromCharCode(...new Uint8Array(arrayBuffer)))
 
+        const sttResponse = await fetch('/api/stt', {
+          method: 'POST',
+          headers: {
+            'Content-Type': 'application/json',
+          },
+          body: JSON.stringify({
+            audioBase64: base64,
+            mimeType: 'audio/webm'
+          })
+        })
+        return sttResponse.ok ? sttResponse.json() : null
+      }
+
+      mediaRecorder.ondataavailable = (event) => {
+        if (event.data.size > 0) {
+          uploads.push(uploadChunk(event.data, chunksRef.current.length))
+          chunksRef.current.push(event.data)
+        }
+      }
+
+      mediaRecorder.onstop = async () => {
         // Send to STT API
         try {
-          const sttResponse = await fetch('/api/stt', {
-            method: 'POST',
-            headers: {
-              'Content-Type': 'application/json',
-            },
-            body: JSON.stringify({
-              audioBase64: base64,
-              mimeType: 'audio/webm'
-            })
-          })
+          const streamed = (await Promise.all(uploads)).every(Boolean)
+          let sttData = null
+          if (streamed) {
+            const finalResponse = await fetch(
+              `/api/stt?session=${sttSession}&final=1&chunks=${chunksRef.current.length}`,
+              { method: 'POST' }
+            )
+            sttData = finalResponse.ok ? await finalResponse.json() : null
+          }
+          // An incomplete stream (409) or an empty final transcript falls back to the whole recording
+          if (!(sttData?.text || sttData?.transcript)) {
+            sttData = await transcribeWhole()
+          }
 
-          if (sttResponse.ok) {
-            const sttData = await sttResponse.json()
-            const transcribedText = sttData.text || sttData.transcript
-
-            if (transcribedText) {
-              addMessage({
-                content: transcribedText,
-                role: 'user'
-              })
-              await sendToAI(transcribedText)
-            }
+          const transcribedText = sttData?.text || sttData?.transcript
+          setInputText('')
+
+          if (transcribedText) {
+            addMessage({
+              content: transcribedText,
+              role: 'user'
+            })
+            await sendToAI(transcribedText)
           }
         } catch (error) {
           console.error('STT Error:', error)
@@ -264,10 +365,9 @@ const AdaquaChatWidget = () => {
 
         // Clean up
         stream.getTracks().forEach(track => track.stop())
-        URL.revokeObjectURL(audioUrl)
       }
 
-      mediaRecorder.start()
+      mediaRecorder.start(250)
       setIsRecording(true)
     } catch (error) {
       console.error('Microphone access denied:', error)
@@ -393,9 +493,8 @@ const AdaquaChatWidget = () => {
                               if (isPlaying) {
                                 stopAudio()
                               } else {
-                                generateTTS(message.content).then(audioUrl => {
-                                  if (audioUrl) playAudio(audioUrl)
-                                })
+                                unlockAudioContext()
+                                speak(message.content)
                               }
                             }}
                             className="text-xs bg-white/20 px-2 py-1 rounded-full hover:bg-white/30 transition-colors"
@@ -449,7 +548,6 @@ const AdaquaChatWidget = () => {
                     onKeyPress={(e) => e.key === 'Enter' && handleSendMessage()}
                     placeholder="Type your message..."
                     className="w-full px-3 sm:px-4 py-2 text-sm border border-gray-300 rounded-full focus:outline-none focus:ring-2 focus:ring-blue-500 focus:border-transparent"
-                    disabled={isOffline}
                   />
                 </div>
                 
@@ -472,7 +570,7 @@ const AdaquaChatWidget = () => {
                 
                 <button
                   onClick={handleSendMessage}
-                  disabled={!inputText.trim() || isOffline}
+                  disabled={!inputText.trim()}
                   className="p-2 sm:p-3 bg-gradient-to-r from-blue-600 to-purple-600 text-white rounded-full disabled:opacity-50 disabled:cursor-not-allowed hover:scale-105 transition-transform"
                 >
                   <Send size={16} className="sm:w-5 sm:h-5" />
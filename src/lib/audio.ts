@@ -1,29 +1,173 @@
+// Web Audio playback engine for TTS clips.
+//
+// Clips are fetched and decoded into AudioBuffers once (fetch() unpacks data
+// URLs natively and decodeAudioData decodes off the main thread) and kept in a
+// small LRU, so a repeated phrase plays again without a fetch or a decode.
+// Playback goes through one shared, unlocked AudioContext: decodes run in
+// parallel, but clips are scheduled in the order they were queued, each to
+// start exactly when the previous one ends, so back-to-back clips are gapless.
+//
+// Every scheduled clip is also recorded as an 'odiadev:audio-clip' performance
+// mark (detail in performance.now() time) so tests can measure time to first
+// audio and the gaps between clips.
+
+const MAX_CACHED_CLIPS = 32;
+const MAX_CACHED_BYTES = 32 * 1024 * 1024; // decoded PCM is ~10x the mp3
+const SCHEDULE_AHEAD_S = 0.02; // headroom so a clip is never scheduled in the past
+
+type PlaybackListener = (playing: boolean) => void;
+
+let ctx: AudioContext | null = null;
 let unlocked = false;
+const decoded = new Map<string, AudioBuffer>(); // insertion order is LRU order
+let decodedBytes = 0;
+const decoding = new Map<string, Promise<AudioBuffer>>();
+const active = new Set<AudioBufferSourceNode>();
+const listeners = new Set<PlaybackListener>();
+let nextStartTime = 0;
+let generation = 0;
+let queue: Promise<unknown> = Promise.resolve();
+
+function getContext(): AudioContext | null {
+  if (!ctx) {
+    const Ctx = (window as any).AudioContext || (window as any).webkitAudioContext;
+    if (!Ctx) return null;
+    ctx = new Ctx() as AudioContext;
+  }
+  return ctx;
+}
 
+// Call from a user gesture; browsers keep the context suspended until one.
 export async function unlockAudioContext() {
   if (unlocked) return;
   try {
-    const Ctx = (window as any).AudioContext || (window as any).webkitAudioContext;
-    const ctx = new Ctx();
-    const buf = ctx.createBuffer(1, 1, 22050);
-    const src = ctx.createBufferSource();
-    src.buffer = buf;
-    src.connect(ctx.destination);
+    const context = getContext();
+    if (!context) return;
+    const src = context.createBufferSource();
+    src.buffer = context.createBuffer(1, 1, 22050);
+    src.connect(context.destination);
     src.start(0);
-    await ctx.resume();
+    await context.resume();
     unlocked = true;
   } catch { /* best-effort */ }
 }
 
-let queue: Promise<void> = Promise.resolve();
+function bufferBytes(buffer: AudioBuffer) {
+  return buffer.length * buffer.numberOfChannels * 4;
+}
+
+function remember(key: string, buffer: AudioBuffer) {
+  decoded.set(key, buffer);
+  decodedBytes += bufferBytes(buffer);
+  for (const [oldest, old] of decoded) {
+    if (oldest === key || (decoded.size <= MAX_CACHED_CLIPS && decodedBytes <= MAX_CACHED_BYTES)) break;
+    decoded.delete(oldest);
+    decodedBytes -= bufferBytes(old);
+  }
+}
 
-export function playDataUrl(dataUrl: string) {
-  queue = queue.then(async () => {
-    try {
-      await unlockAudioContext();
-      const a = new Audio(dataUrl);
-      await a.play();
-    } catch { /* ignore to keep queue alive */ }
+export function isClipCached(key: string) {
+  return decoded.has(key);
+}
+
+// The decoded clip for `source` (a data: or http URL), cached under `key`.
+// Concurrent requests for the same key share one fetch and decode; `signal`
+// aborts the fetch.
+export function decodeClip(source: string, key = source, signal?: AbortSignal): Promise<AudioBuffer> {
+  const cached = decoded.get(key);
+  if (cached) {
+    decoded.delete(key);
+    decoded.set(key, cached);
+    return Promise.resolve(cached);
+  }
+  const pending = decoding.get(key);
+  if (pending) return pending;
+
+  const context = getContext();
+  if (!context) return Promise.reject(new Error('Web Audio is not available'));
+  const promise = fetch(source, { signal })
+    .then((response) => {
+      if (!response.ok) throw new Error(`Audio fetch failed: ${response.status}`);
+      return response.arrayBuffer();
+    })
+    .then((data) => context.decodeAudioData(data))
+    .then((buffer) => {
+      remember(key, buffer);
+      return buffer;
+    })
+    .finally(() => decoding.delete(key));
+  decoding.set(key, promise);
+  return promise;
+}
+
+export function isPlaying() {
+  return active.size > 0;
+}
+
+export function onPlaybackChange(listener: PlaybackListener): () => void {
+  listeners.add(listener);
+  return () => {
+    listeners.delete(listener);
+  };
+}
+
+function markClip(context: AudioContext, startAt: number, duration: number) {
+  try {
+    const now = performance.now();
+    performance.mark('odiadev:audio-clip', {
+      detail: { scheduledAt: now, startTime: now + (startAt - context.currentTime) * 1000, duration: duration * 1000 },
+    });
+  } catch { /* mark detail is not supported everywhere */ }
+}
+
+function schedule(context: AudioContext, buffer: AudioBuffer) {
+  const startAt = Math.max(nextStartTime, context.currentTime + SCHEDULE_AHEAD_S);
+  const src = context.createBufferSource();
+  src.buffer = buffer;
+  src.connect(context.destination);
+  src.onended = () => {
+    active.delete(src);
+    if (active.size === 0) listeners.forEach(listener => listener(false));
+  };
+  src.start(startAt);
+  nextStartTime = startAt + buffer.duration;
+  active.add(src);
+  if (active.size === 1) listeners.forEach(listener => listener(true));
+  markClip(context, startAt, buffer.duration);
+}
+
+// Queue a clip behind whatever is playing or queued. Fetching and decoding
+// start right away. Resolves true once the clip is scheduled, false if
+// stopAudio() ran or `signal` aborted first; rejects if it cannot be fetched
+// or decoded.
+export function playClip(
+  source: string,
+  { key = source, signal }: { key?: string; signal?: AbortSignal } = {}
+): Promise<boolean> {
+  const current = generation;
+  const buffer = decodeClip(source, key, signal);
+  buffer.catch(() => {}); // surfaced through `scheduled` unless stopped first
+  const scheduled = queue.then(async () => {
+    if (current !== generation || signal?.aborted) return false;
+    const clip = await buffer;
+    if (current !== generation || signal?.aborted || !ctx) return false;
+    if (ctx.state === 'suspended') await ctx.resume().catch(() => {});
+    schedule(ctx, clip);
+    return true;
+  });
+  queue = scheduled.catch(() => false);
+  return scheduled;
+}
+
+// Stop what is playing and drop everything queued behind it.
+export function stopAudio() {
+  generation++;
+  nextStartTime = 0;
+  active.forEach((src) => {
+    try { src.stop(); } catch { /* already stopped */ }
   });
-  return queue;
+}
+
+export function playDataUrl(dataUrl: string) {
+  return playClip(dataUrl);
 }
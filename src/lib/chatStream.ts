@@ -0,0 +1,67 @@
+// Client side of the /api/chat stream (api/chat.ts). Asks for Server-Sent
+// Events and reports the reply as it grows: `delta` events carry the next
+// piece of text, `done` carries the final body. A server that does not stream
+// answers with the usual JSON body, which is returned as is.
+
+export interface ChatResult {
+  reply?: string
+  message?: string
+  source?: string
+  sessionId?: string
+  timestamp?: string
+}
+
+export async function streamChat(
+  url: string,
+  body: Record<string, unknown>,
+  onText: (text: string) => void
+): Promise<ChatResult> {
+  const response = await fetch(url, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      Accept: 'text/event-stream, application/json',
+    },
+    body: JSON.stringify(body),
+  })
+  if (!response.ok) {
+    throw new Error(`AI API failed: ${response.status}`)
+  }
+  if (!response.body || !(response.headers.get('content-type') || '').includes('text/event-stream')) {
+    return response.json()
+  }
+
+  const reader = response.body.getReader()
+  const decoder = new TextDecoder()
+  let pending = ''
+  let text = ''
+  let result: ChatResult | undefined
+
+  for (;;) {
+    const { done, value } = await reader.read()
+    pending += decoder.decode(value, { stream: !done })
+    const events = pending.split(/\r?\n\r?\n/)
+    pending = done ? '' : events.pop()!
+
+    for (const raw of events) {
+      let event = 'message'
+      const data: string[] = []
+      for (const line of raw.split(/\r?\n/)) {
+        if (line.startsWith('event:')) event = line.slice(6).trim()
+        else if (line.startsWith('data:')) data.push(line.slice(5).replace(/^ /, ''))
+      }
+      if (!data.length) continue
+      const payload = JSON.parse(data.join('\n'))
+      if (event === 'delta' && payload.text) {
+        text += payload.text
+        onText(text)
+      } else if (event === 'done') {
+        result = payload
+      }
+    }
+    if (done) break
+  }
+
+  // A stream cut off before `done` still delivered what it had
+  return result ?? { reply: text || undefined }
+}
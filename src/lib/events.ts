@@ -0,0 +1,130 @@
+// Buffers widget analytics events and posts them to /api/events in batches:
+// when FLUSH_SIZE events are waiting, after FLUSH_INTERVAL_MS, or with
+// sendBeacon when the page is hidden or unloaded. Failed batches go back to
+// the front of the buffer and are retried with backoff (honouring Retry-After).
+
+const EVENTS_URL = process.env.NODE_ENV === 'development'
+  ? 'http://localhost:3001/api/events'
+  : '/api/events'
+
+const FLUSH_SIZE = 20
+const FLUSH_INTERVAL_MS = 2000
+const MAX_BATCH = 100 // server limit per request
+const MAX_BUFFER = 500
+const MAX_BACKOFF_MS = 60000
+const KEEPALIVE_MAX_BYTES = 60000 // sendBeacon and keepalive fetch bodies are capped at 64 KB
+
+export interface TrackedEvent {
+  type: string
+  [key: string]: unknown
+}
+
+let buffer: TrackedEvent[] = []
+let timer: ReturnType<typeof setTimeout> | null = null
+let sending: Promise<void> | null = null
+let backoffMs = 0
+const encoder = new TextEncoder()
+
+// Size on the wire; string length counts UTF-16 units, not bytes
+function byteLength(payload: string) {
+  return encoder.encode(payload).byteLength
+}
+
+function schedule(delay: number) {
+  if (timer) return
+  timer = setTimeout(() => {
+    timer = null
+    flushEvents()
+  }, delay)
+}
+
+function requeue(batch: TrackedEvent[], retryAfterMs?: number) {
+  buffer = [...batch, ...buffer].slice(-MAX_BUFFER)
+  backoffMs = retryAfterMs ?? Math.min(MAX_BACKOFF_MS, Math.max(1000, backoffMs * 2))
+  schedule(backoffMs)
+}
+
+export function trackEvent(event: TrackedEvent) {
+  buffer.push({ ...event, clientTimestamp: new Date().toISOString() })
+  if (buffer.length > MAX_BUFFER) buffer.splice(0, buffer.length - MAX_BUFFER)
+
+  if (buffer.length >= FLUSH_SIZE && !backoffMs) {
+    flushEvents()
+  } else {
+    schedule(backoffMs || FLUSH_INTERVAL_MS)
+  }
+}
+
+export function flushEvents(): Promise<void> {
+  if (sending) {
+    // Events queued behind the in-flight batch go out right after it
+    return sending.then(() => (buffer.length && !backoffMs ? flushEvents() : undefined))
+  }
+  if (buffer.length === 0) return Promise.resolve()
+  if (timer) {
+    clearTimeout(timer)
+    timer = null
+  }
+
+  const batch = buffer.splice(0, MAX_BATCH)
+  const body = JSON.stringify(batch)
+  sending = (async () => {
+    try {
+      // keepalive lets a batch outlive the page, but the browser rejects
+      // keepalive bodies over 64 KB outright; larger ones go as a plain fetch
+      const response = await fetch(EVENTS_URL, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body,
+        keepalive: byteLength(body) <= KEEPALIVE_MAX_BYTES,
+      })
+      if (response.status === 429 || response.status >= 500) {
+        const retryAfter = Number(response.headers.get('Retry-After'))
+        requeue(batch, retryAfter > 0 ? retryAfter * 1000 : undefined)
+        return
+      }
+      backoffMs = 0
+    } catch (error) {
+      console.error('Error sending events:', error)
+      requeue(batch)
+    } finally {
+      sending = null
+    }
+    if (buffer.length) schedule(buffer.length >= FLUSH_SIZE ? 0 : FLUSH_INTERVAL_MS)
+  })()
+  return sending
+}
+
+// Last chance on page hide/unload: fetch may be cancelled, sendBeacon is not.
+// text/plain keeps the beacon a simple request (no CORS preflight).
+export function flushEventsWithBeacon() {
+  if (timer) {
+    clearTimeout(timer)
+    timer = null
+  }
+  while (buffer.length) {
+    let count = Math.min(buffer.length, MAX_BATCH)
+    let payload = JSON.stringify(buffer.slice(0, count))
+    while (byteLength(payload) > KEEPALIVE_MAX_BYTES && count > 1) {
+      count = Math.ceil(count / 2)
+      payload = JSON.stringify(buffer.slice(0, count))
+    }
+
+    // A single event over the cap (a long transcript) can only go as a plain
+    // fetch, which the browser may cancel as the page goes away
+    const fits = byteLength(payload) <= KEEPALIVE_MAX_BYTES
+    const queued = fits && typeof navigator !== 'undefined' && navigator.sendBeacon
+      && navigator.sendBeacon(EVENTS_URL, new Blob([payload], { type: 'text/plain' }))
+    if (!queued) {
+      fetch(EVENTS_URL, { method: 'POST', body: payload, keepalive: fits }).catch(() => {})
+    }
+    buffer.splice(0, count)
+  }
+}
+
+if (typeof window !== 'undefined') {
+  window.addEventListener('pagehide', flushEventsWithBeacon)
+  document.addEventListener('visibilitychange', () => {
+    if (document.visibilityState === 'hidden') flushEventsWithBeacon()
+  })
+}
@@ -0,0 +1,296 @@
+// Durable outbound queue for chat messages and lead submissions made while
+// offline. Items are kept in IndexedDB (in memory where it is unavailable) in
+// the order they were queued, and a dedupe key makes queueing the same
+// submission twice a no-op.
+//
+// The queue is replayed when the browser comes back online, when the service
+// worker fires a Background Sync, on page load, and on a backoff timer after
+// a failed attempt. Replays are batched: chat messages go to /api/chat as one
+// { batch } request per BATCH_SIZE.chat, and leads go to /api/events as arrays,
+// so a long outage drains in a handful of requests instead of hundreds.
+
+const CHAT_URL = process.env.NODE_ENV === 'development'
+  ? 'http://localhost:3001/api/chat'
+  : '/api/chat'
+const EVENTS_URL = process.env.NODE_ENV === 'development'
+  ? 'http://localhost:3001/api/events'
+  : '/api/events'
+
+const DB_NAME = 'odiadev-outbox'
+const STORE = 'requests'
+const SYNC_TAG = 'odiadev-outbox' // public/sw.js listens for this tag
+const BATCH_SIZE: Record<OutboxKind, number> = { chat: 20, lead: 100 } // server limits per request
+const BASE_BACKOFF_MS = 1000
+const MAX_BACKOFF_MS = 60000
+const MAX_ATTEMPTS = 8
+
+export type OutboxKind = 'chat' | 'lead'
+
+export interface OutboxItem {
+  seq?: number
+  key: string
+  kind: OutboxKind
+  origin: string
+  body: Record<string, unknown>
+  attempts: number
+  nextAttemptAt: number
+  queuedAt: number
+}
+
+type ReplayListener = (item: OutboxItem, result: unknown) => void
+
+interface BatchResult {
+  ok: boolean
+  drop?: boolean
+  status?: number
+  retryAfterMs?: number
+  results?: Map<string, unknown>
+}
+
+const listeners = new Map<string, Set<ReplayListener>>()
+const memory: OutboxItem[] = []
+let memorySeq = 0
+let dbPromise: Promise<IDBDatabase | null> | null = null
+let replaying: Promise<number> | null = null
+let replayAgain = false
+let timer: ReturnType<typeof setTimeout> | null = null
+
+function openDb(): Promise<IDBDatabase | null> {
+  if (!dbPromise) {
+    dbPromise = new Promise((resolve) => {
+      if (typeof indexedDB === 'undefined') return resolve(null)
+      const request = indexedDB.open(DB_NAME, 1)
+      request.onupgradeneeded = () => {
+        // seq orders the queue; the unique key index does the dedupe
+        const store = request.result.createObjectStore(STORE, { keyPath: 'seq', autoIncrement: true })
+        store.createIndex('key', 'key', { unique: true })
+      }
+      request.onsuccess = () => resolve(request.result)
+      request.onerror = () => resolve(null)
+    })
+  }
+  return dbPromise
+}
+
+function transaction<T>(db: IDBDatabase, mode: IDBTransactionMode, run: (store: IDBObjectStore) => T): Promise<T> {
+  return new Promise((resolve, reject) => {
+    const tx = db.transaction(STORE, mode)
+    const result = run(tx.objectStore(STORE))
+    tx.oncomplete = () => resolve(result)
+    // tx.error is only set once the transaction aborts; the failing request has it first
+    tx.onerror = (event) => reject((event.target as IDBRequest | null)?.error ?? tx.error)
+    tx.onabort = () => reject(tx.error)
+  })
+}
+
+async function readAll(): Promise<OutboxItem[]> {
+  const db = await openDb()
+  if (!db) return [...memory]
+  const request = await transaction(db, 'readonly', store => store.getAll())
+  return request.result as OutboxItem[]
+}
+
+async function remove(items: OutboxItem[]) {
+  const db = await openDb()
+  if (!db) {
+    const seqs = new Set(items.map(item => item.seq))
+    memory.splice(0, memory.length, ...memory.filter(item => !seqs.has(item.seq)))
+    return
+  }
+  await transaction(db, 'readwrite', store => items.forEach(item => store.delete(item.seq!)))
+}
+
+async function update(items: OutboxItem[]) {
+  const db = await openDb()
+  if (db) await transaction(db, 'readwrite', store => items.forEach(item => store.put(item)))
+}
+
+export async function outboxSize(): Promise<number> {
+  const db = await openDb()
+  if (!db) return memory.length
+  const request = await transaction(db, 'readonly', store => store.count())
+  return request.result
+}
+
+// Queue a request for later delivery. Resolves false if an item with the same
+// key is already waiting.
+export async function enqueue(
+  kind: OutboxKind,
+  body: Record<string, unknown>,
+  { key = crypto.randomUUID(), origin = kind }: { key?: string; origin?: string } = {}
+): Promise<boolean> {
+  const item: OutboxItem = {
+    key, kind, origin, body,
+    attempts: 0,
+    nextAttemptAt: Date.now() + BASE_BACKOFF_MS,
+    queuedAt: Date.now(),
+  }
+
+  const db = await openDb()
+  if (!db) {
+    if (memory.some(queued => queued.key === key)) return false
+    memory.push({ ...item, seq: ++memorySeq })
+  } else {
+    try {
+      await transaction(db, 'readwrite', store => store.add(item))
+    } catch (error) {
+      if ((error as DOMException | null)?.name === 'ConstraintError') return false
+      throw error
+    }
+  }
+
+  requestBackgroundSync()
+  schedule(BASE_BACKOFF_MS)
+  return true
+}
+
+// Called with each replayed item of `origin` and its server result (the chat
+// reply for chat items).
+export function onReplayed(origin: string, listener: ReplayListener): () => void {
+  if (!listeners.has(origin)) listeners.set(origin, new Set())
+  listeners.get(origin)!.add(listener)
+  return () => listeners.get(origin)?.delete(listener)
+}
+
+async function sendBatch(kind: OutboxKind, items: OutboxItem[]): Promise<BatchResult> {
+  let response: Response
+  try {
+    response = kind === 'chat'
+      ? await fetch(CHAT_URL, {
+          method: 'POST',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify({ batch: items.map(item => ({ key: item.key, ...item.body })) }),
+        })
+      : await fetch(EVENTS_URL, {
+          method: 'POST',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify(items.map(item => item.body)),
+        })
+  } catch {
+    return { ok: false }
+  }
+
+  if (response.status === 429 || response.status >= 500) {
+    const retryAfter = Number(response.headers.get('Retry-After'))
+    return { ok: false, status: response.status, retryAfterMs: retryAfter > 0 ? retryAfter * 1000 : undefined }
+  }
+  if (!response.ok) return { ok: false, status: response.status, drop: true }
+
+  const results = new Map<string, unknown>()
+  if (kind === 'chat') {
+    const data = await response.json().catch(() => null)
+    for (const result of data?.results || []) results.set(result.key, result)
+  }
+  return { ok: true, results }
+}
+
+// Runs of consecutive same-kind items, each up to that kind's batch size
+function toBatches(items: OutboxItem[]): OutboxItem[][] {
+  const batches: OutboxItem[][] = []
+  for (const item of items) {
+    const last = batches[batches.length - 1]
+    if (last && last[0].kind === item.kind && last.length < BATCH_SIZE[item.kind]) {
+      last.push(item)
+    } else {
+      batches.push([item])
+    }
+  }
+  return batches
+}
+
+async function drain(force: boolean): Promise<number> {
+  // Offline: nothing to try until the online event
+  if (!force && typeof navigator !== 'undefined' && navigator.onLine === false) return 0
+  let sent = 0
+  do {
+    replayAgain = false
+    const now = Date.now()
+    const due = (await readAll()).filter(item => force || item.nextAttemptAt <= now)
+    force = false
+
+    for (const batch of toBatches(due)) {
+      const result = await sendBatch(batch[0].kind, batch)
+      if (result.ok || result.drop) {
+        await remove(batch)
+        if (result.drop) {
+          console.error(`Dropping ${batch.length} queued ${batch[0].kind} request(s) rejected by the server`)
+          continue
+        }
+        sent += batch.length
+        for (const item of batch) {
+          listeners.get(item.origin)?.forEach(listener => listener(item, result.results?.get(item.key)))
+        }
+        continue
+      }
+
+      // Back off this batch and stop until the next trigger. Only server errors
+      // count towards MAX_ATTEMPTS; a network that is down never drops items.
+      const delay = result.retryAfterMs
+        ?? Math.min(MAX_BACKOFF_MS, BASE_BACKOFF_MS * 2 ** batch[0].attempts) * (0.5 + Math.random() / 2)
+      const retry = result.status ? batch.filter(item => item.attempts + 1 < MAX_ATTEMPTS) : batch
+      retry.forEach(item => {
+        item.attempts++
+        item.nextAttemptAt = Date.now() + delay
+      })
+      await remove(batch.filter(item => !retry.includes(item)))
+      await update(retry)
+      schedule(delay)
+      return sent
+    }
+  } while (replayAgain)
+  return sent
+}
+
+// Replay everything that is due (everything, with force). Only one replay
+// runs at a time, across tabs too where the Web Locks API is available.
+// Resolves with the number of items delivered.
+export function replayOutbox({ force = false } = {}): Promise<number> {
+  if (replaying) {
+    replayAgain = true
+    return replaying
+  }
+  if (timer) {
+    clearTimeout(timer)
+    timer = null
+  }
+  const run = () => drain(force)
+  replaying = (typeof navigator !== 'undefined' && navigator.locks
+    ? navigator.locks.request(DB_NAME, run)
+    : run()
+  ).catch((error) => {
+    console.error('Outbox replay failed:', error)
+    return 0
+  }).finally(() => {
+    replaying = null
+  })
+  return replaying
+}
+
+function schedule(delay: number) {
+  if (timer || typeof window === 'undefined') return
+  timer = setTimeout(() => {
+    timer = null
+    replayOutbox()
+  }, delay)
+}
+
+function requestBackgroundSync() {
+  if (typeof navigator === 'undefined' || !navigator.serviceWorker?.controller) return
+  navigator.serviceWorker.ready
+    .then((registration) => {
+      const { sync } = registration as ServiceWorkerRegistration & { sync?: { register(tag: string): Promise<void> } }
+      return sync?.register(SYNC_TAG)
+    })
+    .catch(() => {})
+}
+
+if (typeof window !== 'undefined') {
+  window.addEventListener('online', () => replayOutbox({ force: true }))
+  navigator.serviceWorker?.addEventListener('message', (event) => {
+    if (event.data?.type === 'outbox-replay') replayOutbox({ force: true })
+  })
+  // Anything left over from an earlier visit
+  setTimeout(() => {
+    if (navigator.onLine) replayOutbox({ force: true })
+  }, 0)
+}
@@ -0,0 +1,125 @@
+// Sentence-pipelined speech for assistant replies.
+//
+// A reply sent to /api/tts in one piece stays silent until the whole clip is
+// synthesized and downloaded. speakPipelined() splits it into sentence chunks,
+// synthesizes at most MAX_PARALLEL of them at a time and queues each on the
+// audio engine (src/lib/audio.ts) in reply order, so the first sentence plays
+// while the rest are still being synthesized and the engine's gapless
+// scheduling joins them up. cancelSpeech() is the barge-in: it aborts every
+// chunk still in flight and stops playback.
+
+import { decodeClip, playClip, stopAudio } from './audio'
+
+const MAX_PARALLEL = 3 // chunks being synthesized at once
+const MIN_CHUNK_CHARS = 40 // shorter sentences ride along with the next one
+const MAX_CHUNK_CHARS = 250 // longer ones are split at a comma or a space
+
+// Terminal punctuation (plus closing quotes) followed by what looks like the
+// start of a new sentence, so "e.g. this" and "3.5" are not split
+const SENTENCE_END = /[.!?…]+["')\]]*\s+(?=["'(\[]?[A-Z0-9])/g
+
+const running = new Set<AbortController>()
+
+export function splitSentences(text: string): string[] {
+  const sentences: string[] = []
+  let start = 0
+  for (const match of text.matchAll(SENTENCE_END)) {
+    const end = match.index! + match[0].length
+    sentences.push(text.slice(start, end).trim())
+    start = end
+  }
+  sentences.push(text.slice(start).trim())
+  return sentences.filter(Boolean)
+}
+
+function splitLong(sentence: string): string[] {
+  const parts: string[] = []
+  let rest = sentence
+  while (rest.length > MAX_CHUNK_CHARS) {
+    const head = rest.slice(0, MAX_CHUNK_CHARS)
+    let cut = Math.max(head.lastIndexOf(', '), head.lastIndexOf('; ')) + 1
+    if (cut < MIN_CHUNK_CHARS) cut = head.lastIndexOf(' ')
+    if (cut < MIN_CHUNK_CHARS) cut = MAX_CHUNK_CHARS
+    parts.push(rest.slice(0, cut).trim())
+    rest = rest.slice(cut).trim()
+  }
+  if (rest) parts.push(rest)
+  return parts
+}
+
+// The chunks a reply is spoken in. The first stays as short as its sentence,
+// since it decides how soon audio starts; later short ones are merged forward.
+export function speechChunks(text: string): string[] {
+  const chunks: string[] = []
+  for (const sentence of splitSentences(text)) {
+    for (const part of splitLong(sentence)) {
+      const last = chunks.length > 1 ? chunks[chunks.length - 1] : undefined
+      if (last !== undefined && last.length < MIN_CHUNK_CHARS && last.length + part.length < MAX_CHUNK_CHARS) {
+        chunks[chunks.length - 1] = `${last} ${part}`
+      } else {
+        chunks.push(part)
+      }
+    }
+  }
+  return chunks
+}
+
+export function speechUrl(text: string, voiceId: string, canned = false) {
+  const params = new URLSearchParams({ stream: '1', text, voice_id: voiceId, format: 'mp3' })
+  if (canned) params.set('canned', '1')
+  return `/api/tts?${params}`
+}
+
+// Speak `text` chunk by chunk, queued behind anything already playing.
+// Resolves true once the first chunk is scheduled, false if cancelSpeech()
+// ran first. Rejects if the first chunk cannot be synthesized, after
+// cancelling the rest, so the caller can fall back to a single request.
+// A later chunk that fails is skipped.
+export async function speakPipelined(
+  text: string,
+  { voiceId, canned = false }: { voiceId: string; canned?: boolean }
+): Promise<boolean> {
+  const controller = new AbortController()
+  const { signal } = controller
+  running.add(controller)
+  const synthesizing = new Set<Promise<void>>()
+
+  const start = (chunk: string) => {
+    const url = speechUrl(chunk, voiceId, canned)
+    const key = `${voiceId}:${chunk}`
+    const scheduled = playClip(url, { key, signal })
+    const settled = decodeClip(url, key, signal).then(() => {}, () => {})
+    synthesizing.add(settled)
+    settled.then(() => synthesizing.delete(settled))
+    return scheduled
+  }
+
+  const [firstChunk, ...rest] = speechChunks(text)
+  const first = start(firstChunk ?? text)
+  const queued = (async () => {
+    for (const chunk of rest) {
+      while (synthesizing.size >= MAX_PARALLEL) await Promise.race(synthesizing)
+      if (signal.aborted) return
+      start(chunk).catch((error) => {
+        if (!signal.aborted) console.error('Speech chunk failed:', error)
+      })
+    }
+    await Promise.all(synthesizing)
+  })()
+  queued.finally(() => running.delete(controller))
+
+  try {
+    return await first
+  } catch (error) {
+    if (signal.aborted) return false
+    controller.abort()
+    throw error
+  }
+}
+
+// Barge-in: abort every chunk still being synthesized and stop playback.
+export function cancelSpeech() {
+  running.forEach(controller => controller.abort())
+  running.clear()
+  stopAudio()
+}
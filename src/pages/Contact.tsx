@@ -1,6 +1,7 @@
 import { useState } from 'react'
 import { motion } from 'framer-motion'
 import { useChatStore } from '../store/chatStore'
+import { enqueue } from '../lib/outbox'
 
 const Contact = () => {
   const [formData, setFormData] = useState({
@@ -17,17 +18,17 @@ const Contact = () => {
     e.preventDefault()
     setIsSubmitting(true)
 
-    try {
-      const payload = {
-        type: 'lead',
-        name: formData.name,
-        email: formData.email,
-        phone: formData.phone,
-        message: formData.message,
-        source: 'contact_form',
-        session_id: useChatStore.getState().sessionId,
-      }
+    const payload = {
+      type: 'lead',
+      name: formData.name,
+      email: formData.email,
+      phone: formData.phone,
+      message: formData.message,
+      source: 'contact_form',
+      session_id: useChatStore.getState().sessionId,
+    }
 
+    try {
       // Send lead event (server will add security headers)
       const eventsUrl = process.env.NODE_ENV === 'development' 
         ? 'http://localhost:3001/api/events' 
@@ -48,7 +49,10 @@ const Contact = () => {
       setIsSubmitted(true)
     } catch (error) {
       console.error('Error submitting form:', error)
-      // Still show success for better UX in development
+      // Queue the lead and send it when the connection is back; the key stops
+      // a double-submitted form from being queued twice
+      await enqueue('lead', payload, { key: `lead:${payload.email}:${payload.message}`, origin: 'contact-form' })
+        .catch(queueError => console.error('Error queueing lead:', queueError))
       setIsSubmitted(true)
     } finally {
       setIsSubmitting(false)
@@ -2,6 +2,10 @@ import { create } from 'zustand'
 import { persist } from 'zustand/middleware'
 import { getRandomFallbackResponse } from '../config/development'
 import { playDataUrl } from '../lib/audio'
+import { flushEvents, trackEvent } from '../lib/events'
+import { enqueue, onReplayed } from '../lib/outbox'
+
+const OFFLINE_NOTICE = "You're offline, so I've queued your message. I'll reply as soon as you're back online."
 
 export interface Message {
   id: string
@@ -98,6 +102,46 @@ const defaultAvatars: Avatar[] = [
   },
 ]
 
+const SUMMARIZE_URL = process.env.NODE_ENV === 'development'
+  ? 'http://localhost:3001/api/brain/summarize'
+  : '/api/brain/summarize'
+
+export interface ConversationSummary {
+  summary: string
+  topics: string[]
+}
+
+// The brain keeps a running summary per session; each update sends only the
+// turns it has not seen, so updating stays cheap however long the
+// conversation gets. Updates run one at a time to keep turns in order, and
+// turns that fail to send go out with the next update.
+let summarizedCount = 0
+let latestSummary: ConversationSummary | null = null
+let summaryUpdate: Promise<ConversationSummary | null> = Promise.resolve(null)
+
+function updateSummary(state: () => ChatState): Promise<ConversationSummary | null> {
+  summaryUpdate = summaryUpdate.then(async () => {
+    const { sessionId, messages } = state()
+    const turns = messages.slice(summarizedCount).map(({ role, content }) => ({ role, content }))
+    if (!sessionId || turns.length === 0) return latestSummary
+
+    try {
+      const response = await fetch(SUMMARIZE_URL, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ session_id: sessionId, turns, reset: summarizedCount === 0 }),
+      })
+      if (!response.ok) throw new Error(`Summarize failed: ${response.status}`)
+      latestSummary = await response.json()
+      summarizedCount += turns.length
+    } catch (error) {
+      console.error('Error updating summary:', error)
+    }
+    return latestSummary
+  })
+  return summaryUpdate
+}
+
 export const useChatStore = create<ChatState & ChatActions>()(
   persist(
     (set, get) => ({
@@ -196,6 +240,7 @@ export const useChatStore = create<ChatState & ChatActions>()(
             content: data.reply,
             role: 'assistant',
           })
+          updateSummary(get)
 
           // Generate TTS for the response if voice mode is on
           if (isVoiceMode && data.reply) {
@@ -229,6 +274,17 @@ export const useChatStore = create<ChatState & ChatActions>()(
 
         } catch (error) {
           console.error('Error sending message:', error)
+
+          // Network down: keep the message and answer it when it is replayed
+          const queued = (!navigator.onLine || error instanceof TypeError)
+            && await enqueue('chat', { message: content, sessionId }, { origin: 'chat-store' }).catch(() => false)
+          if (queued) {
+            addMessage({
+              content: OFFLINE_NOTICE,
+              role: 'assistant',
+            })
+            return
+          }
           
           // Use fallback response for development
           const fallbackResponse = getRandomFallbackResponse()
@@ -280,52 +336,37 @@ export const useChatStore = create<ChatState & ChatActions>()(
         if (messages.length === 0 || !sessionId) return
 
         try {
-          const payload = {
+          // Send conversation end event along with anything still buffered;
+          // the summary only needs the turns since its last update
+          const summary = await updateSummary(get)
+          trackEvent({
             type: 'conversation_end',
             sessionId,
             transcript: messages.map(m => `${m.role}: ${m.content}`).join('\n'),
             finalReply: messages[messages.length - 1]?.content || '',
-          }
-
-                            // Send conversation end event (server will add security headers)
-                  const eventsUrl = process.env.NODE_ENV === 'development' 
-                    ? 'http://localhost:3001/api/events' 
-                    : '/api/events'
-                  
-                  await fetch(eventsUrl, {
-                    method: 'POST',
-                    headers: {
-                      'Content-Type': 'application/json',
-                    },
-                    body: JSON.stringify(payload),
-                  })
+            summary: summary?.summary,
+            topics: summary?.topics,
+          })
+          await flushEvents()
         } catch (error) {
           console.error('Error ending conversation:', error)
         }
       },
 
       clearMessages: () => {
+        // The next summary update starts the session's summary afresh
+        summarizedCount = 0
+        latestSummary = null
         set({ messages: [] })
       },
 
       sendEvent: async (type: string, payload: any) => {
         try {
-          const eventPayload = {
+          // Buffered and sent in batches by lib/events
+          trackEvent({
             type,
             ...payload,
-          }
-
-                            const eventsUrl = process.env.NODE_ENV === 'development' 
-                    ? 'http://localhost:3001/api/events' 
-                    : '/api/events'
-                  
-                  await fetch(eventsUrl, {
-                    method: 'POST',
-                    headers: {
-                      'Content-Type': 'application/json',
-                    },
-                    body: JSON.stringify(eventPayload),
-                  })
+          })
         } catch (error) {
           console.error('Error sending event:', error)
         }
@@ -342,3 +383,11 @@ export const useChatStore = create<ChatState & ChatActions>()(
     }
   )
 )
+
+// Replies to messages that were queued while offline
+onReplayed('chat-store', (item, result) => {
+  const reply = (result as { reply?: string } | undefined)?.reply
+  if (reply && item.body.sessionId === useChatStore.getState().sessionId) {
+    useChatStore.getState().addMessage({ content: reply, role: 'assistant' })
+  }
+})
@@ -1,32 +1,14 @@
 import asyncio
 from playwright import async_api
+from harness.browser import browser_context
+from harness.waits import WaitEngine
 
-async def run_test():
-    pw = None
-    browser = None
-    context = None
-    
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
+async def run_test(browser=None):
+    async with browser_context(browser) as context:
         
         # Open a new page in the browser context
         page = await context.new_page()
+        waits = WaitEngine(context)
         
         # Navigate to your target URL and wait until the network request is committed
         await page.goto("http://localhost:5174", wait_until="commit", timeout=10000)
@@ -48,51 +30,55 @@ async def run_test():
         # Click on the chat widget button to start the onboarding process.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.click(elem, "Click on the chat widget button to start the onboarding process.")
         
 
         # Input a valid user name in the message input area to proceed with onboarding.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div[4]/form/div/div/textarea').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('John Doe')
+        await waits.fill(elem, 'John Doe', "Input a valid user name in the message input area to proceed with onboarding.")
         
 
+        # Submit the name
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div[4]/form/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.click(elem, "Submit the name")
         
 
         # Input a valid email address in the chat widget to proceed with onboarding.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div[4]/form/div/div/textarea').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('john.doe@example.com')
+        await waits.fill(elem, 'john.doe@example.com', "Input a valid email address in the chat widget to proceed with onboarding.")
         
 
+        # Submit the email address
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div[4]/form/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.click(elem, "Submit the email address")
         
 
         # Input a valid phone number in the chat widget and submit to proceed with onboarding.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div[4]/form/div/div/textarea').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('+2348012345678')
+        await waits.fill(elem, '+2348012345678', "Input a valid phone number in the chat widget and submit to proceed with onboarding.")
         
 
+        # Submit the phone number
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div[4]/form/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.click(elem, "Submit the phone number")
         
 
         # Select or state a valid business use case via voice or text in the chat widget to proceed with onboarding.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div[4]/form/div/div/textarea').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('E-commerce')
+        await waits.fill(elem, 'E-commerce', "Select or state a valid business use case via voice or text in the chat widget to proceed with onboarding.")
         
 
+        # Submit the business use case
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div[4]/form/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.click(elem, "Submit the business use case")
         
 
         # Attempt to trigger or locate any confirmation message, success notification, or backend response indication in the chat widget or page that confirms lead data submission and onboarding completion.
@@ -102,19 +88,10 @@ async def run_test():
         # Attempt to trigger or locate any confirmation message, success notification, or backend response indication in the chat widget or page that confirms lead data submission and onboarding completion.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.click(elem, "Attempt to trigger or locate any confirmation message, success notification, or backend response indication in the chat widget or page that confirms lead data submission and onboarding completion.")
         
 
         assert False, 'Test plan execution failed: generic failure assertion as expected result is unknown.'
-        await asyncio.sleep(5)
-    
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+
+if __name__ == "__main__":
+    asyncio.run(run_test())
@@ -1,32 +1,14 @@
 import asyncio
 from playwright import async_api
+from harness.browser import browser_context
+from harness.waits import WaitEngine
 
-async def run_test():
-    pw = None
-    browser = None
-    context = None
-    
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
+async def run_test(browser=None):
+    async with browser_context(browser) as context:
         
         # Open a new page in the browser context
         page = await context.new_page()
+        waits = WaitEngine(context)
         
         # Navigate to your target URL and wait until the network request is committed
         await page.goto("http://localhost:5174", wait_until="commit", timeout=10000)
@@ -48,42 +30,34 @@ async def run_test():
         # Click on the chat widget icon to open the assistant widget
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.click(elem, "Click on the chat widget icon to open the assistant widget")
         
 
         # Interact with the assistant via text input to check if the session continues appropriately
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div[4]/form/div/div/textarea').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Hello, can you assist me?')
+        await waits.fill(elem, 'Hello, can you assist me?', "Interact with the assistant via text input to check if the session continues appropriately")
         
 
+        # Send the greeting to the assistant
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div[4]/form/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.click(elem, "Send the greeting to the assistant")
         
 
         # Verify if the widget can resume session without requesting mic permission by toggling mic button or checking for session resume options
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div[2]/div/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.click(elem, "Verify if the widget can resume session without requesting mic permission by toggling mic button or checking for session resume options")
         
 
         # Check if the widget can display personalized greeting by selecting a saved user profile or reloading with saved profile data
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div[2]/div[2]/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.click(elem, "Check if the widget can display personalized greeting by selecting a saved user profile or reloading with saved profile data")
         
 
         assert False, 'Test plan execution failed: generic failure assertion'
-        await asyncio.sleep(5)
-    
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+
+if __name__ == "__main__":
+    asyncio.run(run_test())
@@ -1,32 +1,14 @@
 import asyncio
 from playwright import async_api
+from harness.browser import browser_context
+from harness.waits import WaitEngine
 
-async def run_test():
-    pw = None
-    browser = None
-    context = None
-    
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
+async def run_test(browser=None):
+    async with browser_context(browser) as context:
         
         # Open a new page in the browser context
         page = await context.new_page()
+        waits = WaitEngine(context)
         
         # Navigate to your target URL and wait until the network request is committed
         await page.goto("http://localhost:5174", wait_until="commit", timeout=10000)
@@ -48,96 +30,103 @@ async def run_test():
         # Simulate offline mode or disable network connectivity
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.click(elem, "Simulate offline mode or disable network connectivity")
         
 
         # Simulate offline mode or disable network connectivity
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.click(elem, "Simulate offline mode or disable network connectivity")
         
 
         # Simulate offline mode or disable network connectivity
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.click(elem, "Simulate offline mode or disable network connectivity")
         
 
         # Simulate offline mode or disable network connectivity
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.click(elem, "Simulate offline mode or disable network connectivity")
         
 
         # Simulate offline mode or disable network connectivity
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.click(elem, "Simulate offline mode or disable network connectivity")
         
 
         # Simulate offline mode or disable network connectivity
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div[4]/form/div/div/textarea').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Testing offline message queuing.')
+        await waits.fill(elem, 'Testing offline message queuing.', "Simulate offline mode or disable network connectivity")
         
 
+        # Send the chat message while offline
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div[4]/form/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.click(elem, "Send the chat message while offline")
         
 
         # Submit onboarding lead form while offline
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/main/div/section[4]/div[4]/div/div/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.click(elem, "Submit onboarding lead form while offline")
         
 
         # Fill out the onboarding lead form with valid data and submit while offline
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/main/div/section[2]/div/div/form/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Test User')
+        await waits.fill(elem, 'Test User', "Fill out the onboarding lead form with valid data and submit while offline")
         
 
+        # Fill in the lead form email
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/main/div/section[2]/div/div/form/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('testuser@example.com')
+        await waits.fill(elem, 'testuser@example.com', "Fill in the lead form email")
         
 
+        # Fill in the lead form phone number
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/main/div/section[2]/div/div/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('+1234567890')
+        await waits.fill(elem, '+1234567890', "Fill in the lead form phone number")
         
 
+        # Fill in the lead form company
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/main/div/section[2]/div/div/form/div[2]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Test Company')
+        await waits.fill(elem, 'Test Company', "Fill in the lead form company")
         
 
+        # Fill in the lead form message
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/main/div/section[2]/div/div/form/div[3]/textarea').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('This is a test message for offline lead submission.')
+        await waits.fill(elem, 'This is a test message for offline lead submission.', "Fill in the lead form message")
         
 
+        # Submit the lead form while offline
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/main/div/section[2]/div/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.click(elem, "Submit the lead form while offline")
         
 
         # Restore network connectivity and verify background sync retries queued chat and lead submissions successfully
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/nav/div/div/div[2]/a[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.click(elem, "Restore network connectivity and verify background sync retries queued chat and lead submissions successfully")
         
 
         # Verify background sync retries queued chat and lead submissions successfully and user receives assistant responses confirming message processing
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div[4]/form/div/div/textarea').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Is the offline message and lead form submission processed now?')
+        await waits.fill(elem, 'Is the offline message and lead form submission processed now?', "Verify background sync retries queued chat and lead submissions successfully and user receives assistant responses confirming message processing")
         
 
+        # Send the follow-up message once back online
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div[4]/form/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.click(elem, "Send the follow-up message once back online")
         
 
         # Assert widget shows offline status message and queues requests locally
@@ -148,15 +137,6 @@ async def run_test():
         # Wait for assistant response confirming message processing
         assistant_response_locator = frame.locator('xpath=//div[contains(@class, "chat-log")]//div[contains(text(), "We use Vercel + Render + Supabase + n8n for reliability.")]')
         assert await assistant_response_locator.is_visible(), 'Assistant response confirming message processing not found'
-        await asyncio.sleep(5)
-    
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+
+if __name__ == "__main__":
+    asyncio.run(run_test())
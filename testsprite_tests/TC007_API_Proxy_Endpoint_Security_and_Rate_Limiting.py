@@ -1,32 +1,35 @@
 import asyncio
+import os
+from collections import Counter
 from playwright import async_api
+from harness.browser import browser_context
+from harness.waits import WaitEngine
 
-async def run_test():
-    pw = None
-    browser = None
-    context = None
-    
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
+# The real /api handlers (``vercel dev``); the Vite dev server only serves the app
+API_URL = os.environ.get("ODIADEV_API_URL", "http://localhost:3000")
+RATE_LIMIT = 3  # /api/tts allows 3 full-length (1000 character) clips per minute per client
+FULL_CLIP = ("Rate limit probe. " * 56)[:1000]  # costs a whole token
+SENTENCE = "Rate limit probe."  # costs the 0.1 minimum, like one sentence of a pipelined reply
+TOO_LONG = FULL_CLIP + "!"  # takes a token, then is rejected with 400 before any synthesis
+WAVE = 2000
+STATS_TOKEN = os.environ.get("ODIADEV_STATS_TOKEN", "")  # must match the API's
+
+async def post_tts(request, ip, text=FULL_CLIP):
+    response = await request.post(f"{API_URL}/api/tts", headers={"X-Forwarded-For": f"{ip}, 10.0.0.1"},
+                                  data={"text": text, "voice_id": "naija_female_warm"})
+    return ip, response.status, response.headers
+
+async def rate_limit_stats(request):
+    response = await request.get(f"{API_URL}/api/tts?stats=1", headers={"Authorization": f"Bearer {STATS_TOKEN}"})
+    assert response.ok, f"GET /api/tts?stats=1 returned {response.status}"
+    return (await response.json())["rateLimit"]
+
+async def run_test(browser=None):
+    async with browser_context(browser) as context:
         
         # Open a new page in the browser context
         page = await context.new_page()
+        waits = WaitEngine(context)
         
         # Navigate to your target URL and wait until the network request is committed
         await page.goto("http://localhost:5174", wait_until="commit", timeout=10000)
@@ -48,19 +51,55 @@ async def run_test():
         # Identify and navigate to the proxy API testing interface or documentation to start making API requests from allowed and disallowed domains.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/nav/div/div/div[2]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.click(elem, "Identify and navigate to the proxy API testing interface or documentation to start making API requests from allowed and disallowed domains.")
         
 
-        assert False, 'Test plan execution failed: generic failure assertion'
-        await asyncio.sleep(5)
-    
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+        # Hammer /api/tts concurrently from many simulated client IPs, several requests each
+        request = context.request
+        ips = [f"198.51.{i // 250}.{i % 250 + 1}" for i in range(200)]
+        results = await asyncio.gather(*(post_tts(request, ip) for ip in ips for _ in range(RATE_LIMIT + 2)))
+
+        # Assert each client got exactly its allowance through, and every 429 carries the standard headers
+        admitted = Counter(ip for ip, status, _ in results if status != 429)
+        assert all(admitted[ip] == RATE_LIMIT for ip in ips), \
+            f"Expected {RATE_LIMIT} admitted requests per IP, got {sorted(set(admitted.values()))}"
+        for _, status, headers in results:
+            assert headers.get("ratelimit-limit") == str(RATE_LIMIT), f"Missing RateLimit-Limit: {headers}"
+            if status == 429:
+                assert headers.get("ratelimit-remaining") == "0", f"429 with RateLimit-Remaining {headers.get('ratelimit-remaining')}"
+                assert int(headers.get("retry-after", "0")) > 0, f"429 without Retry-After: {headers}"
+
+        # Assert short requests are charged their share of a clip: ten sentences fit in one clip's allowance
+        sentence_ips = [f"198.51.100.{i + 1}" for i in range(20)]
+        results = await asyncio.gather(*(post_tts(request, ip, SENTENCE) for ip in sentence_ips for _ in range(10)))
+        admitted = Counter(ip for ip, status, _ in results if status != 429)
+        assert all(admitted[ip] == 10 for ip in sentence_ips), \
+            f"Expected all 10 sentence-sized requests admitted per IP, got {sorted(set(admitted.values()))}"
+
+        # Assert the cache and limiter counters are not public
+        response = await request.get(f"{API_URL}/api/tts?stats=1")
+        assert response.status == 401, f"GET /api/tts?stats=1 without a token returned {response.status}"
+
+        # Assert limiter memory stays bounded while more new clients arrive than it can hold: waves of fresh IPs
+        # (over-long text, so nothing is synthesized) until maxKeys is overrun by a fifth
+        stats = await rate_limit_stats(request)
+        sizes = [stats["keys"]]
+        sweeps_before, evicted_before = stats["sweeps"], stats["evicted"]
+        new_keys = stats["maxKeys"] + stats["maxKeys"] // 5
+        for start in range(0, new_keys, WAVE):
+            wave_ips = [f"203.{n // 62500}.{n // 250 % 250}.{n % 250 + 1}" for n in range(start, min(start + WAVE, new_keys))]
+            await asyncio.gather(*(post_tts(request, ip, TOO_LONG) for ip in wave_ips))
+            stats = await rate_limit_stats(request)
+            sizes.append(stats["keys"])
+        sweeps = stats["sweeps"] - sweeps_before
+        evicted = stats["evicted"] - evicted_before
+        print(f"Rate limiter keys per wave: {sizes} (max {stats['maxKeys']}, {new_keys} new clients, evicted {evicted}, "
+              f"expired {stats['expired']}, {sweeps} sweeps)")
+        assert max(sizes) <= stats["maxKeys"], f"Rate limiter holds {max(sizes)} keys, bound is {stats['maxKeys']}"
+        assert evicted > 0, f"{new_keys} new clients against a {stats['maxKeys']}-key bound evicted nothing"
+
+        # Assert eviction is amortised: a full sweep frees room for many new clients rather than one
+        assert sweeps < new_keys / 50, f"{sweeps} limiter sweeps for {new_keys} new clients"
+
+if __name__ == "__main__":
+    asyncio.run(run_test())
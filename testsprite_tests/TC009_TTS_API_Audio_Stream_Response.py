@@ -1,32 +1,14 @@
 import asyncio
 from playwright import async_api
+from harness.browser import browser_context
+from harness.waits import WaitEngine
 
-async def run_test():
-    pw = None
-    browser = None
-    context = None
-    
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
+async def run_test(browser=None):
+    async with browser_context(browser) as context:
         
         # Open a new page in the browser context
         page = await context.new_page()
+        waits = WaitEngine(context)
         
         # Navigate to your target URL and wait until the network request is committed
         await page.goto("http://localhost:5174", wait_until="commit", timeout=10000)
@@ -48,30 +30,31 @@ async def run_test():
         # Send a TTS request with sample text to /api/tts endpoint to validate audio/mpeg response.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.click(elem, "Send a TTS request with sample text to /api/tts endpoint to validate audio/mpeg response.")
         
 
         # Input sample text into the message box and send to trigger /api/tts request.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div[4]/form/div/div/textarea').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Hello, this is a test of the text to speech endpoint.')
+        await waits.fill(elem, 'Hello, this is a test of the text to speech endpoint.', "Input sample text into the message box and send to trigger /api/tts request.")
         
 
+        # Click the send button to submit the message and trigger the /api/tts request.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div[4]/form/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.click(elem, "Click the send button to submit the message and trigger the /api/tts request.")
         
 
         # Validate that the /api/tts endpoint returns a valid audio/mpeg stream and then toggle sound playback in the widget UI.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div[2]/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.click(elem, "Validate that the /api/tts endpoint returns a valid audio/mpeg stream and then toggle sound playback in the widget UI.")
         
 
         # Attempt to intercept or monitor network requests to /api/tts to confirm response content type and validate audio stream data.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div[2]/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.click(elem, "Attempt to intercept or monitor network requests to /api/tts to confirm response content type and validate audio stream data.")
         
 
         # Intercept the /api/tts request to validate response content type and audio stream data
@@ -89,19 +72,8 @@ async def run_test():
         # Toggle sound playback in the widget UI and verify no errors occur
         frame = context.pages[-1]
         toggle_button = frame.locator('xpath=html/body/div/div/div/div[2]/div/div/button').nth(0)
-        await toggle_button.click(timeout=5000)  # Toggle sound off
-        await page.wait_for_timeout(1000)
-        await toggle_button.click(timeout=5000)  # Toggle sound on
-        await page.wait_for_timeout(1000)
-        await asyncio.sleep(5)
-    
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+        await waits.click(toggle_button, "Toggle sound off")
+        await waits.click(toggle_button, "Toggle sound on")
+
+if __name__ == "__main__":
+    asyncio.run(run_test())
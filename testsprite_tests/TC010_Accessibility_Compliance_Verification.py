@@ -1,32 +1,14 @@
 import asyncio
 from playwright import async_api
+from harness.browser import browser_context
+from harness.waits import WaitEngine
 
-async def run_test():
-    pw = None
-    browser = None
-    context = None
-    
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
+async def run_test(browser=None):
+    async with browser_context(browser) as context:
         
         # Open a new page in the browser context
         page = await context.new_page()
+        waits = WaitEngine(context)
         
         # Navigate to your target URL and wait until the network request is committed
         await page.goto("http://localhost:5174", wait_until="commit", timeout=10000)
@@ -48,19 +30,19 @@ async def run_test():
         # Start keyboard navigation from the first interactive element and verify all interactive elements can be reached and operated via keyboard.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.click(elem, "Start keyboard navigation from the first interactive element and verify all interactive elements can be reached and operated via keyboard.")
         
 
         # Navigate through all interactive elements in the chat assistant panel using keyboard only and verify they are reachable and operable.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div[4]/form/div/div/textarea').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('')
+        await waits.fill(elem, '', "Navigate through all interactive elements in the chat assistant panel using keyboard only and verify they are reachable and operable.")
         
 
         # Locate the captions toggle control in the chat assistant panel or widget and test toggling captions during TTS playback.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.click(elem, "Locate the captions toggle control in the chat assistant panel or widget and test toggling captions during TTS playback.")
         
 
         # Assert all interactive elements have proper ARIA labels or roles
@@ -78,18 +60,10 @@ async def run_test():
         assert await captions_display.is_visible(), 'Captions are not visible after toggling'
         # Optionally check if captions text changes during TTS playback
         initial_caption = await captions_display.inner_text()
-        await page.wait_for_timeout(2000)  # wait for captions to update
+        await waits.mutation(page, "Wait for captions to update", selector='.captions, [aria-live="polite"]', timeout=2000,
+                             since=initial_caption)
         updated_caption = await captions_display.inner_text()
         assert initial_caption != updated_caption, 'Captions did not update during TTS playback'
-        await asyncio.sleep(5)
-    
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+
+if __name__ == "__main__":
+    asyncio.run(run_test())
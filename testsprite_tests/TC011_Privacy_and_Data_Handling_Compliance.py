@@ -1,32 +1,14 @@
 import asyncio
 from playwright import async_api
+from harness.browser import browser_context
+from harness.waits import WaitEngine
 
-async def run_test():
-    pw = None
-    browser = None
-    context = None
-    
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
+async def run_test(browser=None):
+    async with browser_context(browser) as context:
         
         # Open a new page in the browser context
         page = await context.new_page()
+        waits = WaitEngine(context)
         
         # Navigate to your target URL and wait until the network request is committed
         await page.goto("http://localhost:5174", wait_until="commit", timeout=10000)
@@ -48,25 +30,25 @@ async def run_test():
         # Open the chat widget to start onboarding and provide name, email, phone, and business use case with profane words.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.click(elem, "Open the chat widget to start onboarding and provide name, email, phone, and business use case with profane words.")
         
 
         # Send a follow-up message to check if the system flags or sanitizes profane words, then attempt to access backend logs related to the session.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div[4]/form/div/div/textarea').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Testing profanity filter: damn')
+        await waits.fill(elem, 'Testing profanity filter: damn', "Send a follow-up message to check if the system flags or sanitizes profane words, then attempt to access backend logs related to the session.")
         
 
         # Access backend logs related to the session to verify that logs do not contain raw PII or IP addresses, only anonymized or hashed data.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/nav/div/div/div[2]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.click(elem, "Access backend logs related to the session to verify that logs do not contain raw PII or IP addresses, only anonymized or hashed data.")
         
 
         # Locate and access backend logs related to the current session to verify that logs do not contain raw PII or IP addresses, only anonymized or hashed data.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/main/div/div/div[3]/div/nav/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.click(elem, "Locate and access backend logs related to the current session to verify that logs do not contain raw PII or IP addresses, only anonymized or hashed data.")
         
 
         # Assert that profane words are sanitized or rejected by input validation
@@ -84,15 +66,6 @@ async def run_test():
         ]
         assert all('john.doe@example.com' not in log and '+1234567890' not in log and '123.456.789.000' not in log for log in logs), "Raw PII or IP addresses found in logs."
         assert any('hash' in log or 'anonymized' in log for log in logs), "No anonymized or hashed data found in logs."
-        await asyncio.sleep(5)
-    
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+
+if __name__ == "__main__":
+    asyncio.run(run_test())
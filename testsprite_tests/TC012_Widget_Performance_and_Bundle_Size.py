@@ -1,290 +1,52 @@
 import asyncio
 from playwright import async_api
+from harness import bundle
+from harness.browser import browser_context
+from harness.profiling import BUDGETS, Profiler, assert_within_budget
+from harness.waits import WaitEngine
+
+async def run_test(browser=None):
+    async with browser_context(browser) as context:
 
-async def run_test():
-    pw = None
-    browser = None
-    context = None
-    
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
         # Open a new page in the browser context
         page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:5174", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
-        
-        # Interact with the page elements to simulate user flow
-        # Run Lighthouse PWA audit on the page to get performance metrics including main thread work and PWA compliance scores
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/nav/div/div/div[2]/a[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Open or interact with the chat widget to trigger its initial load and measure main thread work
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Run Lighthouse PWA audit on the current page to obtain performance and PWA compliance scores including main thread work duration
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Bypass Google CAPTCHA or use alternative method to run Lighthouse PWA audit on the localhost page with the widget
-        frame = context.pages[-1].frame_locator('html > body > div > form > div > div > div > iframe[title="reCAPTCHA"][role="presentation"][name="a-4lur9er5sp7o"][src="https://www.google.com/recaptcha/enterprise/anchor?ar=1&k=6LdLLIMbAAAAAIl-KLj9p1ePhM-4LCCDbjtJLqRO&co=aHR0cHM6Ly93d3cuZ29vZ2xlLmNvbTo0NDM.&hl=en&v=Lu6n5xwy2gi_g68Hne1LVzm4&size=normal&s=giHTy7IiJmURZZ97V38RG69PUxuVuej-nysvQwI5_GDdnqdhJfuN_bmMUV_lNkXnyXt3EgM13t3ZMICe2G4YHe4qbFBbax9leG_tKbXWt_62ZiGzFLPhnLmX_Q6PB3VzJ39WqRvX3yueZxYKZLCYKXuUu8O7aTJuJvx4NJxcx9ZALaiHqiEfuzlGPaOPWiSCqCmWctzep4uT_QQ11xehEUALwWoqXj2iVuhoLHdWnC7MIE2NvQ7bywgJwuDk1-PVu7CKbe2dqkaU6V_mhDU6hsBvqAOKYFg&anchor-ms=20000&execute-ms=15000&cb=fc9uw8908gfo"]')
-        elem = frame.locator('xpath=html/body/div[2]/div[3]/div/div/div/span').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Attempt to solve the CAPTCHA by selecting all squares with bicycles to bypass the block and continue with Lighthouse audit or alternative performance measurement
-        frame = context.pages[-1].frame_locator('html > body > div:nth-of-type(2) > div:nth-of-type(4) > iframe[title="recaptcha challenge expires in two minutes"][name="c-4lur9er5sp7o"][src="https://www.google.com/recaptcha/enterprise/bframe?hl=en&v=Lu6n5xwy2gi_g68Hne1LVzm4&k=6LdLLIMbAAAAAIl-KLj9p1ePhM-4LCCDbjtJLqRO&bft=0dAFcWeA5UylOVf_NO1ABVXUCJ6vIUWumxuH1_uZ3HHlhCamW1ac2FKQhkeP4VKUSztkNsAkpqc9ivosOB0G5kcYf6z8Mg874qxA"]')
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div[2]/div/table/tbody/tr/td').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        frame = context.pages[-1].frame_locator('html > body > div:nth-of-type(2) > div:nth-of-type(4) > iframe[title="recaptcha challenge expires in two minutes"][name="c-4lur9er5sp7o"][src="https://www.google.com/recaptcha/enterprise/bframe?hl=en&v=Lu6n5xwy2gi_g68Hne1LVzm4&k=6LdLLIMbAAAAAIl-KLj9p1ePhM-4LCCDbjtJLqRO&bft=0dAFcWeA5UylOVf_NO1ABVXUCJ6vIUWumxuH1_uZ3HHlhCamW1ac2FKQhkeP4VKUSztkNsAkpqc9ivosOB0G5kcYf6z8Mg874qxA"]')
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div[2]/div/table/tbody/tr/td[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        frame = context.pages[-1].frame_locator('html > body > div:nth-of-type(2) > div:nth-of-type(4) > iframe[title="recaptcha challenge expires in two minutes"][name="c-4lur9er5sp7o"][src="https://www.google.com/recaptcha/enterprise/bframe?hl=en&v=Lu6n5xwy2gi_g68Hne1LVzm4&k=6LdLLIMbAAAAAIl-KLj9p1ePhM-4LCCDbjtJLqRO&bft=0dAFcWeA5UylOVf_NO1ABVXUCJ6vIUWumxuH1_uZ3HHlhCamW1ac2FKQhkeP4VKUSztkNsAkpqc9ivosOB0G5kcYf6z8Mg874qxA"]')
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div[2]/div/table/tbody/tr/td[3]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        frame = context.pages[-1].frame_locator('html > body > div:nth-of-type(2) > div:nth-of-type(4) > iframe[title="recaptcha challenge expires in two minutes"][name="c-4lur9er5sp7o"][src="https://www.google.com/recaptcha/enterprise/bframe?hl=en&v=Lu6n5xwy2gi_g68Hne1LVzm4&k=6LdLLIMbAAAAAIl-KLj9p1ePhM-4LCCDbjtJLqRO&bft=0dAFcWeA5UylOVf_NO1ABVXUCJ6vIUWumxuH1_uZ3HHlhCamW1ac2FKQhkeP4VKUSztkNsAkpqc9ivosOB0G5kcYf6z8Mg874qxA"]')
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div[2]/div/table/tbody/tr/td[4]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        frame = context.pages[-1].frame_locator('html > body > div:nth-of-type(2) > div:nth-of-type(4) > iframe[title="recaptcha challenge expires in two minutes"][name="c-4lur9er5sp7o"][src="https://www.google.com/recaptcha/enterprise/bframe?hl=en&v=Lu6n5xwy2gi_g68Hne1LVzm4&k=6LdLLIMbAAAAAIl-KLj9p1ePhM-4LCCDbjtJLqRO&bft=0dAFcWeA5UylOVf_NO1ABVXUCJ6vIUWumxuH1_uZ3HHlhCamW1ac2FKQhkeP4VKUSztkNsAkpqc9ivosOB0G5kcYf6z8Mg874qxA"]')
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div[2]/div/table/tbody/tr[2]/td').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        frame = context.pages[-1].frame_locator('html > body > div:nth-of-type(2) > div:nth-of-type(4) > iframe[title="recaptcha challenge expires in two minutes"][name="c-4lur9er5sp7o"][src="https://www.google.com/recaptcha/enterprise/bframe?hl=en&v=Lu6n5xwy2gi_g68Hne1LVzm4&k=6LdLLIMbAAAAAIl-KLj9p1ePhM-4LCCDbjtJLqRO&bft=0dAFcWeA5UylOVf_NO1ABVXUCJ6vIUWumxuH1_uZ3HHlhCamW1ac2FKQhkeP4VKUSztkNsAkpqc9ivosOB0G5kcYf6z8Mg874qxA"]')
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div[2]/div/table/tbody/tr[2]/td[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        frame = context.pages[-1].frame_locator('html > body > div:nth-of-type(2) > div:nth-of-type(4) > iframe[title="recaptcha challenge expires in two minutes"][name="c-4lur9er5sp7o"][src="https://www.google.com/recaptcha/enterprise/bframe?hl=en&v=Lu6n5xwy2gi_g68Hne1LVzm4&k=6LdLLIMbAAAAAIl-KLj9p1ePhM-4LCCDbjtJLqRO&bft=0dAFcWeA5UylOVf_NO1ABVXUCJ6vIUWumxuH1_uZ3HHlhCamW1ac2FKQhkeP4VKUSztkNsAkpqc9ivosOB0G5kcYf6z8Mg874qxA"]')
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div[2]/div/table/tbody/tr[2]/td[3]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        frame = context.pages[-1].frame_locator('html > body > div:nth-of-type(2) > div:nth-of-type(4) > iframe[title="recaptcha challenge expires in two minutes"][name="c-4lur9er5sp7o"][src="https://www.google.com/recaptcha/enterprise/bframe?hl=en&v=Lu6n5xwy2gi_g68Hne1LVzm4&k=6LdLLIMbAAAAAIl-KLj9p1ePhM-4LCCDbjtJLqRO&bft=0dAFcWeA5UylOVf_NO1ABVXUCJ6vIUWumxuH1_uZ3HHlhCamW1ac2FKQhkeP4VKUSztkNsAkpqc9ivosOB0G5kcYf6z8Mg874qxA"]')
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div[2]/div/table/tbody/tr[2]/td[4]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        frame = context.pages[-1].frame_locator('html > body > div:nth-of-type(2) > div:nth-of-type(4) > iframe[title="recaptcha challenge expires in two minutes"][name="c-4lur9er5sp7o"][src="https://www.google.com/recaptcha/enterprise/bframe?hl=en&v=Lu6n5xwy2gi_g68Hne1LVzm4&k=6LdLLIMbAAAAAIl-KLj9p1ePhM-4LCCDbjtJLqRO&bft=0dAFcWeA5UylOVf_NO1ABVXUCJ6vIUWumxuH1_uZ3HHlhCamW1ac2FKQhkeP4VKUSztkNsAkpqc9ivosOB0G5kcYf6z8Mg874qxA"]')
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div[2]/div/table/tbody/tr[3]/td').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        frame = context.pages[-1].frame_locator('html > body > div:nth-of-type(2) > div:nth-of-type(4) > iframe[title="recaptcha challenge expires in two minutes"][name="c-4lur9er5sp7o"][src="https://www.google.com/recaptcha/enterprise/bframe?hl=en&v=Lu6n5xwy2gi_g68Hne1LVzm4&k=6LdLLIMbAAAAAIl-KLj9p1ePhM-4LCCDbjtJLqRO&bft=0dAFcWeA5UylOVf_NO1ABVXUCJ6vIUWumxuH1_uZ3HHlhCamW1ac2FKQhkeP4VKUSztkNsAkpqc9ivosOB0G5kcYf6z8Mg874qxA"]')
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div[2]/div/table/tbody/tr[3]/td[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Complete the CAPTCHA challenge by selecting all bicycle images and clicking the 'Next' button to bypass the block and continue with Lighthouse audit or alternative performance measurement
-        frame = context.pages[-1].frame_locator('html > body > div:nth-of-type(2) > div:nth-of-type(4) > iframe[title="recaptcha challenge expires in two minutes"][name="c-4lur9er5sp7o"][src="https://www.google.com/recaptcha/enterprise/bframe?hl=en&v=Lu6n5xwy2gi_g68Hne1LVzm4&k=6LdLLIMbAAAAAIl-KLj9p1ePhM-4LCCDbjtJLqRO&bft=0dAFcWeA5UylOVf_NO1ABVXUCJ6vIUWumxuH1_uZ3HHlhCamW1ac2FKQhkeP4VKUSztkNsAkpqc9ivosOB0G5kcYf6z8Mg874qxA"]')
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div[2]/div/table/tbody/tr/td').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        frame = context.pages[-1].frame_locator('html > body > div:nth-of-type(2) > div:nth-of-type(4) > iframe[title="recaptcha challenge expires in two minutes"][name="c-4lur9er5sp7o"][src="https://www.google.com/recaptcha/enterprise/bframe?hl=en&v=Lu6n5xwy2gi_g68Hne1LVzm4&k=6LdLLIMbAAAAAIl-KLj9p1ePhM-4LCCDbjtJLqRO&bft=0dAFcWeA5UylOVf_NO1ABVXUCJ6vIUWumxuH1_uZ3HHlhCamW1ac2FKQhkeP4VKUSztkNsAkpqc9ivosOB0G5kcYf6z8Mg874qxA"]')
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div[2]/div/table/tbody/tr/td[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        frame = context.pages[-1].frame_locator('html > body > div:nth-of-type(2) > div:nth-of-type(4) > iframe[title="recaptcha challenge expires in two minutes"][name="c-4lur9er5sp7o"][src="https://www.google.com/recaptcha/enterprise/bframe?hl=en&v=Lu6n5xwy2gi_g68Hne1LVzm4&k=6LdLLIMbAAAAAIl-KLj9p1ePhM-4LCCDbjtJLqRO&bft=0dAFcWeA5UylOVf_NO1ABVXUCJ6vIUWumxuH1_uZ3HHlhCamW1ac2FKQhkeP4VKUSztkNsAkpqc9ivosOB0G5kcYf6z8Mg874qxA"]')
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div[2]/div/table/tbody/tr/td[3]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        frame = context.pages[-1].frame_locator('html > body > div:nth-of-type(2) > div:nth-of-type(4) > iframe[title="recaptcha challenge expires in two minutes"][name="c-4lur9er5sp7o"][src="https://www.google.com/recaptcha/enterprise/bframe?hl=en&v=Lu6n5xwy2gi_g68Hne1LVzm4&k=6LdLLIMbAAAAAIl-KLj9p1ePhM-4LCCDbjtJLqRO&bft=0dAFcWeA5UylOVf_NO1ABVXUCJ6vIUWumxuH1_uZ3HHlhCamW1ac2FKQhkeP4VKUSztkNsAkpqc9ivosOB0G5kcYf6z8Mg874qxA"]')
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div[2]/div/table/tbody/tr/td[4]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        frame = context.pages[-1].frame_locator('html > body > div:nth-of-type(2) > div:nth-of-type(4) > iframe[title="recaptcha challenge expires in two minutes"][name="c-4lur9er5sp7o"][src="https://www.google.com/recaptcha/enterprise/bframe?hl=en&v=Lu6n5xwy2gi_g68Hne1LVzm4&k=6LdLLIMbAAAAAIl-KLj9p1ePhM-4LCCDbjtJLqRO&bft=0dAFcWeA5UylOVf_NO1ABVXUCJ6vIUWumxuH1_uZ3HHlhCamW1ac2FKQhkeP4VKUSztkNsAkpqc9ivosOB0G5kcYf6z8Mg874qxA"]')
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div[2]/div/table/tbody/tr[2]/td').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+        waits = WaitEngine(context)
 
-        frame = context.pages[-1].frame_locator('html > body > div:nth-of-type(2) > div:nth-of-type(4) > iframe[title="recaptcha challenge expires in two minutes"][name="c-4lur9er5sp7o"][src="https://www.google.com/recaptcha/enterprise/bframe?hl=en&v=Lu6n5xwy2gi_g68Hne1LVzm4&k=6LdLLIMbAAAAAIl-KLj9p1ePhM-4LCCDbjtJLqRO&bft=0dAFcWeA5UylOVf_NO1ABVXUCJ6vIUWumxuH1_uZ3HHlhCamW1ac2FKQhkeP4VKUSztkNsAkpqc9ivosOB0G5kcYf6z8Mg874qxA"]')
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div[2]/div/table/tbody/tr[2]/td[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+        # Attach CDP metrics and the long-task observer before the app loads
+        profiler = await Profiler.attach(context, page)
 
-        frame = context.pages[-1].frame_locator('html > body > div:nth-of-type(2) > div:nth-of-type(4) > iframe[title="recaptcha challenge expires in two minutes"][name="c-4lur9er5sp7o"][src="https://www.google.com/recaptcha/enterprise/bframe?hl=en&v=Lu6n5xwy2gi_g68Hne1LVzm4&k=6LdLLIMbAAAAAIl-KLj9p1ePhM-4LCCDbjtJLqRO&bft=0dAFcWeA5UylOVf_NO1ABVXUCJ6vIUWumxuH1_uZ3HHlhCamW1ac2FKQhkeP4VKUSztkNsAkpqc9ivosOB0G5kcYf6z8Mg874qxA"]')
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div[2]/div/table/tbody/tr[2]/td[3]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+        # Navigate to your target URL and wait until the app has loaded
+        await page.goto("http://localhost:5174", wait_until="load", timeout=10000)
 
-        frame = context.pages[-1].frame_locator('html > body > div:nth-of-type(2) > div:nth-of-type(4) > iframe[title="recaptcha challenge expires in two minutes"][name="c-4lur9er5sp7o"][src="https://www.google.com/recaptcha/enterprise/bframe?hl=en&v=Lu6n5xwy2gi_g68Hne1LVzm4&k=6LdLLIMbAAAAAIl-KLj9p1ePhM-4LCCDbjtJLqRO&bft=0dAFcWeA5UylOVf_NO1ABVXUCJ6vIUWumxuH1_uZ3HHlhCamW1ac2FKQhkeP4VKUSztkNsAkpqc9ivosOB0G5kcYf6z8Mg874qxA"]')
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div[2]/div/table/tbody/tr[2]/td[4]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Check the 'I'm not a robot' checkbox again to restart CAPTCHA verification and attempt to bypass the block
-        frame = context.pages[-1].frame_locator('html > body > div > form > div > div > div > iframe[title="reCAPTCHA"][role="presentation"][name="a-4lur9er5sp7o"][src="https://www.google.com/recaptcha/enterprise/anchor?ar=1&k=6LdLLIMbAAAAAIl-KLj9p1ePhM-4LCCDbjtJLqRO&co=aHR0cHM6Ly93d3cuZ29vZ2xlLmNvbTo0NDM.&hl=en&v=Lu6n5xwy2gi_g68Hne1LVzm4&size=normal&s=giHTy7IiJmURZZ97V38RG69PUxuVuej-nysvQwI5_GDdnqdhJfuN_bmMUV_lNkXnyXt3EgM13t3ZMICe2G4YHe4qbFBbax9leG_tKbXWt_62ZiGzFLPhnLmX_Q6PB3VzJ39WqRvX3yueZxYKZLCYKXuUu8O7aTJuJvx4NJxcx9ZALaiHqiEfuzlGPaOPWiSCqCmWctzep4uT_QQ11xehEUALwWoqXj2iVuhoLHdWnC7MIE2NvQ7bywgJwuDk1-PVu7CKbe2dqkaU6V_mhDU6hsBvqAOKYFg&anchor-ms=20000&execute-ms=15000&cb=fc9uw8908gfo"]')
-        elem = frame.locator('xpath=html/body/div[2]/div[3]/div/div/div/span').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Select all squares with traffic lights in the CAPTCHA challenge and submit to bypass the block and continue with Lighthouse audit or alternative performance measurement
-        frame = context.pages[-1].frame_locator('html > body > div:nth-of-type(2) > div:nth-of-type(4) > iframe[title="recaptcha challenge expires in two minutes"][name="c-4lur9er5sp7o"][src="https://www.google.com/recaptcha/enterprise/bframe?hl=en&v=Lu6n5xwy2gi_g68Hne1LVzm4&k=6LdLLIMbAAAAAIl-KLj9p1ePhM-4LCCDbjtJLqRO&bft=0dAFcWeA5UylOVf_NO1ABVXUCJ6vIUWumxuH1_uZ3HHlhCamW1ac2FKQhkeP4VKUSztkNsAkpqc9ivosOB0G5kcYf6z8Mg874qxA"]')
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div[2]/div/table/tbody/tr/td').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        frame = context.pages[-1].frame_locator('html > body > div:nth-of-type(2) > div:nth-of-type(4) > iframe[title="recaptcha challenge expires in two minutes"][name="c-4lur9er5sp7o"][src="https://www.google.com/recaptcha/enterprise/bframe?hl=en&v=Lu6n5xwy2gi_g68Hne1LVzm4&k=6LdLLIMbAAAAAIl-KLj9p1ePhM-4LCCDbjtJLqRO&bft=0dAFcWeA5UylOVf_NO1ABVXUCJ6vIUWumxuH1_uZ3HHlhCamW1ac2FKQhkeP4VKUSztkNsAkpqc9ivosOB0G5kcYf6z8Mg874qxA"]')
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div[2]/div/table/tbody/tr/td[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        frame = context.pages[-1].frame_locator('html > body > div:nth-of-type(2) > div:nth-of-type(4) > iframe[title="recaptcha challenge expires in two minutes"][name="c-4lur9er5sp7o"][src="https://www.google.com/recaptcha/enterprise/bframe?hl=en&v=Lu6n5xwy2gi_g68Hne1LVzm4&k=6LdLLIMbAAAAAIl-KLj9p1ePhM-4LCCDbjtJLqRO&bft=0dAFcWeA5UylOVf_NO1ABVXUCJ6vIUWumxuH1_uZ3HHlhCamW1ac2FKQhkeP4VKUSztkNsAkpqc9ivosOB0G5kcYf6z8Mg874qxA"]')
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div[2]/div/table/tbody/tr/td[3]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        frame = context.pages[-1].frame_locator('html > body > div:nth-of-type(2) > div:nth-of-type(4) > iframe[title="recaptcha challenge expires in two minutes"][name="c-4lur9er5sp7o"][src="https://www.google.com/recaptcha/enterprise/bframe?hl=en&v=Lu6n5xwy2gi_g68Hne1LVzm4&k=6LdLLIMbAAAAAIl-KLj9p1ePhM-4LCCDbjtJLqRO&bft=0dAFcWeA5UylOVf_NO1ABVXUCJ6vIUWumxuH1_uZ3HHlhCamW1ac2FKQhkeP4VKUSztkNsAkpqc9ivosOB0G5kcYf6z8Mg874qxA"]')
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div[2]/div/table/tbody/tr/td[4]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        frame = context.pages[-1].frame_locator('html > body > div:nth-of-type(2) > div:nth-of-type(4) > iframe[title="recaptcha challenge expires in two minutes"][name="c-4lur9er5sp7o"][src="https://www.google.com/recaptcha/enterprise/bframe?hl=en&v=Lu6n5xwy2gi_g68Hne1LVzm4&k=6LdLLIMbAAAAAIl-KLj9p1ePhM-4LCCDbjtJLqRO&bft=0dAFcWeA5UylOVf_NO1ABVXUCJ6vIUWumxuH1_uZ3HHlhCamW1ac2FKQhkeP4VKUSztkNsAkpqc9ivosOB0G5kcYf6z8Mg874qxA"]')
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div[2]/div/table/tbody/tr[2]/td').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        frame = context.pages[-1].frame_locator('html > body > div:nth-of-type(2) > div:nth-of-type(4) > iframe[title="recaptcha challenge expires in two minutes"][name="c-4lur9er5sp7o"][src="https://www.google.com/recaptcha/enterprise/bframe?hl=en&v=Lu6n5xwy2gi_g68Hne1LVzm4&k=6LdLLIMbAAAAAIl-KLj9p1ePhM-4LCCDbjtJLqRO&bft=0dAFcWeA5UylOVf_NO1ABVXUCJ6vIUWumxuH1_uZ3HHlhCamW1ac2FKQhkeP4VKUSztkNsAkpqc9ivosOB0G5kcYf6z8Mg874qxA"]')
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div[2]/div/table/tbody/tr[2]/td[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        frame = context.pages[-1].frame_locator('html > body > div:nth-of-type(2) > div:nth-of-type(4) > iframe[title="recaptcha challenge expires in two minutes"][name="c-4lur9er5sp7o"][src="https://www.google.com/recaptcha/enterprise/bframe?hl=en&v=Lu6n5xwy2gi_g68Hne1LVzm4&k=6LdLLIMbAAAAAIl-KLj9p1ePhM-4LCCDbjtJLqRO&bft=0dAFcWeA5UylOVf_NO1ABVXUCJ6vIUWumxuH1_uZ3HHlhCamW1ac2FKQhkeP4VKUSztkNsAkpqc9ivosOB0G5kcYf6z8Mg874qxA"]')
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div[2]/div/table/tbody/tr[2]/td[3]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        frame = context.pages[-1].frame_locator('html > body > div:nth-of-type(2) > div:nth-of-type(4) > iframe[title="recaptcha challenge expires in two minutes"][name="c-4lur9er5sp7o"][src="https://www.google.com/recaptcha/enterprise/bframe?hl=en&v=Lu6n5xwy2gi_g68Hne1LVzm4&k=6LdLLIMbAAAAAIl-KLj9p1ePhM-4LCCDbjtJLqRO&bft=0dAFcWeA5UylOVf_NO1ABVXUCJ6vIUWumxuH1_uZ3HHlhCamW1ac2FKQhkeP4VKUSztkNsAkpqc9ivosOB0G5kcYf6z8Mg874qxA"]')
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div[2]/div/table/tbody/tr[2]/td[4]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        frame = context.pages[-1].frame_locator('html > body > div:nth-of-type(2) > div:nth-of-type(4) > iframe[title="recaptcha challenge expires in two minutes"][name="c-4lur9er5sp7o"][src="https://www.google.com/recaptcha/enterprise/bframe?hl=en&v=Lu6n5xwy2gi_g68Hne1LVzm4&k=6LdLLIMbAAAAAIl-KLj9p1ePhM-4LCCDbjtJLqRO&bft=0dAFcWeA5UylOVf_NO1ABVXUCJ6vIUWumxuH1_uZ3HHlhCamW1ac2FKQhkeP4VKUSztkNsAkpqc9ivosOB0G5kcYf6z8Mg874qxA"]')
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div[2]/div/table/tbody/tr[3]/td').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        frame = context.pages[-1].frame_locator('html > body > div:nth-of-type(2) > div:nth-of-type(4) > iframe[title="recaptcha challenge expires in two minutes"][name="c-4lur9er5sp7o"][src="https://www.google.com/recaptcha/enterprise/bframe?hl=en&v=Lu6n5xwy2gi_g68Hne1LVzm4&k=6LdLLIMbAAAAAIl-KLj9p1ePhM-4LCCDbjtJLqRO&bft=0dAFcWeA5UylOVf_NO1ABVXUCJ6vIUWumxuH1_uZ3HHlhCamW1ac2FKQhkeP4VKUSztkNsAkpqc9ivosOB0G5kcYf6z8Mg874qxA"]')
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div[2]/div/table/tbody/tr[3]/td[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Select all squares with traffic lights in the CAPTCHA challenge and click the 'Verify' button to attempt to bypass the block and continue with Lighthouse audit or alternative performance measurement
-        frame = context.pages[-1].frame_locator('html > body > div:nth-of-type(2) > div:nth-of-type(4) > iframe[title="recaptcha challenge expires in two minutes"][name="c-4lur9er5sp7o"][src="https://www.google.com/recaptcha/enterprise/bframe?hl=en&v=Lu6n5xwy2gi_g68Hne1LVzm4&k=6LdLLIMbAAAAAIl-KLj9p1ePhM-4LCCDbjtJLqRO&bft=0dAFcWeA5UylOVf_NO1ABVXUCJ6vIUWumxuH1_uZ3HHlhCamW1ac2FKQhkeP4VKUSztkNsAkpqc9ivosOB0G5kcYf6z8Mg874qxA"]')
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div[2]/div/table/tbody/tr/td').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        frame = context.pages[-1].frame_locator('html > body > div:nth-of-type(2) > div:nth-of-type(4) > iframe[title="recaptcha challenge expires in two minutes"][name="c-4lur9er5sp7o"][src="https://www.google.com/recaptcha/enterprise/bframe?hl=en&v=Lu6n5xwy2gi_g68Hne1LVzm4&k=6LdLLIMbAAAAAIl-KLj9p1ePhM-4LCCDbjtJLqRO&bft=0dAFcWeA5UylOVf_NO1ABVXUCJ6vIUWumxuH1_uZ3HHlhCamW1ac2FKQhkeP4VKUSztkNsAkpqc9ivosOB0G5kcYf6z8Mg874qxA"]')
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div[2]/div/table/tbody/tr/td[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        frame = context.pages[-1].frame_locator('html > body > div:nth-of-type(2) > div:nth-of-type(4) > iframe[title="recaptcha challenge expires in two minutes"][name="c-4lur9er5sp7o"][src="https://www.google.com/recaptcha/enterprise/bframe?hl=en&v=Lu6n5xwy2gi_g68Hne1LVzm4&k=6LdLLIMbAAAAAIl-KLj9p1ePhM-4LCCDbjtJLqRO&bft=0dAFcWeA5UylOVf_NO1ABVXUCJ6vIUWumxuH1_uZ3HHlhCamW1ac2FKQhkeP4VKUSztkNsAkpqc9ivosOB0G5kcYf6z8Mg874qxA"]')
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div[2]/div/table/tbody/tr/td[3]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        frame = context.pages[-1].frame_locator('html > body > div:nth-of-type(2) > div:nth-of-type(4) > iframe[title="recaptcha challenge expires in two minutes"][name="c-4lur9er5sp7o"][src="https://www.google.com/recaptcha/enterprise/bframe?hl=en&v=Lu6n5xwy2gi_g68Hne1LVzm4&k=6LdLLIMbAAAAAIl-KLj9p1ePhM-4LCCDbjtJLqRO&bft=0dAFcWeA5UylOVf_NO1ABVXUCJ6vIUWumxuH1_uZ3HHlhCamW1ac2FKQhkeP4VKUSztkNsAkpqc9ivosOB0G5kcYf6z8Mg874qxA"]')
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div[2]/div/table/tbody/tr/td[4]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        frame = context.pages[-1].frame_locator('html > body > div:nth-of-type(2) > div:nth-of-type(4) > iframe[title="recaptcha challenge expires in two minutes"][name="c-4lur9er5sp7o"][src="https://www.google.com/recaptcha/enterprise/bframe?hl=en&v=Lu6n5xwy2gi_g68Hne1LVzm4&k=6LdLLIMbAAAAAIl-KLj9p1ePhM-4LCCDbjtJLqRO&bft=0dAFcWeA5UylOVf_NO1ABVXUCJ6vIUWumxuH1_uZ3HHlhCamW1ac2FKQhkeP4VKUSztkNsAkpqc9ivosOB0G5kcYf6z8Mg874qxA"]')
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div[2]/div/table/tbody/tr[2]/td').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        frame = context.pages[-1].frame_locator('html > body > div:nth-of-type(2) > div:nth-of-type(4) > iframe[title="recaptcha challenge expires in two minutes"][name="c-4lur9er5sp7o"][src="https://www.google.com/recaptcha/enterprise/bframe?hl=en&v=Lu6n5xwy2gi_g68Hne1LVzm4&k=6LdLLIMbAAAAAIl-KLj9p1ePhM-4LCCDbjtJLqRO&bft=0dAFcWeA5UylOVf_NO1ABVXUCJ6vIUWumxuH1_uZ3HHlhCamW1ac2FKQhkeP4VKUSztkNsAkpqc9ivosOB0G5kcYf6z8Mg874qxA"]')
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div[2]/div/table/tbody/tr[2]/td[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        frame = context.pages[-1].frame_locator('html > body > div:nth-of-type(2) > div:nth-of-type(4) > iframe[title="recaptcha challenge expires in two minutes"][name="c-4lur9er5sp7o"][src="https://www.google.com/recaptcha/enterprise/bframe?hl=en&v=Lu6n5xwy2gi_g68Hne1LVzm4&k=6LdLLIMbAAAAAIl-KLj9p1ePhM-4LCCDbjtJLqRO&bft=0dAFcWeA5UylOVf_NO1ABVXUCJ6vIUWumxuH1_uZ3HHlhCamW1ac2FKQhkeP4VKUSztkNsAkpqc9ivosOB0G5kcYf6z8Mg874qxA"]')
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div[2]/div/table/tbody/tr[2]/td[3]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        frame = context.pages[-1].frame_locator('html > body > div:nth-of-type(2) > div:nth-of-type(4) > iframe[title="recaptcha challenge expires in two minutes"][name="c-4lur9er5sp7o"][src="https://www.google.com/recaptcha/enterprise/bframe?hl=en&v=Lu6n5xwy2gi_g68Hne1LVzm4&k=6LdLLIMbAAAAAIl-KLj9p1ePhM-4LCCDbjtJLqRO&bft=0dAFcWeA5UylOVf_NO1ABVXUCJ6vIUWumxuH1_uZ3HHlhCamW1ac2FKQhkeP4VKUSztkNsAkpqc9ivosOB0G5kcYf6z8Mg874qxA"]')
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div[2]/div/table/tbody/tr[2]/td[4]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        frame = context.pages[-1].frame_locator('html > body > div:nth-of-type(2) > div:nth-of-type(4) > iframe[title="recaptcha challenge expires in two minutes"][name="c-4lur9er5sp7o"][src="https://www.google.com/recaptcha/enterprise/bframe?hl=en&v=Lu6n5xwy2gi_g68Hne1LVzm4&k=6LdLLIMbAAAAAIl-KLj9p1ePhM-4LCCDbjtJLqRO&bft=0dAFcWeA5UylOVf_NO1ABVXUCJ6vIUWumxuH1_uZ3HHlhCamW1ac2FKQhkeP4VKUSztkNsAkpqc9ivosOB0G5kcYf6z8Mg874qxA"]')
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div[2]/div/table/tbody/tr[3]/td').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+        # Measure opening the chat widget from its floating button until the composer is usable
+        frame = context.pages[-1]
+        launcher = frame.locator('button.fixed.rounded-full').nth(0)
+        composer = frame.locator('input[placeholder="Type your message..."]').nth(0)
+        async with profiler.measure("open_widget") as open_widget:
+            await waits.click(launcher, "Open the chat widget")
+            await composer.wait_for(state="visible")
 
-        frame = context.pages[-1].frame_locator('html > body > div:nth-of-type(2) > div:nth-of-type(4) > iframe[title="recaptcha challenge expires in two minutes"][name="c-4lur9er5sp7o"][src="https://www.google.com/recaptcha/enterprise/bframe?hl=en&v=Lu6n5xwy2gi_g68Hne1LVzm4&k=6LdLLIMbAAAAAIl-KLj9p1ePhM-4LCCDbjtJLqRO&bft=0dAFcWeA5UylOVf_NO1ABVXUCJ6vIUWumxuH1_uZ3HHlhCamW1ac2FKQhkeP4VKUSztkNsAkpqc9ivosOB0G5kcYf6z8Mg874qxA"]')
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div[2]/div/table/tbody/tr[3]/td[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
 
-        # Run Lighthouse PWA audit locally on the current page to measure main thread work, performance, and PWA compliance scores
+        # Measure sending the first message until the assistant's reply is rendered
         frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        assert False, 'Test plan execution failed: generic failure assertion as expected result is unknown.'
-        await asyncio.sleep(5)
-    
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+        messages = frame.locator('p.text-sm.leading-relaxed')
+        before = await messages.count()
+        await waits.fill(composer, 'What does ODIADEV do?', "Type the first message")
+        async with profiler.measure("first_message") as first_message:
+            await composer.press('Enter')
+            await waits.settle()
+            await messages.nth(before + 1).wait_for(state="visible", timeout=15000)
+
+
+        # Assert the widget's main-thread work stays within its budgets
+        print(profiler.report())
+        assert_within_budget(open_widget, BUDGETS["open_widget"])
+        assert_within_budget(first_message, BUDGETS["first_message"])
+
+        # Assert the built bundle (when dist/ exists) is within its gzip budgets and has not regressed
+        if bundle.DIST_DIR.joinpath("assets").is_dir():
+            problems = bundle.compare(bundle.analyze(), bundle.load_baseline())
+            assert not problems, f"Bundle size check failed: {'; '.join(problems)}"
+
+if __name__ == "__main__":
+    asyncio.run(run_test())
@@ -0,0 +1,97 @@
+import asyncio
+import json
+import uuid
+from urllib.parse import quote
+from playwright import async_api
+from harness.browser import browser_context
+from harness.waits import WaitEngine
+
+TEXT = "Welcome to ODIADEV. We build voice agents for Nigerian businesses, from first hello to booked appointment."
+VOICE_ID = "naija_female_warm"
+
+# /api/tts caches clips by text and voice, so each mode gets its own sentence (same length, tagged per run)
+# and both measure a cache miss
+RUN = uuid.uuid4().hex[:6]
+JSON_TEXT = f"{TEXT} Reference {RUN} one."
+STREAM_TEXT = f"{TEXT} Reference {RUN} two."
+
+# Fetches /api/tts from the page and reports when the first body byte arrived and how many bytes came over the wire
+MEASURE_TTS = """
+async ({ url, init }) => {
+  const started = performance.now()
+  const response = await fetch(url, init)
+  const reader = response.body.getReader()
+  let firstByteMs = null
+  let bytes = 0
+  for (;;) {
+    const { done, value } = await reader.read()
+    if (done) break
+    if (firstByteMs === null) firstByteMs = performance.now() - started
+    bytes += value.byteLength
+  }
+  return {
+    status: response.status,
+    contentType: response.headers.get('content-type') || '',
+    cache: response.headers.get('x-tts-cache'),
+    firstByteMs,
+    totalMs: performance.now() - started,
+    bytes,
+  }
+}
+"""
+
+async def run_test(browser=None):
+    async with browser_context(browser) as context:
+
+        # Open a new page in the browser context
+        page = await context.new_page()
+        waits = WaitEngine(context)
+
+        # Navigate to your target URL and wait until the network request is committed
+        await page.goto("http://localhost:5174", wait_until="commit", timeout=10000)
+
+        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
+        try:
+            await page.wait_for_load_state("domcontentloaded", timeout=3000)
+        except async_api.Error:
+            pass
+
+        # Request a sentence in the legacy JSON mode (base64 data URL inside JSON)
+        json_mode = await page.evaluate(MEASURE_TTS, {
+            "url": "/api/tts",
+            "init": {
+                "method": "POST",
+                "headers": {"Content-Type": "application/json"},
+                "body": json.dumps({"text": JSON_TEXT, "voice_id": VOICE_ID, "format": "mp3"}),
+            },
+        })
+
+        # Request a sentence of the same length in streaming mode, the way the widget's <audio> element does
+        stream_mode = await page.evaluate(MEASURE_TTS, {
+            "url": f"/api/tts?stream=1&voice_id={VOICE_ID}&format=mp3&text={quote(STREAM_TEXT)}",
+            "init": {"headers": {"Accept": "audio/mpeg"}},
+        })
+        await waits.settle()
+
+        print(f"TTS json:   first byte {json_mode['firstByteMs']:.1f} ms, total {json_mode['totalMs']:.1f} ms, {json_mode['bytes']} bytes")
+        print(f"TTS stream: first byte {stream_mode['firstByteMs']:.1f} ms, total {stream_mode['totalMs']:.1f} ms, {stream_mode['bytes']} bytes")
+
+        # Assert both modes answer, and the streaming mode is raw audio rather than JSON
+        assert json_mode["status"] == 200, f"JSON mode returned {json_mode['status']}"
+        assert stream_mode["status"] == 200, f"Streaming mode returned {stream_mode['status']}"
+        assert json_mode["contentType"].startswith("application/json"), json_mode["contentType"]
+        assert stream_mode["contentType"].startswith("audio/mpeg"), stream_mode["contentType"]
+
+        # Assert neither request was answered from the audio cache, so the comparison is stream vs buffered
+        assert json_mode["cache"] in (None, "miss") and stream_mode["cache"] in (None, "miss"), \
+            f"Expected two cache misses, got json={json_mode['cache']} stream={stream_mode['cache']}"
+
+        # Assert streaming starts no later than the buffered JSON response and skips the base64 overhead
+        assert stream_mode["firstByteMs"] <= json_mode["firstByteMs"] * 1.1 + 5, \
+            f"Streaming first byte {stream_mode['firstByteMs']:.1f} ms is slower than JSON {json_mode['firstByteMs']:.1f} ms"
+        assert stream_mode["bytes"] < json_mode["bytes"], \
+            f"Streaming sent {stream_mode['bytes']} bytes, JSON sent {json_mode['bytes']}"
+
+if __name__ == "__main__":
+    asyncio.run(run_test())
+
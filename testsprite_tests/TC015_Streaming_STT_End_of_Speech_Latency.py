@@ -0,0 +1,95 @@
+import asyncio
+from playwright import async_api
+from harness.browser import browser_context
+from harness.waits import WaitEngine
+
+# Simulates a 2 s utterance recorded with MediaRecorder.start(250) and measures end-of-speech to final
+# transcript for the streaming upload (chunks sent while recording) and the legacy whole-recording upload
+MEASURE_STT = """
+async ({ chunks, chunkBytes, intervalMs }) => {
+  const sleep = ms => new Promise(r => setTimeout(r, ms))
+  let seed = 7
+  const chunk = () => {
+    const bytes = new Uint8Array(chunkBytes)
+    for (let i = 0; i < bytes.length; i++) bytes[i] = (seed = (seed * 1103515245 + 12345) & 0x7fffffff) & 0xff
+    return bytes
+  }
+
+  // Streaming: each chunk is uploaded as soon as the recorder emits it
+  const session = crypto.randomUUID()
+  const started = performance.now()
+  const partials = []
+  const uploads = []
+  const recorded = []
+  for (let seq = 0; seq < chunks; seq++) {
+    await sleep(intervalMs)
+    const data = chunk()
+    recorded.push(data)
+    uploads.push(fetch(`/api/stt?session=${session}&seq=${seq}`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/octet-stream' },
+      body: data,
+    }).then(r => r.json()).then(p => partials.push({ at: performance.now() - started, text: p.text })))
+  }
+  const streamEnd = performance.now()
+  await Promise.all(uploads)
+  const final = await (await fetch(`/api/stt?session=${session}&final=1&chunks=${chunks}`, { method: 'POST' })).json()
+  const streamLatency = performance.now() - streamEnd
+
+  // Legacy: the whole recording is base64-encoded and uploaded after the recorder stops
+  const legacyEnd = performance.now()
+  const whole = new Uint8Array(chunks * chunkBytes)
+  recorded.forEach((data, i) => whole.set(data, i * chunkBytes))
+  let binary = ''
+  whole.forEach(b => { binary += String.fromCharCode(b) })
+  const legacy = await (await fetch('/api/stt', {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ audioBase64: btoa(binary), mimeType: 'audio/webm' }),
+  })).json()
+  const legacyLatency = performance.now() - legacyEnd
+
+  return {
+    streamLatency, legacyLatency, final, legacy,
+    partialsBeforeEnd: partials.filter(p => p.at <= streamEnd - started && p.text).length,
+  }
+}
+"""
+
+async def run_test(browser=None):
+    async with browser_context(browser) as context:
+
+        # Open a new page in the browser context
+        page = await context.new_page()
+        waits = WaitEngine(context)
+
+        # Navigate to your target URL and wait until the network request is committed
+        await page.goto("http://localhost:5174", wait_until="commit", timeout=10000)
+
+        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
+        try:
+            await page.wait_for_load_state("domcontentloaded", timeout=3000)
+        except async_api.Error:
+            pass
+
+        # Speak for 2 s in 250 ms chunks, then stop and wait for the final transcript both ways
+        result = await page.evaluate(MEASURE_STT, {"chunks": 8, "chunkBytes": 8000, "intervalMs": 250})
+        await waits.settle()
+
+        print(f"STT end of speech -> final transcript: streaming {result['streamLatency']:.1f} ms, "
+              f"whole upload {result['legacyLatency']:.1f} ms, {result['partialsBeforeEnd']} partials while speaking")
+
+        # Assert partial transcripts arrived while the user was still speaking
+        assert result["partialsBeforeEnd"] > 0, "No partial transcript arrived before the end of speech"
+
+        # Assert the final transcript is complete and marked final
+        assert result["final"].get("final") is True, f"Final response not marked final: {result['final']}"
+        assert result["final"].get("text"), f"Empty final transcript: {result['final']}"
+        assert result["legacy"].get("text"), f"Whole-recording upload returned no text: {result['legacy']}"
+
+        # Assert streaming gets the final transcript to the user sooner than uploading after the recorder stops
+        assert result["streamLatency"] <= result["legacyLatency"] + 5, \
+            f"Streaming final took {result['streamLatency']:.1f} ms vs {result['legacyLatency']:.1f} ms for a whole upload"
+
+if __name__ == "__main__":
+    asyncio.run(run_test())
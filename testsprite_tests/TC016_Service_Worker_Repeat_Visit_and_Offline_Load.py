@@ -0,0 +1,181 @@
+import asyncio
+import re
+from playwright import async_api
+from harness.browser import browser_context
+from harness.waits import WaitEngine
+
+# Extends TC006 (offline mode): the service worker must serve the app shell and hashed assets on a repeat
+# visit and with the network down. Needs a production build (npm run build && npm run preview -- --port 5174);
+# the dev server does not register the worker.
+
+# Resolves once the service worker controls the page, or false if none registers
+WAIT_FOR_CONTROLLER = """
+async () => {
+  if (!('serviceWorker' in navigator)) return false
+  const registration = await Promise.race([
+    navigator.serviceWorker.ready,
+    new Promise(resolve => setTimeout(() => resolve(null), 10000)),
+  ])
+  if (!registration) return false
+  if (!navigator.serviceWorker.controller) {
+    await new Promise(resolve => navigator.serviceWorker.addEventListener('controllerchange', resolve, { once: true }))
+  }
+  return true
+}
+"""
+
+MEASURE_LOAD = """
+() => {
+  const nav = performance.getEntriesByType('navigation')[0]
+  return {
+    loadMs: nav.loadEventEnd - nav.startTime,
+    domContentLoadedMs: nav.domContentLoadedEventEnd - nav.startTime,
+    transferSize: nav.transferSize,
+    rendered: document.getElementById('root')?.childElementCount > 0,
+  }
+}
+"""
+
+LIST_CACHES = """
+async () => {
+  const result = {}
+  for (const name of await caches.keys()) {
+    result[name] = (await (await caches.open(name)).keys()).map(request => new URL(request.url).pathname + new URL(request.url).search)
+  }
+  return result
+}
+"""
+
+# Replaces the page's cached navigation response with a stand-in for a previous build's index.html
+PLANT_OLD_SHELL = """
+async (marker) => {
+  const name = (await caches.keys()).find(name => name.startsWith('odiadev-pages-'))
+  if (!name) return null
+  await (await caches.open(name)).put(location.href, new Response(
+    `<!doctype html><title>${marker}</title><script type="module" src="/assets/index-0ld0ld.js"></script>`,
+    { headers: { 'Content-Type': 'text/html' } }))
+  return name
+}
+"""
+
+# Asks the browser to check for a new worker and resolves once it has taken control
+UPDATE_WORKER = """
+async () => {
+  const registration = await navigator.serviceWorker.getRegistration()
+  const changed = new Promise(resolve => navigator.serviceWorker.addEventListener('controllerchange', resolve, { once: true }))
+  await registration.update()
+  return Promise.race([changed.then(() => true), new Promise(resolve => setTimeout(() => resolve(false), 10000))])
+}
+"""
+
+OLD_SHELL = "tc016-previous-build-shell"
+NEXT_VERSION_SUFFIX = "-tc016next"
+
+CANNED_TTS_URL = "/api/tts?stream=1&canned=1&format=mp3&voice_id=naija_female_warm&text=Hello%21"
+
+FETCH_STATUS = """
+async (url) => {
+  try {
+    const response = await fetch(url)
+    await response.arrayBuffer()
+    return response.status
+  } catch (e) {
+    return 0
+  }
+}
+"""
+
+async def load(page, label, served_by_worker):
+    served_by_worker.clear()
+    await page.reload(wait_until="load", timeout=10000)
+    metrics = await page.evaluate(MEASURE_LOAD)
+    metrics["fromServiceWorker"] = len(served_by_worker)
+    print(f"{label}: load {metrics['loadMs']:.1f} ms, DOMContentLoaded {metrics['domContentLoadedMs']:.1f} ms, "
+          f"{metrics['fromServiceWorker']} responses from the service worker")
+    return metrics
+
+async def run_test(browser=None):
+    async with browser_context(browser) as context:
+
+        # Open a new page in the browser context
+        page = await context.new_page()
+        waits = WaitEngine(context)
+        served_by_worker = []
+        page.on("response", lambda response: served_by_worker.append(response.url) if response.from_service_worker else None)
+
+        # First visit: nothing cached yet; the worker installs and precaches after load
+        await page.goto("http://localhost:5174", wait_until="load", timeout=10000)
+        first = await page.evaluate(MEASURE_LOAD)
+        print(f"first visit: load {first['loadMs']:.1f} ms, DOMContentLoaded {first['domContentLoadedMs']:.1f} ms")
+
+        controlled = await page.evaluate(WAIT_FOR_CONTROLLER)
+        assert controlled, "No service worker took control; run this against a production build"
+        await waits.settle()
+
+        # Assert exactly one versioned precache holds the shell and the hashed build assets
+        cache_contents = await page.evaluate(LIST_CACHES)
+        precaches = [name for name in cache_contents if name.startswith("odiadev-precache-")]
+        assert len(precaches) == 1, f"Expected one precache version, found {sorted(cache_contents)}"
+        precached = cache_contents[precaches[0]]
+        assert "/" in precached, f"App shell not precached: {precached}"
+        assert any(url.startswith("/assets/") and url.endswith(".js") for url in precached), \
+            f"No hashed JS chunks precached: {precached}"
+        assert not any(name.startswith("adaqua-ai-") for name in cache_contents), \
+            f"CRA-era caches present in a fresh context: {sorted(cache_contents)}"
+
+        # Repeat visit: shell and assets come from the worker
+        repeat = await load(page, "repeat visit", served_by_worker)
+        assert repeat["rendered"], "App did not render on the repeat visit"
+        assert repeat["fromServiceWorker"] > 0, "Repeat visit did not use the service worker"
+
+        # Canned phrase audio is cache-first; skipped when TTS is unavailable in this environment
+        tts_online = await page.evaluate(FETCH_STATUS, CANNED_TTS_URL)
+
+        # Offline visit: the same page must still load entirely from the worker's caches
+        await context.set_offline(True)
+        try:
+            offline = await load(page, "offline visit", served_by_worker)
+            assert offline["rendered"], "App did not render offline"
+            assert offline["fromServiceWorker"] > 0, "Offline visit was not served by the service worker"
+
+            if tts_online == 200:
+                assert await page.evaluate(FETCH_STATUS, CANNED_TTS_URL) == 200, "Canned TTS audio was not cached"
+
+            # Chat replies are network-only: offline they must fail rather than replay a cached answer
+            cache_contents = await page.evaluate(LIST_CACHES)
+            cached_urls = [url for urls in cache_contents.values() for url in urls]
+            assert not any(url.startswith("/api/chat") for url in cached_urls), "A /api/chat response was cached"
+        finally:
+            await context.set_offline(False)
+
+        print(f"repeat visit {repeat['loadMs']:.1f} ms and offline {offline['loadMs']:.1f} ms "
+              f"vs first visit {first['loadMs']:.1f} ms")
+
+        # Deploy a second build: plant a previous-build shell in the current pages cache, then serve the worker
+        # with a new manifest version and let it take over
+        old_pages = await page.evaluate(PLANT_OLD_SHELL, OLD_SHELL)
+        assert old_pages, f"No pages cache after the repeat visit: {sorted(cache_contents)}"
+
+        async def next_build_worker(route):
+            response = await route.fetch()
+            script = re.sub(r'"version":"([^"]+)"', lambda m: f'"version":"{m.group(1)}{NEXT_VERSION_SUFFIX}"',
+                            await response.text(), count=1)
+            await route.fulfill(response=response, body=script, headers={**response.headers, "cache-control": "no-store"})
+
+        await context.route(re.compile(r"/sw\.js$"), next_build_worker)
+        assert await page.evaluate(UPDATE_WORKER), "The next build's service worker did not take control"
+        await page.reload(wait_until="load", timeout=10000)
+        title = await page.title()
+        rendered = (await page.evaluate(MEASURE_LOAD))["rendered"]
+        cache_contents = await page.evaluate(LIST_CACHES)
+        print(f"after update: caches {sorted(cache_contents)}, title {title!r}")
+
+        # Assert the new worker dropped every cache of the previous version, pages included, and serves its own shell
+        assert all(name.endswith(NEXT_VERSION_SUFFIX) for name in cache_contents
+                   if name.startswith(("odiadev-precache-", "odiadev-pages-"))), \
+            f"Caches from the previous version survived the update: {sorted(cache_contents)}"
+        assert old_pages not in cache_contents, f"{old_pages} survived the update"
+        assert title != OLD_SHELL and rendered, "The previous build's shell was served after the update"
+
+if __name__ == "__main__":
+    asyncio.run(run_test())
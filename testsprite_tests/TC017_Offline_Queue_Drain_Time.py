@@ -0,0 +1,117 @@
+import asyncio
+import math
+from playwright import async_api
+from harness.browser import browser_context
+from harness.waits import WaitEngine
+
+QUEUED_CHAT = 60
+QUEUED_LEADS = 140
+CHAT_BATCH = 20   # src/lib/outbox.ts BATCH_SIZE
+LEAD_BATCH = 100
+
+# Writes items straight into the outbox's IndexedDB store (same schema as src/lib/outbox.ts), as if they had
+# been queued during an outage: chat messages first, then lead submissions
+SEED_OUTBOX = """
+async ({ chat, leads }) => {
+  const db = await new Promise((resolve, reject) => {
+    const request = indexedDB.open('odiadev-outbox', 1)
+    request.onupgradeneeded = () => {
+      request.result.createObjectStore('requests', { keyPath: 'seq', autoIncrement: true })
+        .createIndex('key', 'key', { unique: true })
+    }
+    request.onsuccess = () => resolve(request.result)
+    request.onerror = () => reject(request.error)
+  })
+  const tx = db.transaction('requests', 'readwrite')
+  const store = tx.objectStore('requests')
+  const now = Date.now()
+  const item = (kind, key, origin, body) => ({ key, kind, origin, body, attempts: 0, nextAttemptAt: now, queuedAt: now })
+  for (let i = 0; i < chat; i++) {
+    store.add(item('chat', `tc017-chat-${i}`, 'chat-widget', { message: `Queued message ${i} about voice agents`, sessionId: 'tc017' }))
+  }
+  for (let i = 0; i < leads; i++) {
+    store.add(item('lead', `tc017-lead-${i}`, 'contact-form', {
+      type: 'lead', name: `Lead ${i}`, email: `lead${i}@example.com`, message: 'Queued while offline', source: 'contact_form',
+    }))
+  }
+  await new Promise((resolve, reject) => { tx.oncomplete = resolve; tx.onerror = () => reject(tx.error) })
+  db.close()
+}
+"""
+
+# Starts timing at the online event and resolves when the outbox store is empty
+MEASURE_DRAIN = """
+async (timeoutMs) => {
+  const count = () => new Promise((resolve, reject) => {
+    const request = indexedDB.open('odiadev-outbox', 1)
+    request.onsuccess = () => {
+      const db = request.result
+      const counter = db.transaction('requests', 'readonly').objectStore('requests').count()
+      counter.onsuccess = () => { db.close(); resolve(counter.result) }
+      counter.onerror = () => { db.close(); reject(counter.error) }
+    }
+    request.onerror = () => reject(request.error)
+  })
+  const started = await new Promise(resolve => {
+    if (navigator.onLine) resolve(performance.now())
+    else window.addEventListener('online', () => resolve(performance.now()), { once: true })
+  })
+  for (;;) {
+    const remaining = await count()
+    if (remaining === 0) return { drainMs: performance.now() - started, remaining }
+    if (performance.now() - started > timeoutMs) return { drainMs: null, remaining }
+    await new Promise(resolve => setTimeout(resolve, 10))
+  }
+}
+"""
+
+async def run_test(browser=None):
+    async with browser_context(browser) as context:
+
+        # Open a new page in the browser context
+        page = await context.new_page()
+        waits = WaitEngine(context)
+
+        # Navigate to your target URL and wait until the network request is committed
+        await page.goto("http://localhost:5174", wait_until="commit", timeout=10000)
+
+        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
+        try:
+            await page.wait_for_load_state("domcontentloaded", timeout=3000)
+        except async_api.Error:
+            pass
+        await waits.settle()
+
+        # Go offline and queue a backlog, as after a long outage
+        await context.set_offline(True)
+        await page.evaluate(SEED_OUTBOX, {"chat": QUEUED_CHAT, "leads": QUEUED_LEADS})
+
+        replays = []
+        page.on("response", lambda response: replays.append((response.url, response.status))
+                if "/api/chat" in response.url or "/api/events" in response.url else None)
+
+        # Come back online and time how long the app takes to empty the queue
+        drain = asyncio.ensure_future(page.evaluate(MEASURE_DRAIN, 15000))
+        await asyncio.sleep(0.2)
+        await context.set_offline(False)
+        result = await drain
+        await waits.settle()
+
+        queued = QUEUED_CHAT + QUEUED_LEADS
+        expected_requests = math.ceil(QUEUED_CHAT / CHAT_BATCH) + math.ceil(QUEUED_LEADS / LEAD_BATCH)
+        print(f"Drained {queued} queued items in {result['drainMs']} ms with {len(replays)} requests "
+              f"(batched minimum {expected_requests})")
+
+        # Assert the queue emptied after reconnecting
+        assert result["drainMs"] is not None, f"{result['remaining']} of {queued} items still queued after 15 s"
+
+        # Assert items were delivered, not dropped as rejected by the server
+        failed = [(url, status) for url, status in replays if status >= 400]
+        assert not failed, f"Replay requests failed: {failed[:5]}"
+
+        # Assert replay was batched rather than one request per item
+        assert len(replays) <= expected_requests + 2, \
+            f"{len(replays)} replay requests for {queued} items; expected about {expected_requests}"
+
+if __name__ == "__main__":
+    asyncio.run(run_test())
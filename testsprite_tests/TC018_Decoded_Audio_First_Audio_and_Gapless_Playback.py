@@ -0,0 +1,115 @@
+import asyncio
+import re
+from playwright import async_api
+from harness.browser import browser_context
+from harness.waits import WaitEngine
+
+MESSAGES = [
+    "What does ODIADEV build?",
+    "How much does a voice agent cost?",
+    "Can it speak Nigerian Pidgin?",
+]
+
+# Records when the user sent a message (Enter in the widget input) or pressed a button, in performance.now() time
+RECORD_INPUT = """
+window.__tc018 = { sends: [], clicks: [] }
+document.addEventListener('keydown', e => {
+  if (e.key === 'Enter' && e.target.placeholder === 'Type your message...') window.__tc018.sends.push(performance.now())
+}, true)
+document.addEventListener('click', e => {
+  if (e.target.closest('button')) window.__tc018.clicks.push(performance.now())
+}, true)
+"""
+
+# Clips scheduled by src/lib/audio.ts, oldest first
+AUDIO_CLIPS = """
+() => performance.getEntriesByName('odiadev:audio-clip').map(mark => mark.detail)
+"""
+
+CLIP_COUNT = "n => performance.getEntriesByName('odiadev:audio-clip').length >= n"
+
+# True once the last scheduled clip has finished playing
+PLAYBACK_DONE = """
+() => {
+  const clips = performance.getEntriesByName('odiadev:audio-clip')
+  const last = clips[clips.length - 1]?.detail
+  return !!last && performance.now() > last.startTime + last.duration
+}
+"""
+
+async def run_test(browser=None):
+    async with browser_context(browser) as context:
+
+        # Open a new page in the browser context
+        await context.add_init_script(RECORD_INPUT)
+        page = await context.new_page()
+        waits = WaitEngine(context)
+
+        tts_requests = []
+        chat_replies = []
+        page.on("request", lambda request: tts_requests.append(request.url) if "/api/tts" in request.url else None)
+        page.on("requestfinished", lambda request: chat_replies.append(request.url) if "/api/chat" in request.url else None)
+
+        # Navigate to your target URL and wait until the network request is committed
+        await page.goto("http://localhost:5174", wait_until="commit", timeout=10000)
+
+        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
+        try:
+            await page.wait_for_load_state("domcontentloaded", timeout=3000)
+        except async_api.Error:
+            pass
+        await waits.settle()
+
+        # Open the chat widget and send the first message; time from Enter to the first scheduled audio
+        await waits.click(page.locator("button.fixed.bottom-4.right-4").nth(0), "Open the chat widget")
+        message_input = page.get_by_placeholder("Type your message...")
+        await waits.fill(message_input, MESSAGES[0], "Type the first message")
+        await message_input.press("Enter")
+        await page.wait_for_function(CLIP_COUNT, arg=1, timeout=20000)
+        sends = await page.evaluate("window.__tc018.sends")
+        clips = await page.evaluate(AUDIO_CLIPS)
+        first_audio_ms = clips[0]["startTime"] - sends[0]
+
+        # Send two more messages back to back, without waiting on /api, so their replies queue behind each other
+        for text in MESSAGES[1:]:
+            await message_input.fill(text)
+            await message_input.press("Enter")
+        for _ in range(300):
+            if len(chat_replies) >= len(MESSAGES):
+                break
+            await asyncio.sleep(0.1)
+        await waits.settle(timeout=30000)
+        await page.wait_for_function(PLAYBACK_DONE, timeout=30000)
+        clips = await page.evaluate(AUDIO_CLIPS)
+
+        # A gap only counts when the next clip was ready before the previous one ended
+        gaps = []
+        for previous, clip in zip(clips, clips[1:]):
+            previous_end = previous["startTime"] + previous["duration"]
+            if clip["scheduledAt"] < previous_end:
+                gaps.append(clip["startTime"] - previous_end)
+
+        # Replay the first reply from its Play button; its decoded sentences should come from the cache
+        requests_before = len(tts_requests)
+        clips_before = len(clips)
+        await waits.click(page.get_by_role("button", name=re.compile("Play")).nth(1), "Replay the first reply")
+        await page.wait_for_function(CLIP_COUNT, arg=clips_before + 1, timeout=5000)
+        clicks = await page.evaluate("window.__tc018.clicks")
+        replay = (await page.evaluate(AUDIO_CLIPS))[clips_before]
+        replay_ms = replay["startTime"] - clicks[-1]
+
+        print(f"Send to first audio: {first_audio_ms:.1f} ms")
+        print(f"Gaps between queued clips: {', '.join(f'{g:.2f} ms' for g in gaps) or 'none queued'}")
+        print(f"Replay from cache: {replay_ms:.1f} ms, {len(tts_requests) - requests_before} new /api/tts requests")
+
+        # Assert clips queued behind each other play back to back (scheduled on the audio clock, not after 'ended')
+        assert gaps, f"No clip was queued before its predecessor ended ({len(clips)} clips); nothing measured the gaps"
+        assert all(abs(gap) < 5 for gap in gaps), f"Gaps between queued clips: {gaps}"
+
+        # Assert a repeated phrase is neither fetched nor decoded again
+        assert len(tts_requests) == requests_before, \
+            f"Replaying a cached clip made {len(tts_requests) - requests_before} /api/tts requests"
+        assert replay_ms < 100, f"Replaying a cached clip took {replay_ms:.1f} ms to start"
+
+if __name__ == "__main__":
+    asyncio.run(run_test())
@@ -0,0 +1,177 @@
+import asyncio
+import base64
+import json
+import re
+from urllib.parse import parse_qsl, urlsplit
+from playwright import async_api
+from harness.browser import browser_context
+from harness.stubs import silent_mp3
+from harness.waits import WaitEngine
+
+SENTENCE = "Our voice agent number {} answers customers on WhatsApp in under a second."
+SENTENCE_COUNTS = (1, 5, 20)
+MAX_PARALLEL = 3  # src/lib/speech.ts
+
+# Local TTS stand-in whose synthesis time grows with the text, like the real engine
+SYNTH_BASE_MS = 150
+SYNTH_MS_PER_CHAR = 4
+
+# Records each Enter in the widget input with how many clips had been scheduled by then, in performance.now() time
+RECORD_SENDS = """
+window.__tc019 = { sends: [] }
+document.addEventListener('keydown', e => {
+  if (e.key === 'Enter' && e.target.placeholder === 'Type your message...') {
+    window.__tc019.sends.push({ at: performance.now(), clips: performance.getEntriesByName('odiadev:audio-clip').length })
+  }
+}, true)
+"""
+
+AUDIO_CLIPS = "() => performance.getEntriesByName('odiadev:audio-clip').map(mark => mark.detail)"
+
+CLIP_AFTER_SEND = """
+() => {
+  const sends = window.__tc019.sends
+  return sends.length > 0 && performance.getEntriesByName('odiadev:audio-clip').length > sends[sends.length - 1].clips
+}
+"""
+
+
+def reply(count):
+    return " ".join(SENTENCE.format(i + 1) for i in range(count))
+
+
+class Backend:
+    """Routes /api/chat to a reply of ``sentences`` sentences and /api/tts to the synthesis stand-in.
+
+    With ``pipelined`` off the streaming GET fails, so the widget falls back to its single-shot path:
+    one JSON POST for the whole reply.
+    """
+
+    def __init__(self):
+        self.sentences = 1
+        self.pipelined = True
+
+    async def chat(self, route):
+        await route.fulfill(status=200, content_type="application/json",
+                            body=json.dumps({"reply": reply(self.sentences), "source": "tc019"}))
+
+    async def tts(self, route):
+        request = route.request
+        if request.method == "GET":
+            if not self.pipelined:
+                await route.fulfill(status=503, content_type="application/json", body='{"error": "tc019 single-shot"}')
+                return
+            text = dict(parse_qsl(urlsplit(request.url).query)).get("text", "")
+        else:
+            text = (request.post_data_json or {}).get("text", "")
+        await asyncio.sleep((SYNTH_BASE_MS + SYNTH_MS_PER_CHAR * len(text)) / 1000)
+        audio = silent_mp3(len(text))
+        if request.method == "GET":
+            await route.fulfill(status=200, content_type="audio/mpeg", headers={"Cache-Control": "no-store"}, body=audio)
+        else:
+            await route.fulfill(status=200, content_type="application/json", body=json.dumps({
+                "audioUrl": "data:audio/mp3;base64," + base64.b64encode(audio).decode(), "format": "mp3"}))
+
+
+async def open_widget(context):
+    page = await context.new_page()
+    waits = WaitEngine(context)
+
+    # Navigate to your target URL and wait until the network request is committed
+    await page.goto("http://localhost:5174", wait_until="commit", timeout=10000)
+
+    # Wait for the main page to reach DOMContentLoaded state (optional for stability)
+    try:
+        await page.wait_for_load_state("domcontentloaded", timeout=3000)
+    except async_api.Error:
+        pass
+    await waits.settle()
+
+    # Open the chat widget
+    await waits.click(page.locator("button.fixed.bottom-4.right-4").nth(0), "Open the chat widget")
+    return page, waits
+
+
+async def ask(page, waits):
+    """Send a question and return the ms from Enter to the reply's first scheduled clip."""
+    message_input = page.get_by_placeholder("Type your message...")
+    await waits.fill(message_input, "Tell me everything about your voice agents", "Type the question")
+    await message_input.press("Enter")
+    await page.wait_for_function(CLIP_AFTER_SEND, timeout=20000)
+    send = (await page.evaluate("window.__tc019.sends"))[-1]
+    return (await page.evaluate(AUDIO_CLIPS))[send["clips"]]["startTime"] - send["at"]
+
+
+async def run_test(browser=None):
+    async with browser_context(browser) as context:
+
+        # Open pages in the browser context; /api/tts and /api/chat are answered locally
+        backend = Backend()
+        await context.route(re.compile(r"/api/tts(\?.*)?$"), backend.tts)
+        await context.route(re.compile(r"/api/chat$"), backend.chat)
+        await context.add_init_script(RECORD_SENDS)
+
+        # Time Enter to first audio in the widget for short, medium and long replies, spoken single-shot and
+        # sentence by sentence; a fresh page each time so no clip is cached or queued from the previous run
+        results = {}
+        for count in SENTENCE_COUNTS:
+            backend.sentences = count
+            for pipelined in (False, True):
+                backend.pipelined = pipelined
+                page, waits = await open_widget(context)
+                results[count, pipelined] = await ask(page, waits)
+                await page.close()
+            print(f"{count:2} sentences: single-shot first audio {results[count, False]:7.1f} ms, "
+                  f"pipelined {results[count, True]:7.1f} ms")
+
+        # Track the widget's /api/tts requests on a long reply to check its parallelism and cancellation
+        backend.sentences = 20
+        backend.pipelined = True
+        page, waits = await open_widget(context)
+        in_flight = set()
+        peak = 0
+        started_urls = []
+        aborted = []
+        def on_request(request):
+            nonlocal peak
+            if "/api/tts" in request.url:
+                in_flight.add(request)
+                started_urls.append(request.url)
+                peak = max(peak, len(in_flight))
+        page.on("request", on_request)
+        page.on("requestfinished", lambda request: in_flight.discard(request))
+        page.on("requestfailed", lambda request: (in_flight.discard(request), aborted.append(request.url))
+                if "/api/tts" in request.url else None)
+
+        widget_first_audio_ms = await ask(page, waits)
+        requests_at_first_audio = len(started_urls)
+
+        # Barge in while later sentences are still being synthesized
+        await asyncio.sleep(0.5)
+        await page.get_by_role("button", name=re.compile("Play")).first.click()
+        requests_at_cancel = len(started_urls)
+        await asyncio.sleep(1.0)
+
+        print(f"Widget: first audio {widget_first_audio_ms:.1f} ms after send, {requests_at_first_audio} TTS requests "
+              f"by then, peak {peak} in flight; {requests_at_cancel} requested before barge-in, "
+              f"{len(started_urls) - requests_at_cancel} after, {len(aborted)} aborted")
+
+        # Assert splitting pays off for multi-sentence replies and costs little for a single sentence
+        for count in (5, 20):
+            assert results[count, True] < results[count, False], \
+                f"{count} sentences: pipelined first audio {results[count, True]:.1f} ms is not faster " \
+                f"than single-shot {results[count, False]:.1f} ms"
+        assert results[1, True] <= results[1, False] * 1.5 + 20, \
+            f"1 sentence: pipelined {results[1, True]:.1f} ms vs single-shot {results[1, False]:.1f} ms"
+
+        # Assert the widget speaks the long reply before it is fully synthesized, with bounded parallelism
+        assert requests_at_first_audio < 20, "The widget synthesized every sentence before playing the first"
+        assert peak <= MAX_PARALLEL, f"{peak} TTS requests in flight at once; expected at most {MAX_PARALLEL}"
+
+        # Assert barge-in cancels the sentences still outstanding
+        assert len(started_urls) == requests_at_cancel, \
+            f"{len(started_urls) - requests_at_cancel} TTS requests started after barge-in"
+        assert not in_flight, f"{len(in_flight)} TTS requests still in flight after barge-in"
+
+if __name__ == "__main__":
+    asyncio.run(run_test())
@@ -0,0 +1,229 @@
+import asyncio
+import json
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from playwright import async_api
+from harness.browser import browser_context
+from harness.waits import WaitEngine
+
+# Runs against the real /api/chat handler with a local stand-in as its n8n webhook. Start the API with it, e.g.:
+#     N8N_WEBHOOK_URL=http://localhost:9241/webhook vercel dev
+API_URL = os.environ.get("ODIADEV_API_URL", "http://localhost:3000")
+UPSTREAM_PORT = int(os.environ.get("ODIADEV_CHAT_UPSTREAM_PORT", "9241"))
+
+# The stand-in generates its reply a token at a time, like the LLM behind the webhook
+FIRST_TOKEN_MS = 300
+TOKEN_INTERVAL_MS = 40
+REPLY = ("Certainly! ODIADEV builds voice agents that answer customers on WhatsApp, Telegram and the web, "
+         "in English and Nigerian Pidgin, and hand over to a human whenever a conversation needs one. Goodbye.")
+FIRST_WORD, LAST_WORD = "Certainly!", "Goodbye."
+GENERATION_MS = FIRST_TOKEN_MS + TOKEN_INTERVAL_MS * (len(re.findall(r"\S+\s*", REPLY)) - 1)
+
+# Reads /api/chat as the widget does (Accept: text/event-stream) and records each event with its arrival time
+READ_STREAM = """
+async () => {
+  const started = performance.now()
+  const response = await fetch('/api/chat', {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json', Accept: 'text/event-stream' },
+    body: JSON.stringify({ message: 'What does ODIADEV build?', sessionId: 'tc020-' + Date.now() }),
+  })
+  const reader = response.body.getReader()
+  const decoder = new TextDecoder()
+  const events = []
+  let pending = ''
+  for (;;) {
+    const { done, value } = await reader.read()
+    pending += decoder.decode(value, { stream: !done })
+    const raw = pending.split('\\n\\n')
+    pending = done ? '' : raw.pop()
+    for (const event of raw.filter(Boolean)) {
+      const name = (event.match(/^event: (.*)$/m) || [])[1]
+      const data = event.split('\\n').filter(line => line.startsWith('data: ')).map(line => line.slice(6)).join('\\n')
+      events.push({ at: performance.now() - started, event: name, data: JSON.parse(data) })
+    }
+    if (done) break
+  }
+  return { contentType: response.headers.get('content-type') || '', events }
+}
+"""
+
+# Records when a message is sent and when the reply's first and last words become visible, in performance.now() time
+RECORD_REPLY = """
+window.__tc020 = { sent: null, first: null, last: null }
+document.addEventListener('keydown', e => {
+  if (e.key === 'Enter' && e.target.placeholder === 'Type your message...') window.__tc020.sent = performance.now()
+}, true)
+new MutationObserver(records => {
+  const seen = window.__tc020
+  if (seen.sent === null || seen.last !== null) return
+  for (const record of records) {
+    const text = record.target.textContent || ''
+    if (seen.first === null && text.includes('%s')) seen.first = performance.now()
+    if (text.includes('%s')) seen.last = performance.now()
+  }
+}).observe(document, { subtree: true, childList: true, characterData: true })
+""" % (FIRST_WORD, LAST_WORD)
+
+
+class StandInWebhook(ThreadingHTTPServer):
+    """The n8n webhook, replying as n8n JSON-lines chunks, as SSE, or as one JSON body once generation ends."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, port):
+        super().__init__(("127.0.0.1", port), _StandInWebhookHandler)
+        self.mode = "n8n"
+        self.requests = 0
+
+
+class _StandInWebhookHandler(BaseHTTPRequestHandler):
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self.server.requests += 1
+        mode = self.server.mode
+        tokens = re.findall(r"\S+\s*", REPLY)
+        time.sleep(FIRST_TOKEN_MS / 1000)
+
+        if mode == "json":
+            time.sleep(TOKEN_INTERVAL_MS * (len(tokens) - 1) / 1000)
+            body = json.dumps({"reply": REPLY}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        # Streamed bodies end when the connection closes
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream" if mode == "sse" else "application/json; charset=utf-8")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        if mode == "n8n":
+            self._send(json.dumps({"type": "begin", "metadata": {"nodeName": "AI Agent"}}) + "\n")
+        for i, token in enumerate(tokens):
+            if i:
+                time.sleep(TOKEN_INTERVAL_MS / 1000)
+            if mode == "sse":
+                self._send(f"data: {json.dumps({'text': token})}\n\n")
+            else:
+                self._send(json.dumps({"type": "item", "content": token}) + "\n")
+        self._send("data: [DONE]\n\n" if mode == "sse" else json.dumps({"type": "end"}) + "\n")
+
+    def _send(self, text):
+        self.wfile.write(text.encode())
+        self.wfile.flush()
+
+    def log_message(self, *args):
+        pass
+
+
+async def time_reply(context):
+    page = await context.new_page()
+    waits = WaitEngine(context)
+
+    # Navigate to your target URL and wait until the network request is committed
+    await page.goto("http://localhost:5174", wait_until="commit", timeout=10000)
+
+    # Wait for the main page to reach DOMContentLoaded state (optional for stability)
+    try:
+        await page.wait_for_load_state("domcontentloaded", timeout=3000)
+    except async_api.Error:
+        pass
+    await waits.settle()
+
+    # Open the chat widget, ask a question and wait until the whole reply is on screen
+    await waits.click(page.locator("button.fixed.bottom-4.right-4").nth(0), "Open the chat widget")
+    message_input = page.get_by_placeholder("Type your message...")
+    await waits.fill(message_input, "What does ODIADEV build?", "Type the question")
+    await message_input.press("Enter")
+    await page.wait_for_function("window.__tc020.last !== null", timeout=20000)
+    seen = await page.evaluate("window.__tc020")
+    await page.close()
+    return seen["first"] - seen["sent"], seen["last"] - seen["sent"]
+
+
+async def run_test(browser=None):
+    webhook = StandInWebhook(UPSTREAM_PORT)
+    threading.Thread(target=webhook.serve_forever, daemon=True).start()
+    try:
+        async with browser_context(browser) as context:
+
+            # Send the page's /api/chat to the API server; its response streams through to the page unbuffered
+            await context.route(re.compile(r"/api/chat$"), lambda route: route.continue_(url=f"{API_URL}/api/chat"))
+            await context.add_init_script(RECORD_REPLY)
+            page = await context.new_page()
+
+            # Navigate to your target URL and wait until the network request is committed
+            await page.goto("http://localhost:5174", wait_until="commit", timeout=10000)
+
+            # Read the handler's event stream for each upstream format, and its JSON response for clients that
+            # do not ask for a stream
+            relayed = {}
+            for mode in ("n8n", "sse", "json"):
+                webhook.mode = mode
+                relayed[mode] = await page.evaluate(READ_STREAM)
+                response = await context.request.post(f"{API_URL}/api/chat", data={
+                    "message": "What does ODIADEV build?", "sessionId": f"tc020-plain-{mode}"})
+                assert response.ok, f"{mode}: POST /api/chat returned {response.status}"
+                relayed[mode]["plain"] = (await response.json())["reply"]
+            await page.close()
+            assert webhook.requests > 0, \
+                f"The API never called the stand-in; start it with N8N_WEBHOOK_URL=http://localhost:{UPSTREAM_PORT}/webhook"
+
+            for mode, result in relayed.items():
+                deltas = [event for event in result["events"] if event["event"] == "delta"]
+                done = [event for event in result["events"] if event["event"] == "done"]
+                first = deltas[0]["at"] if deltas else None
+                print(f"{mode:4} upstream: {len(deltas)} delta events, first at "
+                      f"{'-' if first is None else f'{first:.1f} ms'}, done at {done[-1]['at'] if done else float('nan'):.1f} ms")
+
+                # Assert every stream ends with one `done` carrying the whole reply from the webhook
+                assert result["contentType"].startswith("text/event-stream"), f"{mode}: {result['contentType']}"
+                assert len(done) == 1 and result["events"][-1] is done[0], f"{mode}: events {result['events']}"
+                assert done[0]["data"]["reply"] == REPLY, f"{mode}: done reply {done[0]['data']['reply']!r}"
+                assert done[0]["data"]["source"] == "n8n-webhook", f"{mode}: reply came from {done[0]['data']['source']}"
+
+                # Assert clients that do not ask for a stream still get the whole reply as JSON
+                assert result["plain"] == REPLY, f"{mode}: JSON reply {result['plain']!r}"
+
+                if mode == "json":
+                    # Assert a webhook that cannot stream falls back to the single `done` event
+                    assert not deltas, f"json upstream produced {len(deltas)} delta events"
+                else:
+                    # Assert streamed upstreams are relayed piece by piece, as they are generated
+                    assert "".join(event["data"]["text"] for event in deltas) == REPLY, \
+                        f"{mode}: deltas do not add up to the reply"
+                    assert len(deltas) > 1, f"{mode}: reply relayed as {len(deltas)} delta event(s)"
+                    assert first < GENERATION_MS / 2, \
+                        f"{mode}: first delta after {first:.1f} ms; generation takes {GENERATION_MS} ms"
+
+            # Time the widget: the same reply from a webhook that answers in one piece and from one that streams
+            webhook.mode = "json"
+            blocking_first, blocking_last = await time_reply(context)
+            webhook.mode = "n8n"
+            stream_first, stream_last = await time_reply(context)
+
+            print(f"Widget, blocking webhook:  first word visible {blocking_first:7.1f} ms, whole reply {blocking_last:7.1f} ms")
+            print(f"Widget, streaming webhook: first word visible {stream_first:7.1f} ms, whole reply {stream_last:7.1f} ms")
+
+            # Assert the first token shows up as soon as it is generated rather than when the reply is complete
+            assert stream_first < blocking_first / 2, \
+                f"Streaming showed the first word after {stream_first:.1f} ms; blocking took {blocking_first:.1f} ms"
+
+            # Assert streaming does not delay the end of the reply
+            assert stream_last < blocking_last + 250, \
+                f"Streamed reply finished at {stream_last:.1f} ms vs {blocking_last:.1f} ms blocking"
+    finally:
+        webhook.shutdown()
+        webhook.server_close()
+
+if __name__ == "__main__":
+    asyncio.run(run_test())
@@ -0,0 +1,123 @@
+import asyncio
+import os
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+from harness.browser import browser_context
+from harness.recorder import RecordingStore, RecordReplay
+
+# Records exchanges against a local stand-in backend, stops it, and replays them in a fresh context
+BACKEND_PORT = int(os.environ.get("ODIADEV_RECORDER_BACKEND_PORT", "9242"))
+BACKEND_URL = f"http://localhost:{BACKEND_PORT}"
+
+SENTENCES = ("Welcome to ODIADEV.", "We build voice agents for Nigerian businesses.")
+
+# Fetches a URL from the page and returns its status and body text
+FETCH = """
+async ({ url, init }) => {
+  const response = await fetch(url, init)
+  return { status: response.status, body: await response.text() }
+}
+"""
+
+
+def tts_url(text):
+    return f"/api/tts?stream=1&text={text}&voice_id=naija_female_warm"
+
+
+def stt_final(session, chunks):
+    return f"/api/stt?session={session}&final=1&chunks={chunks}"
+
+
+class StandInBackend(ThreadingHTTPServer):
+    """Answers /api/tts with the text it was asked to speak and /api/stt with the chunk count it was given."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, port):
+        super().__init__(("127.0.0.1", port), _StandInBackendHandler)
+
+
+class _StandInBackendHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == "/api/tts":
+            self._reply("audio/mpeg", f"clip:{dict(parse_qsl(url.query))['text']}")
+        else:
+            self._reply("text/html", "<!doctype html><title>tc021</title>")
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        query = dict(parse_qsl(urlsplit(self.path).query))
+        self._reply("application/json", f'{{"text": "transcript of {query["chunks"]} chunks"}}')
+
+    def _reply(self, content_type, text):
+        body = text.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+async def fetch_all(context):
+    page = await context.new_page()
+
+    # Navigate to the stand-in so the fetches below are same-origin
+    await page.goto(BACKEND_URL, wait_until="commit", timeout=10000)
+
+    # Fetch one clip per sentence, and finalize two STT sessions of different lengths
+    results = {}
+    for text in SENTENCES:
+        results[text] = await page.evaluate(FETCH, {"url": tts_url(text), "init": {}})
+    for session, chunks in (("tc021-a", 3), ("tc021-b", 5)):
+        results[session] = await page.evaluate(FETCH, {"url": stt_final(session, chunks), "init": {"method": "POST"}})
+    await page.close()
+    return results
+
+
+async def run_test(browser=None):
+    with tempfile.TemporaryDirectory() as root:
+        store = RecordingStore(root)
+
+        # Record every exchange against the stand-in backend
+        backend = StandInBackend(BACKEND_PORT)
+        threading.Thread(target=backend.serve_forever, daemon=True).start()
+        try:
+            async with browser_context(browser) as context:
+                await RecordReplay("record", store).install(context)
+                recorded = await fetch_all(context)
+        finally:
+            backend.shutdown()
+            backend.server_close()
+
+        # Replay them in a fresh context with the backend gone; the page itself still needs serving
+        async with browser_context(browser) as context:
+            await context.route(BACKEND_URL + "/", lambda route: route.fulfill(
+                status=200, content_type="text/html", body="<!doctype html><title>tc021</title>"))
+            replayer = await RecordReplay("replay-fast", store).install(context)
+            replayed = await fetch_all(context)
+
+        exchanges = len(os.listdir(os.path.join(root, "exchanges")))
+        print(f"Recorded {exchanges} exchanges; replay: {replayer.hits} hits, {replayer.misses} misses")
+        for name, result in replayed.items():
+            print(f"  {name}: {result['status']} {result['body']!r}")
+
+        # Assert each sentence's clip was recorded under its own key, rather than one overwriting the other
+        for text in SENTENCES:
+            assert recorded[text]["body"] == f"clip:{text}", f"Recording {text!r}: {recorded[text]}"
+        assert exchanges == len(recorded), f"{len(recorded)} exchanges recorded into {exchanges} keys"
+
+        # Assert replay hands every request back its own recording
+        assert replayer.misses == 0, f"{replayer.misses} requests had no recording"
+        for name, result in recorded.items():
+            assert replayed[name] == result, f"{name}: replayed {replayed[name]} but recorded {result}"
+        assert replayed[SENTENCES[0]]["body"] != replayed[SENTENCES[1]]["body"], "Both sentences replayed one clip"
+
+if __name__ == "__main__":
+    asyncio.run(run_test())
@@ -0,0 +1 @@
+"""Shared Playwright harness for the TestSprite scenarios in testsprite_tests."""
@@ -0,0 +1,331 @@
+"""Throughput benchmarks for the render-brain service.
+
+``qualify`` scores a synthetic set of leads three ways and reports leads
+per second for each:
+
+* ``ndjson``  one streamed ``/api/qualify/batch`` request (NDJSON both ways),
+* ``json``    one ``/api/qualify/batch`` request with a JSON array body,
+* ``single``  a keep-alive loop over ``/api/qualify``, ``--concurrency`` at
+  a time. This is capped at ``--single-limit`` leads because it is the slow
+  path; the rate is what matters.
+
+Leads are generated from ``--seed``, so runs are comparable.
+
+``summarize`` feeds one synthetic conversation to
+``/api/summarize/incremental`` a turn at a time and, at each checkpoint
+(``--checkpoints``), reports the mean per-turn cost since the previous
+checkpoint next to one full ``/api/summarize`` of the transcript so far.
+Costs are the server's own ``Server-Timing`` durations, so HTTP overhead
+does not hide the trend: the incremental column should stay flat while the
+full column grows with the transcript.
+
+Usage (from testsprite_tests/, with ``npm start`` running in render-brain/)::
+
+    python -m harness.brain_bench qualify --leads 100000
+    python -m harness.brain_bench qualify --leads 100000 --single-limit 100000 --concurrency 32
+    python -m harness.brain_bench summarize --checkpoints 10,100,1000,5000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from harness.loadgen import HttpConnection
+
+OUTPUT_PATH = Path(__file__).resolve().parent.parent / "tmp" / "brain_bench.json"
+DEFAULT_BASE_URL = os.environ.get("ODIADEV_BRAIN_URL", "http://localhost:3000")
+
+FIRST_NAMES = ["Ada", "Chinedu", "Amina", "Tunde", "Ngozi", "Emeka", "Fatima", "Bola"]
+DOMAINS = ["gmail.com", "yahoo.com", "acme.ng", "lagoslogistics.com", "outlook.com", "kanoagro.ng"]
+SOURCES = ["website", "referral", "whatsapp", "ads", "telegram"]
+MESSAGE_PARTS = [
+    "We need a WhatsApp voice agent for our customer support team.",
+    "What is your pricing for 5,000 calls a month?",
+    "Can we get a demo this week?",
+    "Just browsing.",
+    "Our call centre is overloaded, we need help ASAP.",
+    "Do you integrate with our CRM and website chat?",
+    "hello",
+    "Please send a quote for the business plan.",
+]
+USER_TURNS = [
+    "Our {item} orders to {place} keep arriving late, can the agent tell customers why?",
+    "How much would it cost to handle {n} calls a month about {item} deliveries?",
+    "Can the voice agent speak Yoruba and Hausa to customers in {place}?",
+    "We also want it to book pickups for {item} from our {place} warehouse.",
+    "Is there a discount if we sign a yearly contract?",
+]
+AGENT_TURNS = [
+    "The agent can look up {item} orders and give customers in {place} a live delivery estimate.",
+    "For {n} calls a month the business plan fits, and I can send you a quote today.",
+    "Yes, it supports English, Yoruba, Hausa and Pidgin, and switches when the caller does.",
+    "Pickups can be booked straight into your dispatch sheet for the {place} warehouse.",
+    "Yearly contracts get two months free on the business plan.",
+]
+ITEMS = ["parcel", "pharmacy", "grocery", "furniture", "electronics", "fashion"]
+PLACES = ["Lagos", "Abuja", "Kano", "Ibadan", "Enugu", "Port Harcourt"]
+
+
+def generate_leads(count, seed=1):
+    rng = random.Random(seed)
+    for i in range(count):
+        name = rng.choice(FIRST_NAMES)
+        yield {
+            "id": f"lead-{i}",
+            "name": name,
+            "email": f"{name.lower()}{i}@{rng.choice(DOMAINS)}",
+            "phone": f"+234 80{rng.randrange(10)} {rng.randrange(1000000, 9999999)}" if rng.random() < 0.6 else "",
+            "message": " ".join(rng.sample(MESSAGE_PARTS, rng.randint(1, 3))),
+            "source": rng.choice(SOURCES),
+        }
+
+
+async def _read_head(reader):
+    status = int((await reader.readuntil(b"\r\n")).split()[1])
+    headers = {}
+    while True:
+        line = await reader.readuntil(b"\r\n")
+        if line == b"\r\n":
+            return status, headers
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+
+async def _read_chunked(reader, on_data):
+    while True:
+        size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+        if size == 0:
+            await reader.readuntil(b"\r\n")
+            return
+        on_data(await reader.readexactly(size))
+        await reader.readexactly(2)
+
+
+async def stream_request(base_url, path, content_type, body_chunks):
+    """POST ``body_chunks`` with chunked encoding while reading the response.
+
+    Sending and receiving run concurrently: the batch route streams results
+    while it is still reading, and stops reading when results back up.
+    Returns ``(status, result lines, seconds to first result)``.
+    """
+    parts = urlsplit(base_url)
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+    started = time.perf_counter()
+    writer.write((f"POST {path} HTTP/1.1\r\nHost: {parts.netloc}\r\nContent-Type: {content_type}\r\n"
+                  "Transfer-Encoding: chunked\r\nConnection: close\r\n\r\n").encode())
+
+    async def send():
+        for chunk in body_chunks:
+            writer.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+            await writer.drain()
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    lines = 0
+    first_result = None
+
+    def on_data(data):
+        nonlocal lines, first_result
+        if first_result is None:
+            first_result = time.perf_counter() - started
+        lines += data.count(b"\n")
+
+    async def receive():
+        status, headers = await _read_head(reader)
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            await _read_chunked(reader, on_data)
+        else:
+            on_data(await reader.read())
+        return status
+
+    try:
+        _, status = await asyncio.gather(send(), receive())
+    finally:
+        writer.close()
+    return status, lines, first_result
+
+
+def _batched(lines, size=500):
+    for i in range(0, len(lines), size):
+        yield "".join(lines[i:i + size]).encode()
+
+
+async def bench_batch_ndjson(base_url, leads):
+    lines = [json.dumps(lead) + "\n" for lead in leads]
+    started = time.perf_counter()
+    status, results, first = await stream_request(base_url, "/api/qualify/batch", "application/x-ndjson",
+                                                   _batched(lines))
+    return _rate("ndjson", len(leads), results, time.perf_counter() - started, status, first)
+
+
+async def bench_batch_json(base_url, leads):
+    body = json.dumps(leads).encode()
+    started = time.perf_counter()
+    status, results, first = await stream_request(
+        base_url, "/api/qualify/batch", "application/json",
+        (body[i:i + 65536] for i in range(0, len(body), 65536)))
+    return _rate("json", len(leads), results, time.perf_counter() - started, status, first)
+
+
+async def bench_single(base_url, leads, concurrency):
+    queue = list(reversed(leads))
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        conn = HttpConnection(base_url)
+        try:
+            while queue:
+                status, _, _ = await conn.request("POST", "/api/qualify", queue.pop())
+                errors += status != 200
+        finally:
+            await conn.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result = _rate("single", len(leads), len(leads) - errors, time.perf_counter() - started, 200, None)
+    result["concurrency"] = concurrency
+    return result
+
+
+def generate_turns(count, seed=1):
+    rng = random.Random(seed)
+    for i in range(count):
+        templates = USER_TURNS if i % 2 == 0 else AGENT_TURNS
+        text = rng.choice(templates).format(item=rng.choice(ITEMS), place=rng.choice(PLACES),
+                                            n=rng.randrange(500, 20000, 500))
+        yield {"role": "user" if i % 2 == 0 else "assistant", "content": text}
+
+
+def _server_ms(headers):
+    for metric in headers.get("server-timing", "").split(","):
+        name, _, params = metric.strip().partition(";")
+        if name == "summarize" and params.startswith("dur="):
+            return float(params[4:])
+    return None
+
+
+async def run_summarize(args):
+    checkpoints = sorted(int(c) for c in args.checkpoints.split(","))
+    turns = list(generate_turns(checkpoints[-1], args.seed))
+    session_id = f"bench-{os.getpid()}-{int(time.time())}"
+    conn = HttpConnection(args.base_url)
+    results = []
+    try:
+        done = 0
+        reset = True
+        for checkpoint in checkpoints:
+            server_ms = []
+            started = time.perf_counter()
+            for turn in turns[done:checkpoint]:
+                status, headers, _ = await conn.request("POST", "/api/summarize/incremental",
+                                                        {"session_id": session_id, "turns": [turn], "reset": reset})
+                reset = False
+                if status != 200:
+                    raise RuntimeError(f"incremental summarize returned {status}")
+                server_ms.append(_server_ms(headers) or 0.0)
+            wall = time.perf_counter() - started
+            steps = checkpoint - done
+            done = checkpoint
+
+            transcript = "\n".join(f"{t['role']}: {t['content']}" for t in turns[:checkpoint])
+            full_started = time.perf_counter()
+            status, headers, body = await conn.request("POST", "/api/summarize", {"transcript": transcript})
+            full_wall = time.perf_counter() - full_started
+            if status != 200:
+                raise RuntimeError(f"full summarize returned {status}: {body[:200]!r}")
+
+            results.append({
+                "turns": checkpoint,
+                "incremental_ms_per_turn": round(sum(server_ms) / steps, 4),
+                "incremental_wall_ms_per_turn": round(wall * 1000 / steps, 3),
+                "full_ms": _server_ms(headers),
+                "full_wall_ms": round(full_wall * 1000, 3),
+                "transcript_bytes": len(transcript.encode()),
+                "topics": json.loads(body).get("topics", []),
+            })
+    finally:
+        await conn.close()
+    return results
+
+
+def print_summarize(results):
+    print(f"{'turns':>7} {'incr ms/turn':>13} {'full ms':>9} {'full wall ms':>13} {'bytes':>9}  topics")
+    for r in results:
+        full = "-" if r["full_ms"] is None else f"{r['full_ms']:.3f}"
+        print(f"{r['turns']:>7} {r['incremental_ms_per_turn']:>13.4f} {full:>9} {r['full_wall_ms']:>13.1f} "
+              f"{r['transcript_bytes']:>9}  {', '.join(r['topics'])}")
+
+
+def _rate(mode, sent, results, elapsed, status, first_result):
+    return {
+        "mode": mode,
+        "status": status,
+        "leads": sent,
+        "results": results,
+        "elapsed_s": round(elapsed, 3),
+        "leads_per_s": round(results / elapsed, 1) if elapsed else None,
+        "first_result_ms": round(first_result * 1000, 1) if first_result is not None else None,
+    }
+
+
+async def run_qualify(args):
+    leads = list(generate_leads(args.leads, args.seed))
+    results = [await bench_batch_ndjson(args.base_url, leads),
+               await bench_batch_json(args.base_url, leads)]
+    if args.single_limit:
+        results.append(await bench_single(args.base_url, leads[:args.single_limit], args.concurrency))
+    return results
+
+
+def print_qualify(results):
+    print(f"{'mode':8} {'leads':>8} {'results':>8} {'seconds':>8} {'leads/s':>10} {'first ms':>9}")
+    for r in results:
+        first = "-" if r["first_result_ms"] is None else f"{r['first_result_ms']:.1f}"
+        print(f"{r['mode']:8} {r['leads']:>8} {r['results']:>8} {r['elapsed_s']:>8.2f} "
+              f"{r['leads_per_s'] or 0:>10.1f} {first:>9}")
+    single = next((r for r in results if r["mode"] == "single"), None)
+    if single and single["leads_per_s"]:
+        for r in results:
+            if r is not single and r["leads_per_s"]:
+                print(f"{r['mode']} is {r['leads_per_s'] / single['leads_per_s']:.1f}x the single-endpoint loop")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL, help="render-brain server (default: %(default)s)")
+    parser.add_argument("--output", default=str(OUTPUT_PATH), help="where to write the JSON report")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    qualify = commands.add_parser("qualify", help="batch vs single-lead qualification throughput")
+    qualify.add_argument("--leads", type=int, default=100000, help="leads per batch run (default: %(default)s)")
+    qualify.add_argument("--single-limit", type=int, default=10000,
+                         help="leads for the single-endpoint loop; 0 skips it (default: %(default)s)")
+    qualify.add_argument("--concurrency", type=int, default=16, help="single-endpoint requests in flight")
+    qualify.add_argument("--seed", type=int, default=1)
+
+    summarize = commands.add_parser("summarize", help="incremental vs full summarize cost as a conversation grows")
+    summarize.add_argument("--checkpoints", default="10,100,1000,5000",
+                           help="comma-separated turn counts to report at (default: %(default)s)")
+    summarize.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    if args.command == "qualify":
+        results = asyncio.run(run_qualify(args))
+        print_qualify(results)
+    elif args.command == "summarize":
+        results = asyncio.run(run_summarize(args))
+        print_summarize(results)
+
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"command": args.command, "base_url": args.base_url, "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,140 @@
+"""Browser and context lifecycle shared by the TC scenarios.
+
+A scenario calls ``browser_context(browser)`` and gets a fresh, isolated
+``BrowserContext``. When no browser is handed in (the scenario is run on
+its own with ``python TC0xx_*.py``) the context comes from the warm
+browser server (``harness.server``) if one is running, and otherwise a
+private Playwright session and Chromium are started and torn down around
+it, exactly as the generated files used to do inline. With
+``ODIADEV_STUB_BACKEND`` set, the context's /api calls are served from the
+local fixtures (see ``harness.stubs``); with ``ODIADEV_RECORDINGS`` set they
+are recorded or replayed instead (see ``harness.recorder``).
+"""
+import asyncio
+import contextvars
+import json
+import os
+import urllib.request
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+from playwright import async_api
+
+from harness.recorder import install_recorder, recording_mode
+from harness.stubs import install_stubs, stubs_enabled
+
+DEFAULT_TIMEOUT_MS = 5000
+
+# Written by harness.server while it runs; ODIADEV_BROWSER_SERVER overrides it.
+SERVER_STATE_PATH = Path(__file__).resolve().parent.parent / "tmp" / "browser_server.json"
+
+CHROMIUM_ARGS = [
+    "--window-size=1280,720",         # Set the browser window size
+    "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
+    "--ipc=host",                     # Use host-level IPC for better stability
+]
+
+# A browser owned by a single scenario keeps the original single-process mode.
+# A browser shared between concurrent contexts must not, or one crashing
+# renderer takes every scenario down with it.
+SOLO_CHROMIUM_ARGS = CHROMIUM_ARGS + ["--single-process"]
+
+_observers = contextvars.ContextVar("context_observers", default=())
+
+
+def observe_contexts(observer):
+    """Have ``browser_context`` report every context the current task opens.
+
+    ``observer.attach(context)`` is awaited right after the context is
+    created and ``observer.detach(context)`` just before it is closed, so a
+    caller can measure scenarios it does not control (see ``harness.regress``).
+    """
+    _observers.set(_observers.get() + (observer,))
+
+
+async def launch_browser(pw, shared=False, headless=True):
+    """Launch Chromium with the arguments the scenarios expect."""
+    return await pw.chromium.launch(
+        headless=headless,
+        args=CHROMIUM_ARGS if shared else SOLO_CHROMIUM_ARGS,
+    )
+
+
+def _server_control_url():
+    url = os.environ.get("ODIADEV_BROWSER_SERVER")
+    if url:
+        return url.rstrip("/")
+    try:
+        return json.loads(SERVER_STATE_PATH.read_text())["control"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _control_request(url, method="GET"):
+    request = urllib.request.Request(url, method=method)
+    with urllib.request.urlopen(request, timeout=2) as response:
+        return json.load(response)
+
+
+async def lease_warm_browser():
+    """Ask the warm browser server for a lease; None if it is not running."""
+    control = _server_control_url()
+    if not control:
+        return None
+    try:
+        lease = await asyncio.to_thread(_control_request, f"{control}/lease")
+    except (OSError, ValueError):
+        return None
+    lease["control"] = control
+    return lease
+
+
+async def release_warm_browser(lease):
+    try:
+        await asyncio.to_thread(_control_request, f"{lease['control']}/release?lease={lease['lease']}", "POST")
+    except (OSError, ValueError):
+        pass
+
+
+@asynccontextmanager
+async def browser_context(browser=None):
+    """Yield a new context on ``browser``, attaching or launching one if needed."""
+    pw = None
+    owned_browser = None
+    lease = None
+    context = None
+    try:
+        if browser is None:
+            pw = await async_api.async_playwright().start()
+            lease = await lease_warm_browser()
+            if lease:
+                try:
+                    owned_browser = await pw.chromium.connect_over_cdp(lease["endpoint"])
+                except async_api.Error:
+                    await release_warm_browser(lease)
+                    lease = None
+            if owned_browser is None:
+                owned_browser = await launch_browser(pw)
+            browser = owned_browser
+
+        context = await browser.new_context()
+        context.set_default_timeout(DEFAULT_TIMEOUT_MS)
+        if stubs_enabled():
+            await install_stubs(context)
+        elif recording_mode():
+            await install_recorder(context)
+        for observer in _observers.get():
+            await observer.attach(context)
+        yield context
+    finally:
+        if context:
+            for observer in _observers.get():
+                await observer.detach(context)
+            await context.close()
+        if owned_browser:
+            # For a CDP connection this only disconnects; the warm browser lives on.
+            await owned_browser.close()
+        if lease:
+            await release_warm_browser(lease)
+        if pw:
+            await pw.stop()
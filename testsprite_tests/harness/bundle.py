@@ -0,0 +1,203 @@
+"""Size report for the Vite build, with budgets and baseline diffing.
+
+Walks ``dist/assets`` and reports the raw, gzip and brotli size of every
+JS and CSS chunk. Chunks are grouped by the part of the product that ships
+them, using ``dist/.vite/manifest.json``:
+
+* ``widget``     the embeddable chat widget (the ``chat-widget`` chunk),
+* ``dashboard``  the dashboard pages (the ``dashboard`` chunk),
+* ``app``        the main entry and everything else.
+
+The widget is embedded on customers' pages, so it carries the tightest
+budget. Sizes are compared against ``bundle_baseline.json`` next to this
+suite; a run fails when a group is over budget, a chunk grew by more
+than ``--max-growth`` percent, or there is no baseline to diff against
+(write one with ``--update-baseline`` and commit it). Chunk names are
+compared without their content hash.
+
+Brotli sizes need the optional ``brotli`` package and are reported as
+``null`` without it.
+
+Usage (from testsprite_tests/, after ``npm run build``)::
+
+    python -m harness.bundle
+    python -m harness.bundle --update-baseline
+"""
+import argparse
+import gzip
+import json
+import re
+import sys
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+SUITE_DIR = Path(__file__).resolve().parent.parent
+DIST_DIR = SUITE_DIR.parent / "dist"
+BASELINE_PATH = SUITE_DIR / "bundle_baseline.json"
+DEFAULT_MAX_GROWTH = 5.0
+
+# Gzipped bytes per group; TC012 promises a widget under 80 KB gzipped.
+BUDGETS = {
+    "widget": 80 * 1024,
+    "dashboard": 120 * 1024,
+    "app": 250 * 1024,
+}
+
+CHUNK_GROUPS = {"chat-widget": "widget", "dashboard": "dashboard"}
+ASSET_SUFFIXES = (".js", ".css")
+_HASH = re.compile(r"-[A-Za-z0-9_-]{8}(?=\.[a-z]+$)")
+
+
+def stable_name(filename):
+    """``assets/index-4f9a1c2b.js`` -> ``index.js``."""
+    return _HASH.sub("", Path(filename).name)
+
+
+def load_manifest(dist):
+    for candidate in (dist / ".vite" / "manifest.json", dist / "manifest.json"):
+        if candidate.exists():
+            with open(candidate, encoding="utf-8") as f:
+                return json.load(f)
+    return {}
+
+
+def chunk_groups(manifest):
+    """Map each emitted file (JS and its CSS) to a product group."""
+    groups = {}
+    for entry in manifest.values():
+        name = entry.get("name") or Path(entry.get("src", "")).stem
+        group = CHUNK_GROUPS.get(name, "app")
+        for file in [entry["file"], *entry.get("css", [])]:
+            groups[file] = group
+    return groups
+
+
+def compressed_sizes(data):
+    return {
+        "raw": len(data),
+        "gzip": len(gzip.compress(data, compresslevel=9)),
+        "brotli": len(brotli.compress(data, quality=11)) if brotli else None,
+    }
+
+
+def analyze(dist=DIST_DIR):
+    """Return ``{"chunks": {...}, "groups": {...}}`` for a built ``dist``."""
+    dist = Path(dist)
+    assets = dist / "assets"
+    if not assets.is_dir():
+        raise FileNotFoundError(f"No build output at {assets}; run `npm run build` first")
+
+    groups_by_file = chunk_groups(load_manifest(dist))
+    chunks = {}
+    for path in sorted(assets.iterdir()):
+        if path.suffix not in ASSET_SUFFIXES:
+            continue
+        relative = path.relative_to(dist).as_posix()
+        group = groups_by_file.get(relative)
+        if group is None:
+            group = CHUNK_GROUPS.get(stable_name(path.name).rsplit(".", 1)[0], "app")
+        chunks[stable_name(path.name)] = {"file": relative, "group": group,
+                                          **compressed_sizes(path.read_bytes())}
+
+    groups = {}
+    for chunk in chunks.values():
+        totals = groups.setdefault(chunk["group"], {"raw": 0, "gzip": 0, "brotli": 0 if brotli else None})
+        for key in ("raw", "gzip", "brotli"):
+            if totals[key] is not None:
+                totals[key] += chunk[key]
+    return {"chunks": chunks, "groups": groups}
+
+
+def compare(report, baseline, budgets=BUDGETS, max_growth=DEFAULT_MAX_GROWTH):
+    """Return a list of human-readable problems; empty means the build passes."""
+    problems = []
+    for group, totals in report["groups"].items():
+        budget = budgets.get(group)
+        if budget is not None and totals["gzip"] > budget:
+            problems.append(f"{group} is {totals['gzip'] / 1024:.1f} KB gzipped, budget {budget / 1024:.0f} KB")
+
+    if baseline is None:
+        problems.append(f"No bundle baseline to diff against; run `python -m harness.bundle --update-baseline` "
+                        f"on a build of the base branch and commit {BASELINE_PATH.name}")
+        return problems
+
+    previous = baseline.get("chunks", {})
+    for name, chunk in report["chunks"].items():
+        before = previous.get(name)
+        if not before or not before.get("gzip"):
+            continue
+        growth = (chunk["gzip"] - before["gzip"]) / before["gzip"] * 100
+        if growth > max_growth:
+            problems.append(f"{name} grew {growth:.1f}% gzipped "
+                            f"({before['gzip'] / 1024:.1f} KB -> {chunk['gzip'] / 1024:.1f} KB)")
+    return problems
+
+
+def load_baseline(path=BASELINE_PATH):
+    """The committed baseline, or None if there is none; a corrupt one raises."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _kb(value):
+    return f"{'-':>8}" if value is None else f"{value / 1024:8.1f}"
+
+
+def print_report(report, baseline=None):
+    previous = (baseline or {}).get("chunks", {})
+    print(f"{'chunk':40} {'group':10} {'raw KB':>8} {'gzip KB':>8} {'br KB':>8} {'delta':>8}")
+    for name, chunk in sorted(report["chunks"].items(), key=lambda item: -item[1]["gzip"]):
+        before = previous.get(name)
+        delta = f"{(chunk['gzip'] - before['gzip']) / 1024:+7.1f}" if before else "     new"
+        print(f"{name:40} {chunk['group']:10} {_kb(chunk['raw'])} {_kb(chunk['gzip'])} "
+              f"{_kb(chunk['brotli'])} {delta}")
+    print()
+    for group, totals in sorted(report["groups"].items()):
+        budget = BUDGETS.get(group)
+        print(f"{group:10} {_kb(totals['gzip'])} KB gzipped"
+              + (f" (budget {budget / 1024:.0f} KB)" if budget else ""))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dist", default=str(DIST_DIR), help="Vite output directory (default: ../dist)")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH), help="baseline file to diff against")
+    parser.add_argument("--max-growth", type=float, default=DEFAULT_MAX_GROWTH,
+                        help="fail when a chunk grows by more than this percent (default: %(default)s)")
+    parser.add_argument("--update-baseline", action="store_true", help="write this build as the new baseline")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        report = analyze(args.dist)
+    except FileNotFoundError as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    baseline = load_baseline(args.baseline)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report, baseline)
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"\nbaseline written to {args.baseline}")
+        return 0
+
+    problems = compare(report, baseline, max_growth=args.max_growth)
+    for problem in problems:
+        print(f"FAIL  {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,344 @@
+"""Asyncio load generator for the widget's /api endpoints.
+
+Drives realistic widget sessions against a local server (``vercel dev`` or
+``npm run dev:api``): a chat turn, then TTS of the reply, then now and then
+an STT upload and an analytics event. Load is either closed (``--users``
+sessions looping) or open (``--rate`` new sessions per second, capped at
+``--max-in-flight``).
+
+Each endpoint gets throughput, error and 429 rates and an HDR-style
+latency histogram (buckets at two significant digits, so percentiles are
+accurate to about 1% at any scale). Results are exported as JSON for trend
+tracking.
+
+The HTTP client is a small keep-alive HTTP/1.1 client on asyncio streams,
+so the tool has no dependencies beyond the standard library and the
+client's own overhead stays out of the numbers.
+
+Usage (from testsprite_tests/)::
+
+    python -m harness.loadgen --users 50 --duration 60
+    python -m harness.loadgen --rate 20 --duration 120 --base-url http://localhost:3000
+"""
+import argparse
+import asyncio
+import base64
+import json
+import math
+import os
+import random
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import urlsplit
+
+OUTPUT_PATH = Path(__file__).resolve().parent.parent / "tmp" / "loadgen.json"
+DEFAULT_BASE_URL = "http://localhost:3001"
+
+CHAT_PROMPTS = [
+    "Hello, what does ODIADEV do?",
+    "How much does the voice agent cost?",
+    "Can it answer customers on WhatsApp?",
+    "Do you support Nigerian English voices?",
+    "How do I book a demo?",
+]
+
+
+class Histogram:
+    """Log-linear latency histogram with fixed significant digits."""
+
+    def __init__(self, significant_digits=2):
+        self.significant_digits = significant_digits
+        self.counts = Counter()
+        self.total = 0
+        self.max_us = 0
+
+    def record(self, seconds):
+        us = max(1, int(seconds * 1_000_000))
+        scale = 10 ** max(0, int(math.log10(us)) - self.significant_digits + 1)
+        self.counts[us // scale * scale] += 1
+        self.total += 1
+        self.max_us = max(self.max_us, us)
+
+    def percentile(self, pct):
+        """Value in milliseconds at or below which ``pct`` percent fall."""
+        if not self.total:
+            return None
+        target = max(1, math.ceil(pct / 100 * self.total))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= target:
+                return bucket / 1000
+        return self.max_us / 1000
+
+    def export(self):
+        return {
+            "p50_ms": self.percentile(50),
+            "p90_ms": self.percentile(90),
+            "p99_ms": self.percentile(99),
+            "p999_ms": self.percentile(99.9),
+            "max_ms": self.max_us / 1000,
+            "buckets_ms": {f"{b / 1000:g}": n for b, n in sorted(self.counts.items())},
+        }
+
+
+class EndpointStats:
+    def __init__(self):
+        self.latency = Histogram()
+        self.statuses = Counter()
+        self.errors = 0
+        self.rate_limited = 0
+
+    def record(self, status, seconds):
+        self.statuses[str(status)] += 1
+        if status == 429:
+            self.rate_limited += 1
+        elif not isinstance(status, int) or status >= 400:
+            self.errors += 1
+        if isinstance(status, int):
+            self.latency.record(seconds)
+
+    def export(self, elapsed):
+        requests = sum(self.statuses.values())
+        return {
+            "requests": requests,
+            "throughput_rps": round(requests / elapsed, 2) if elapsed else 0,
+            "error_rate": round(self.errors / requests, 4) if requests else 0,
+            "rate_limited_rate": round(self.rate_limited / requests, 4) if requests else 0,
+            "statuses": dict(self.statuses),
+            "latency": self.latency.export(),
+        }
+
+
+class HttpConnection:
+    """One keep-alive HTTP/1.1 connection; reconnects when the server closes it."""
+
+    def __init__(self, base_url, timeout=30.0):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.ssl = parts.scheme == "https"
+        self.timeout = timeout
+        self.reader = None
+        self.writer = None
+
+    async def _connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl or None)
+
+    async def close(self):
+        if self.writer:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except OSError:
+                pass
+        self.reader = self.writer = None
+
+    async def request(self, method, path, body=None, headers=None):
+        """Send a request and return ``(status, headers, body bytes)``."""
+        payload = json.dumps(body).encode() if body is not None else b""
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}",
+                 "Connection: keep-alive", f"Content-Length: {len(payload)}"]
+        if body is not None:
+            lines.append("Content-Type: application/json")
+        lines += [f"{k}: {v}" for k, v in (headers or {}).items()]
+        raw = ("\r\n".join(lines) + "\r\n\r\n").encode() + payload
+
+        for attempt in (0, 1):
+            if self.writer is None:
+                await self._connect()
+            try:
+                self.writer.write(raw)
+                await self.writer.drain()
+                return await asyncio.wait_for(self._read_response(), self.timeout)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                await self.close()
+                if attempt:
+                    raise
+            except BaseException:
+                # A timed-out or half-parsed response may still arrive on this socket; reusing it
+                # would hand that late response to the next request
+                await self.close()
+                raise
+
+    async def _read_response(self):
+        status_line = await self.reader.readuntil(b"\r\n")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await self.reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                if size == 0:
+                    await self.reader.readuntil(b"\r\n")
+                    break
+                chunks.append(await self.reader.readexactly(size))
+                await self.reader.readexactly(2)
+            body = b"".join(chunks)
+        elif "content-length" in headers:
+            body = await self.reader.readexactly(int(headers["content-length"]))
+        else:
+            body = await self.reader.read()
+            await self.close()
+
+        if headers.get("connection", "").lower() == "close":
+            await self.close()
+        return status, headers, body
+
+
+class LoadTest:
+    def __init__(self, base_url, stt_ratio=0.2, events_ratio=0.5, think_time=0.0, seed=None):
+        self.base_url = base_url
+        self.stt_ratio = stt_ratio
+        self.events_ratio = events_ratio
+        self.think_time = think_time
+        self.rng = random.Random(seed)
+        self.stats = {name: EndpointStats() for name in ("chat", "tts", "stt", "events")}
+        self.sessions = 0
+
+    async def _call(self, conn, name, body, client_ip):
+        started = time.perf_counter()
+        try:
+            status, _, raw = await conn.request("POST", f"/api/{name}", body,
+                                                {"X-Forwarded-For": client_ip})
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+            self.stats[name].record("connection_error", time.perf_counter() - started)
+            return None
+        self.stats[name].record(status, time.perf_counter() - started)
+        try:
+            return json.loads(raw) if status == 200 else None
+        except ValueError:
+            return None
+
+    async def _think(self):
+        if self.think_time:
+            await asyncio.sleep(self.rng.expovariate(1 / self.think_time))
+
+    async def session(self, conn):
+        """One widget session: chat, TTS of the reply, maybe STT and an event."""
+        session_id = f"loadgen-{uuid.uuid4()}"
+        client_ip = f"10.{self.rng.randrange(256)}.{self.rng.randrange(256)}.{self.rng.randrange(1, 255)}"
+
+        reply = await self._call(conn, "chat", {"message": self.rng.choice(CHAT_PROMPTS),
+                                                "sessionId": session_id}, client_ip)
+        await self._think()
+        text = (reply or {}).get("reply") or "Hello! How can I help you today?"
+        await self._call(conn, "tts", {"text": text[:1000], "voice_id": "naija_female_warm"}, client_ip)
+
+        if self.rng.random() < self.stt_ratio:
+            await self._think()
+            audio = base64.b64encode(os.urandom(self.rng.randrange(8_000, 48_000))).decode()
+            await self._call(conn, "stt", {"audioBase64": audio, "mimeType": "audio/webm"}, client_ip)
+
+        if self.rng.random() < self.events_ratio:
+            await self._call(conn, "events", {"type": "widget_interaction", "sessionId": session_id}, client_ip)
+        self.sessions += 1
+
+    async def run_closed(self, users, duration):
+        deadline = time.perf_counter() + duration
+
+        async def user():
+            conn = HttpConnection(self.base_url)
+            try:
+                while time.perf_counter() < deadline:
+                    await self.session(conn)
+            finally:
+                await conn.close()
+
+        await asyncio.gather(*(user() for _ in range(users)))
+
+    async def run_open(self, rate, duration, max_in_flight):
+        """Start sessions on a Poisson schedule; drop arrivals when saturated."""
+        idle = [HttpConnection(self.base_url) for _ in range(max_in_flight)]
+        in_flight = set()
+        dropped = 0
+        deadline = time.perf_counter() + duration
+
+        async def one():
+            conn = idle.pop()
+            try:
+                await self.session(conn)
+            finally:
+                idle.append(conn)
+
+        while time.perf_counter() < deadline:
+            if idle:
+                task = asyncio.create_task(one())
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            else:
+                dropped += 1
+            await asyncio.sleep(self.rng.expovariate(rate))
+        if in_flight:
+            await asyncio.gather(*in_flight)
+        await asyncio.gather(*(c.close() for c in idle))
+        return dropped
+
+    def export(self, elapsed, config, dropped=0):
+        return {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "config": config,
+            "elapsed_s": round(elapsed, 2),
+            "sessions": self.sessions,
+            "dropped_arrivals": dropped,
+            "endpoints": {name: s.export(elapsed) for name, s in self.stats.items()},
+        }
+
+
+def print_results(results):
+    print(f"{results['sessions']} sessions in {results['elapsed_s']}s"
+          + (f", {results['dropped_arrivals']} arrivals dropped" if results["dropped_arrivals"] else ""))
+    print(f"{'endpoint':8} {'req':>7} {'rps':>8} {'err%':>6} {'429%':>6} "
+          f"{'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for name, e in results["endpoints"].items():
+        lat = e["latency"]
+        cells = ["-" if lat[k] is None else f"{lat[k]:.1f}" for k in ("p50_ms", "p90_ms", "p99_ms", "max_ms")]
+        print(f"{name:8} {e['requests']:>7} {e['throughput_rps']:>8} {e['error_rate'] * 100:>6.1f} "
+              f"{e['rate_limited_rate'] * 100:>6.1f} {cells[0]:>9} {cells[1]:>9} {cells[2]:>9} {cells[3]:>9}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL, help="server under test (default: %(default)s)")
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument("--users", type=int, default=10, help="closed model: concurrent looping sessions")
+    load.add_argument("--rate", type=float, help="open model: new sessions per second")
+    parser.add_argument("--max-in-flight", type=int, default=200, help="open model: session cap")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to generate load")
+    parser.add_argument("--stt-ratio", type=float, default=0.2, help="share of sessions uploading audio")
+    parser.add_argument("--events-ratio", type=float, default=0.5, help="share of sessions sending an event")
+    parser.add_argument("--think-time", type=float, default=0.0, help="mean pause between steps, seconds")
+    parser.add_argument("--seed", type=int, help="seed for a repeatable session mix")
+    parser.add_argument("--output", default=str(OUTPUT_PATH), help="JSON results file")
+    args = parser.parse_args(argv)
+
+    test = LoadTest(args.base_url, args.stt_ratio, args.events_ratio, args.think_time, args.seed)
+    started = time.perf_counter()
+    dropped = 0
+    if args.rate:
+        dropped = asyncio.run(test.run_open(args.rate, args.duration, args.max_in_flight))
+    else:
+        asyncio.run(test.run_closed(args.users, args.duration))
+    elapsed = time.perf_counter() - started
+
+    config = {k: v for k, v in vars(args).items() if k != "output"}
+    results = test.export(elapsed, config, dropped)
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print_results(results)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
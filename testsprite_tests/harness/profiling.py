@@ -0,0 +1,158 @@
+"""Main-thread profiling around individual scenario actions.
+
+``Profiler`` attaches a CDP session to a page and measures what an action
+costs the renderer's main thread, using:
+
+* ``Performance.getMetrics`` deltas: task (busy) time, script evaluation,
+  layout and style recalculation,
+* a long-task ``PerformanceObserver`` injected before navigation,
+* optionally a ``Tracing`` capture saved as Chrome trace JSON for
+  chrome://tracing or the Performance panel.
+
+Measurements can be checked against budgets so a scenario passes or fails
+on real numbers::
+
+    profiler = await Profiler.attach(context, page)   # before page.goto
+    async with profiler.measure("open_widget") as m:
+        await waits.click(button, "Open the chat widget")
+    assert_within_budget(m, BUDGETS["open_widget"])
+"""
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+TRACES_DIR = Path(__file__).resolve().parent.parent / "tmp" / "traces"
+
+TRACE_CATEGORIES = "devtools.timeline,v8.execute,disabled-by-default-devtools.timeline,blink.user_timing"
+
+# Budgets in milliseconds; ``long_tasks`` is a count of tasks over 50 ms.
+BUDGETS = {
+    "open_widget": {"task_ms": 200, "script_ms": 120, "layout_ms": 40, "style_ms": 40, "long_tasks": 1},
+    "first_message": {"task_ms": 200, "script_ms": 120, "layout_ms": 40, "style_ms": 40, "long_tasks": 1},
+}
+
+_METRICS = {
+    "task_ms": "TaskDuration",
+    "script_ms": "ScriptDuration",
+    "layout_ms": "LayoutDuration",
+    "style_ms": "RecalcStyleDuration",
+}
+
+LONG_TASK_OBSERVER = """
+(() => {
+  window.__odiadevLongTasks = []
+  try {
+    new PerformanceObserver(list => {
+      for (const entry of list.getEntries()) {
+        window.__odiadevLongTasks.push({ start: entry.startTime, duration: entry.duration })
+      }
+    }).observe({ type: 'longtask', buffered: true })
+  } catch (e) { /* longtask entries unsupported */ }
+})()
+"""
+
+
+class Measurement(dict):
+    """Per-action numbers: ``task_ms``, ``script_ms``, ``layout_ms``,
+    ``style_ms``, ``long_tasks``, ``longest_task_ms`` and ``wall_ms``."""
+
+    def __init__(self, label):
+        super().__init__(label=label)
+
+
+class Profiler:
+    def __init__(self, page, session):
+        self.page = page
+        self.session = session
+        self.measurements = []
+
+    @classmethod
+    async def attach(cls, context, page):
+        """Enable CDP metrics for ``page``; call before navigating it."""
+        await context.add_init_script(LONG_TASK_OBSERVER)
+        session = await context.new_cdp_session(page)
+        await session.send("Performance.enable", {"timeDomain": "threadTicks"})
+        return cls(page, session)
+
+    async def _metrics(self):
+        result = await self.session.send("Performance.getMetrics")
+        return {m["name"]: m["value"] for m in result["metrics"]}
+
+    async def _long_tasks(self):
+        return await self.page.evaluate("window.__odiadevLongTasks ? window.__odiadevLongTasks.slice() : []")
+
+    async def _start_trace(self):
+        """Start a CDP trace; returns a coroutine function that stops it."""
+        events = []
+        complete = asyncio.get_running_loop().create_future()
+
+        def on_data(event):
+            events.extend(event.get("value", []))
+
+        def on_complete(_):
+            if not complete.done():
+                complete.set_result(True)
+
+        self.session.on("Tracing.dataCollected", on_data)
+        self.session.once("Tracing.tracingComplete", on_complete)
+        await self.session.send("Tracing.start", {
+            "categories": TRACE_CATEGORIES,
+            "transferMode": "ReportEvents",
+        })
+
+        async def stop():
+            await self.session.send("Tracing.end")
+            await complete
+            self.session.remove_listener("Tracing.dataCollected", on_data)
+            return events
+
+        return stop
+
+    @asynccontextmanager
+    async def measure(self, label, trace=False):
+        """Measure the main-thread cost of the enclosed actions."""
+        measurement = Measurement(label)
+        stop_trace = await self._start_trace() if trace else None
+        before = await self._metrics()
+        tasks_before = len(await self._long_tasks())
+        started = time.perf_counter()
+        try:
+            yield measurement
+        finally:
+            wall = time.perf_counter() - started
+            after = await self._metrics()
+            long_tasks = (await self._long_tasks())[tasks_before:]
+            for key, metric in _METRICS.items():
+                measurement[key] = round((after.get(metric, 0) - before.get(metric, 0)) * 1000, 1)
+            measurement["long_tasks"] = len(long_tasks)
+            measurement["longest_task_ms"] = round(max((t["duration"] for t in long_tasks), default=0), 1)
+            measurement["wall_ms"] = round(wall * 1000, 1)
+            if stop_trace:
+                measurement["trace"] = str(save_trace(label, await stop_trace()))
+            self.measurements.append(measurement)
+
+    def report(self):
+        return [dict(m) for m in self.measurements]
+
+
+def save_trace(label, events, directory=TRACES_DIR):
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{label}-{int(time.time())}.json"
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events}, f)
+    return path
+
+
+def budget_violations(measurement, budget):
+    return [
+        f"{key} {measurement.get(key, 0)} > {limit}"
+        for key, limit in budget.items()
+        if measurement.get(key, 0) > limit
+    ]
+
+
+def assert_within_budget(measurement, budget):
+    violations = budget_violations(measurement, budget)
+    assert not violations, f"{measurement['label']} over budget: {', '.join(violations)}"
@@ -0,0 +1,238 @@
+"""Record and replay real /api exchanges from a content-addressed store.
+
+In ``record`` mode every ``/api/chat``, ``/api/tts`` and ``/api/stt`` call
+made by a context goes to the real backend and the exchange is saved. In
+``replay`` mode the same requests are answered from disk, either with the
+latency observed while recording (``replay``) or immediately
+(``replay-fast``).
+
+Exchanges are keyed by a hash of method, path, the sorted query string and
+the JSON body, with volatile fields (``sessionId``, ``timestamp``, the STT
+``session`` parameter, ...) removed from both, so the same question asked
+in a new session hits the same recording while each sentence fetched as
+``GET /api/tts?text=...`` keeps its own. Response bodies
+are stored once under their own SHA-256, which means every recording of
+the same greeting shares one TTS payload. On replay each blob is
+memory-mapped once per process and served from that mapping, so parallel
+contexts share the page cache instead of each loading the audio; the
+mapping itself is handed to ``route.fulfill``, so the only per-request
+copy is the encoding Playwright sends to the browser.
+
+Layout under the store directory (default ``tmp/recordings``)::
+
+    exchanges/<key>.json   method, path, query, status, headers, elapsed_ms, body digest
+    blobs/<sha256>         response body bytes
+
+Enabled per context by ``browser_context`` from ``ODIADEV_RECORDINGS``
+(``record``, ``replay`` or ``replay-fast``) and ``ODIADEV_RECORDINGS_DIR``;
+the runner's ``--recordings`` flag sets both.
+"""
+import asyncio
+import hashlib
+import json
+import mmap
+import os
+import re
+import tempfile
+import time
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from playwright import async_api
+
+RECORDINGS_DIR = Path(__file__).resolve().parent.parent / "tmp" / "recordings"
+RECORDED_ROUTES = re.compile(r"/api/(chat|tts|stt)(\?.*)?$")
+MODES = ("record", "replay", "replay-fast")
+
+VOLATILE_FIELDS = {"sessionId", "session_id", "timestamp", "requestId", "request_id", "id"}
+VOLATILE_PARAMS = VOLATILE_FIELDS | {"session"}  # streaming STT: ?session=..&seq=..
+
+# Hop-by-hop and length headers are recomputed by Playwright on fulfill.
+_DROPPED_HEADERS = {"content-length", "content-encoding", "transfer-encoding", "connection", "date"}
+
+
+def recording_mode():
+    mode = os.environ.get("ODIADEV_RECORDINGS", "").lower()
+    return mode if mode in MODES else None
+
+
+def strip_volatile(value):
+    if isinstance(value, dict):
+        return {k: strip_volatile(v) for k, v in value.items() if k not in VOLATILE_FIELDS}
+    if isinstance(value, list):
+        return [strip_volatile(v) for v in value]
+    return value
+
+
+def normalize_body(raw):
+    """Canonical bytes for a request body: stable JSON, or the raw bytes."""
+    if not raw:
+        return b""
+    try:
+        data = json.loads(raw)
+    except (ValueError, UnicodeDecodeError):
+        return raw if isinstance(raw, bytes) else raw.encode()
+    return json.dumps(strip_volatile(data), sort_keys=True, separators=(",", ":")).encode()
+
+
+def normalize_query(query):
+    """Canonical query string: parameters sorted, volatile ones dropped."""
+    params = [(k, v) for k, v in parse_qsl(query, keep_blank_values=True) if k not in VOLATILE_PARAMS]
+    return urlencode(sorted(params))
+
+
+def exchange_key(method, url, raw_body):
+    parts = urlsplit(url)
+    digest = hashlib.sha256()
+    digest.update(method.upper().encode() + b"\n" + parts.path.encode() + b"\n")
+    digest.update(normalize_query(parts.query).encode() + b"\n")
+    digest.update(normalize_body(raw_body))
+    return digest.hexdigest()
+
+
+def _atomic_write(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class RecordingStore:
+    """Exchange index plus deduplicated body blobs on disk."""
+
+    def __init__(self, root=RECORDINGS_DIR):
+        self.root = Path(root)
+        self._maps = {}
+
+    def _exchange_path(self, key):
+        return self.root / "exchanges" / f"{key}.json"
+
+    def _blob_path(self, digest):
+        return self.root / "blobs" / digest
+
+    def put_blob(self, data):
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+        if not path.exists():
+            _atomic_write(path, data)
+        return digest
+
+    def blob(self, digest):
+        """The body for ``digest``, memory-mapped and cached for this process."""
+        mapped = self._maps.get(digest)
+        if mapped is None:
+            with open(self._blob_path(digest), "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return b""
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[digest] = mapped
+        return mapped
+
+    def save(self, key, exchange, body):
+        exchange = dict(exchange, body=self.put_blob(body))
+        _atomic_write(self._exchange_path(key), json.dumps(exchange, indent=2).encode())
+
+    def load(self, key):
+        try:
+            with open(self._exchange_path(key), encoding="utf-8") as f:
+                return json.load(f)
+        except OSError:
+            return None
+
+
+def _response_body(body, content_type):
+    """Drop volatile fields from JSON responses so identical replies dedupe."""
+    if "json" not in content_type:
+        return body
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return body
+    if isinstance(data, dict):
+        data = {k: v for k, v in data.items() if k != "timestamp"}
+    return json.dumps(data, separators=(",", ":")).encode()
+
+
+class RecordReplay:
+    """Route handler recording to, or replaying from, a ``RecordingStore``."""
+
+    def __init__(self, mode, store=None, on_miss="fail"):
+        if mode not in MODES:
+            raise ValueError(f"Unknown recording mode: {mode}")
+        self.mode = mode
+        self.store = store or RecordingStore()
+        self.on_miss = on_miss
+        self.hits = 0
+        self.misses = 0
+
+    async def install(self, context):
+        await context.route(RECORDED_ROUTES, self.handle)
+        return self
+
+    def _key(self, request):
+        return exchange_key(request.method, request.url, request.post_data_buffer)
+
+    async def handle(self, route):
+        request = route.request
+        if request.method == "OPTIONS":
+            await route.continue_()
+            return
+        if self.mode == "record":
+            await self._record(route)
+        else:
+            await self._replay(route)
+
+    async def _record(self, route):
+        request = route.request
+        started = time.perf_counter()
+        try:
+            response = await route.fetch()
+            body = await response.body()
+        except async_api.Error:
+            await route.abort()
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in _DROPPED_HEADERS}
+        content_type = response.headers.get("content-type", "")
+        self.store.save(self._key(request), {
+            "method": request.method,
+            "path": urlsplit(request.url).path,
+            "query": normalize_query(urlsplit(request.url).query),
+            "status": response.status,
+            "headers": headers,
+            "elapsed_ms": round(elapsed_ms, 1),
+            "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        }, _response_body(body, content_type))
+        await route.fulfill(response=response, body=body)
+
+    async def _replay(self, route):
+        exchange = self.store.load(self._key(route.request))
+        if exchange is None:
+            self.misses += 1
+            if self.on_miss == "network":
+                await route.continue_()
+            else:
+                await route.fulfill(status=504, content_type="application/json",
+                                    body=json.dumps({"error": "No recording for this request"}))
+            return
+
+        self.hits += 1
+        if self.mode == "replay" and exchange.get("elapsed_ms"):
+            await asyncio.sleep(exchange["elapsed_ms"] / 1000)
+        await route.fulfill(
+            status=exchange["status"],
+            headers=exchange["headers"],
+            body=self.store.blob(exchange["body"]),
+        )
+
+
+_stores = {}
+
+
+async def install_recorder(context, mode=None, root=None):
+    """Record or replay ``context``'s /api traffic; one store per directory."""
+    mode = mode or recording_mode()
+    root = Path(root or os.environ.get("ODIADEV_RECORDINGS_DIR") or RECORDINGS_DIR)
+    store = _stores.setdefault(root, RecordingStore(root))
+    return await RecordReplay(mode, store).install(context)
@@ -0,0 +1,453 @@
+"""Statistical performance regression tracking across commits.
+
+A single timing of a scenario says little; the same scenario on the same
+machine easily varies by 20%. ``run`` repeats the chosen scenarios
+``--repeat`` times (interleaved, one at a time, on one shared Chromium) and
+stores every metric of every run in a SQLite history keyed by git commit,
+environment and scenario:
+
+* ``duration_ms``          the whole scenario,
+* ``step.NN.<action>_ms``  each ``WaitEngine`` step, waiting plus acting,
+* ``api.<route>_ms``       median latency of the run's ``/api/<route>`` calls,
+* ``vitals.<metric>``      TTFB, FCP, LCP and INP in ms, and CLS,
+* ``heap_mb``              JS heap in use when the scenario ends.
+
+``check`` compares a commit's samples with the pooled samples of the last
+``--baselines`` commits measured in the same environment. Each metric gets a
+one-sided Mann-Whitney U test (is it now stochastically larger?), with a
+Holm correction across the scenario's metrics. A metric regressed when that
+test is significant at ``--alpha``; a noisy metric therefore needs a bigger
+shift than a stable one, and there are no per-metric thresholds to tune.
+``--min-change`` optionally ignores significant but tiny shifts.
+
+``report`` renders ``perf-trend-report.html`` next to
+``testsprite-mcp-test-report.html``: per scenario and metric, the median and
+interquartile range for each commit, and the latest commit's verdict.
+
+Usage (from testsprite_tests/)::
+
+    python -m harness.regress run TC005 TC009 --repeat 10
+    python -m harness.regress check --baselines 5
+    python -m harness.regress report
+"""
+import argparse
+import asyncio
+import html
+import math
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+
+from playwright import async_api
+
+from harness.browser import launch_browser, observe_contexts
+from harness.runner import discover_scenarios, run_scenario, scenario_id
+from harness.stubs import stubs_enabled
+from harness.vitals import VITALS_OBSERVER
+from harness.waits import TRACKED_API
+
+SUITE_DIR = Path(__file__).resolve().parent.parent
+HISTORY_PATH = SUITE_DIR / "tmp" / "perf_history.sqlite"
+REPORT_PATH = SUITE_DIR / "perf-trend-report.html"
+DEFAULT_REPEAT = 10
+DEFAULT_BASELINES = 5
+DEFAULT_ALPHA = 0.01
+MIN_SAMPLES = 5
+TREND_COMMITS = 20
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    commit_sha TEXT NOT NULL,
+    environment TEXT NOT NULL,
+    scenario TEXT NOT NULL,
+    iteration INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    started_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_key ON runs (environment, scenario, commit_sha);
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    value REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS metrics_run ON metrics (run_id);
+"""
+
+
+def current_commit():
+    """Short HEAD sha, with ``+dirty`` when tracked files have local changes."""
+    def git(*args):
+        return subprocess.run(["git", *args], cwd=SUITE_DIR, capture_output=True, text=True).stdout.strip()
+    sha = git("rev-parse", "--short=12", "HEAD") or "unknown"
+    return sha + ("+dirty" if git("status", "--porcelain", "--untracked-files=no") else "")
+
+
+def default_environment():
+    """Where the numbers came from; only runs from the same one are compared."""
+    name = os.environ.get("ODIADEV_PERF_ENV")
+    if name:
+        return name
+    name = f"{platform.system().lower()}-{platform.machine()}-{os.cpu_count()}cpu"
+    return name + ("-stubbed" if stubs_enabled() else "")
+
+
+class History:
+    """Run history in SQLite; one row per scenario run, one per metric value."""
+
+    def __init__(self, path=HISTORY_PATH):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA foreign_keys = ON")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def record(self, commit, environment, scenario, iteration, status, metrics):
+        with self.db:
+            run_id = self.db.execute(
+                "INSERT INTO runs (commit_sha, environment, scenario, iteration, status, started_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (commit, environment, scenario, iteration, status,
+                 datetime.now(timezone.utc).isoformat(timespec="seconds")),
+            ).lastrowid
+            self.db.executemany("INSERT INTO metrics (run_id, name, value) VALUES (?, ?, ?)",
+                                [(run_id, name, value) for name, value in metrics.items()])
+
+    def samples(self, commits, environment, scenario):
+        """``{metric: [values]}`` over the passed runs of ``commits``."""
+        if not commits:
+            return {}
+        marks = ",".join("?" * len(commits))
+        rows = self.db.execute(
+            f"SELECT m.name, m.value FROM metrics m JOIN runs r ON r.id = m.run_id "
+            f"WHERE r.environment = ? AND r.scenario = ? AND r.status = 'PASSED' AND r.commit_sha IN ({marks})",
+            (environment, scenario, *commits),
+        )
+        samples = {}
+        for name, value in rows:
+            samples.setdefault(name, []).append(value)
+        return samples
+
+    def commits(self, environment, scenario):
+        """Commits measured for ``scenario``, oldest first by their latest run."""
+        rows = self.db.execute(
+            "SELECT commit_sha FROM runs WHERE environment = ? AND scenario = ? "
+            "GROUP BY commit_sha ORDER BY MAX(id)",
+            (environment, scenario),
+        )
+        return [sha for (sha,) in rows]
+
+    def scenarios(self, environment):
+        rows = self.db.execute("SELECT DISTINCT scenario FROM runs WHERE environment = ? ORDER BY scenario",
+                               (environment,))
+        return [name for (name,) in rows]
+
+    def latest_commit(self, environment):
+        row = self.db.execute("SELECT commit_sha FROM runs WHERE environment = ? ORDER BY id DESC LIMIT 1",
+                              (environment,)).fetchone()
+        return row[0] if row else None
+
+
+class MetricsObserver:
+    """Collects /api latencies, vitals and heap from the contexts a scenario opens."""
+
+    def __init__(self):
+        self.api = {}
+        self.vitals = []
+        self.heap_bytes = []
+
+    async def attach(self, context):
+        await context.add_init_script(VITALS_OBSERVER)
+        context.on("requestfinished", self._on_request)
+
+    def _on_request(self, request):
+        match = TRACKED_API.search(request.url)
+        if match and request.timing.get("responseEnd", -1) >= 0:
+            self.api.setdefault(match.group(1), []).append(request.timing["responseEnd"])
+
+    async def detach(self, context):
+        for page in context.pages:
+            if page.is_closed():
+                continue
+            try:
+                vitals = await page.evaluate("window.__odiadevVitals ? { ...window.__odiadevVitals } : null")
+                if vitals:
+                    self.vitals.append(vitals)
+                session = await context.new_cdp_session(page)
+                await session.send("Performance.enable")
+                metrics = (await session.send("Performance.getMetrics"))["metrics"]
+                self.heap_bytes += [m["value"] for m in metrics if m["name"] == "JSHeapUsedSize"]
+                await session.detach()
+            except async_api.Error:
+                pass  # the page crashed or navigated away mid-read; keep what we have
+
+    def metrics(self):
+        metrics = {f"api.{route}_ms": statistics.median(values) for route, values in self.api.items()}
+        if self.vitals:
+            first = self.vitals[0]
+            for name in ("ttfb", "fcp", "lcp", "inp"):
+                if first.get(name) is not None:
+                    metrics[f"vitals.{name}_ms"] = first[name]
+            metrics["vitals.cls"] = first.get("cls") or 0.0
+        if self.heap_bytes:
+            metrics["heap_mb"] = max(self.heap_bytes) / 2**20
+        return metrics
+
+
+async def measure(path, browser):
+    """Run one scenario once; returns ``(outcome, metrics)``."""
+    observer = MetricsObserver()
+    observe_contexts(observer)
+    outcome = await run_scenario(path, browser, asyncio.Semaphore(1))
+    metrics = {"duration_ms": outcome["duration"] * 1000, **observer.metrics()}
+    for i, step in enumerate(outcome["steps"]):
+        metrics[f"step.{i:02d}.{step['action']}_ms"] = step["waited_ms"] + step["acted_ms"]
+    return outcome, metrics
+
+
+async def run_repeated(paths, repeat, history, commit, environment, headless=True):
+    async with async_api.async_playwright() as pw:
+        browser = await launch_browser(pw, shared=True, headless=headless)
+        try:
+            for iteration in range(repeat):
+                # Interleaved so slow drift on the machine spreads over every scenario
+                for path in paths:
+                    # Its own task, so the observer registration does not leak into the next run
+                    outcome, metrics = await asyncio.create_task(measure(path, browser))
+                    history.record(commit, environment, scenario_id(path), iteration, outcome["status"], metrics)
+        finally:
+            await browser.close()
+
+
+def mann_whitney_greater(current, baseline):
+    """One-sided p-value that ``current`` tends to be larger than ``baseline``.
+
+    Normal approximation to the Mann-Whitney U distribution with tie and
+    continuity corrections; adequate from about five samples a side.
+    """
+    n1, n2 = len(current), len(baseline)
+    combined = sorted([(v, 0) for v in current] + [(v, 1) for v in baseline])
+    rank_sum = 0.0
+    tie_term = 0
+    i = 0
+    while i < len(combined):
+        j = i
+        while j + 1 < len(combined) and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        average_rank = (i + j) / 2 + 1
+        rank_sum += average_rank * sum(1 for k in range(i, j + 1) if combined[k][1] == 0)
+        tie_term += (j - i + 1) ** 3 - (j - i + 1)
+        i = j + 1
+
+    n = n1 + n2
+    u = rank_sum - n1 * (n1 + 1) / 2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def holm(p_values, alpha):
+    """Which of ``p_values`` are significant under Holm's step-down correction."""
+    order = sorted(range(len(p_values)), key=lambda i: p_values[i])
+    significant = [False] * len(p_values)
+    for rank, i in enumerate(order):
+        if p_values[i] > alpha / (len(p_values) - rank):
+            break
+        significant[i] = True
+    return significant
+
+
+def compare(history, commit, environment, scenario, baselines=DEFAULT_BASELINES,
+            alpha=DEFAULT_ALPHA, min_change=0.0):
+    """Test every metric of ``commit`` against the last ``baselines`` commits."""
+    earlier = [c for c in history.commits(environment, scenario) if c != commit]
+    baseline_commits = earlier[-baselines:]
+    current = history.samples([commit], environment, scenario)
+    pooled = history.samples(baseline_commits, environment, scenario)
+
+    rows = []
+    for name in sorted(current):
+        values, base = current[name], pooled.get(name, [])
+        row = {"metric": name, "n": len(values), "baseline_n": len(base),
+               "median": statistics.median(values), "baseline_median": None,
+               "change_pct": None, "p": None, "verdict": "insufficient data"}
+        if base:
+            row["baseline_median"] = statistics.median(base)
+            if row["baseline_median"]:
+                row["change_pct"] = (row["median"] - row["baseline_median"]) / abs(row["baseline_median"]) * 100
+        if len(values) >= MIN_SAMPLES and len(base) >= MIN_SAMPLES:
+            row["p"] = mann_whitney_greater(values, base)
+        rows.append(row)
+
+    tested = [row for row in rows if row["p"] is not None]
+    for row, significant in zip(tested, holm([row["p"] for row in tested], alpha)):
+        big_enough = row["change_pct"] is None or row["change_pct"] >= min_change
+        row["verdict"] = "regressed" if significant and big_enough else "ok"
+    return {"scenario": scenario, "commit": commit, "baselines": baseline_commits, "metrics": rows}
+
+
+def print_comparison(result):
+    regressed = [row for row in result["metrics"] if row["verdict"] == "regressed"]
+    baselines = ", ".join(result["baselines"]) or "none"
+    print(f"{result['scenario']} @ {result['commit']} vs {baselines}: "
+          f"{len(regressed)} regressed of {len(result['metrics'])} metrics")
+    for row in result["metrics"]:
+        if row["verdict"] == "ok":
+            continue
+        change = "-" if row["change_pct"] is None else f"{row['change_pct']:+.1f}%"
+        p = "-" if row["p"] is None else f"{row['p']:.2g}"
+        base = "-" if row["baseline_median"] is None else f"{row['baseline_median']:.3g}"
+        print(f"  {row['verdict']:17} {row['metric']:28} {row['median']:>10.3g} vs {base:>8} {change:>8}  p={p}")
+
+
+def _quartiles(values):
+    if len(values) < 2:
+        return values[0], values[0]
+    q1, _, q3 = statistics.quantiles(values, n=4)
+    return q1, q3
+
+
+def trend_svg(points, width=240, height=48):
+    """Median line with an interquartile band per commit; the last point is marked."""
+    if not points:
+        return ""
+    low = min(p["q1"] for p in points)
+    high = max(p["q3"] for p in points)
+    span = (high - low) or 1.0
+    step = width / max(1, len(points) - 1)
+
+    def xy(i, value):
+        return round(i * step if len(points) > 1 else width / 2, 1), round(height - 4 - (value - low) / span * (height - 8), 1)
+
+    band = [f'<line x1="{xy(i, p["q1"])[0]}" y1="{xy(i, p["q1"])[1]}" x2="{xy(i, p["q3"])[0]}" '
+            f'y2="{xy(i, p["q3"])[1]}" stroke="#c7d2fe" stroke-width="4"/>' for i, p in enumerate(points)]
+    line = " ".join(f"{x},{y}" for x, y in (xy(i, p["median"]) for i, p in enumerate(points)))
+    last_x, last_y = xy(len(points) - 1, points[-1]["median"])
+    return (f'<svg width="{width}" height="{height}" viewBox="-4 0 {width + 8} {height}">{"".join(band)}'
+            f'<polyline points="{line}" fill="none" stroke="#3730a3" stroke-width="1.5"/>'
+            f'<circle cx="{last_x}" cy="{last_y}" r="3" fill="#3730a3"/></svg>')
+
+
+REPORT_STYLE = """
+body { font-family: sans-serif; padding: 40px; line-height: 1.6; background: #fdfdfd; color: #333; }
+table { border-collapse: collapse; width: 100%; margin-top: 20px; }
+th, td { border: 1px solid #ccc; padding: 8px 12px; text-align: left; vertical-align: middle; }
+th { background-color: #f2f2f2; font-weight: bold; }
+td.num { text-align: right; font-family: monospace; }
+.regressed { background: #fde2e2; }
+.regressed td:last-child { color: #b91c1c; font-weight: bold; }
+"""
+
+
+def render_report(history, environment, baselines, alpha, min_change):
+    sections = []
+    for scenario in history.scenarios(environment):
+        commits = history.commits(environment, scenario)[-TREND_COMMITS:]
+        per_commit = [(c, history.samples([c], environment, scenario)) for c in commits]
+        result = compare(history, commits[-1], environment, scenario, baselines, alpha, min_change)
+        rows = []
+        for row in result["metrics"]:
+            points = []
+            for _, samples in per_commit:
+                values = samples.get(row["metric"])
+                if values:
+                    q1, q3 = _quartiles(values)
+                    points.append({"median": statistics.median(values), "q1": q1, "q3": q3})
+            change = "" if row["change_pct"] is None else f"{row['change_pct']:+.1f}%"
+            base = "" if row["baseline_median"] is None else f"{row['baseline_median']:.3g}"
+            p = "" if row["p"] is None else f"{row['p']:.2g}"
+            rows.append(
+                f'<tr class="{row["verdict"].replace(" ", "-")}"><td>{html.escape(row["metric"])}</td>'
+                f'<td>{trend_svg(points)}</td><td class="num">{row["median"]:.3g}</td><td class="num">{base}</td>'
+                f'<td class="num">{change}</td><td class="num">{p}</td><td>{row["verdict"]}</td></tr>')
+        regressed = sum(row["verdict"] == "regressed" for row in result["metrics"])
+        sections.append(
+            f"<h2>{html.escape(scenario)}</h2>"
+            f"<p>Latest commit <code>{html.escape(result['commit'])}</code> against "
+            f"{len(result['baselines'])} baseline commit(s); {regressed} regressed. "
+            f"Trend shows the median and interquartile range of the last {len(commits)} commits.</p>"
+            "<table><tr><th>Metric</th><th>Trend</th><th>Median</th><th>Baseline median</th>"
+            "<th>Change</th><th>p</th><th>Verdict</th></tr>" + "".join(rows) + "</table>")
+
+    generated = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+    return (f'<!DOCTYPE html>\n<html lang="en">\n<head>\n<meta charset="UTF-8" />\n'
+            f"<title>ODIADEV Performance Trends</title>\n<style>{REPORT_STYLE}</style>\n</head>\n<body>\n"
+            f"<h1>ODIADEV Performance Trends</h1>\n"
+            f"<p>Environment <code>{html.escape(environment)}</code>, generated {generated}. "
+            f"A metric regressed when a one-sided Mann-Whitney U test against the pooled last {baselines} "
+            f"commits is significant at {alpha} after Holm correction.</p>\n"
+            + ("\n".join(sections) or "<p>No runs recorded for this environment yet.</p>")
+            + "\n</body>\n</html>\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default=str(HISTORY_PATH), help="SQLite history (default: tmp/perf_history.sqlite)")
+    parser.add_argument("--environment", default=default_environment(),
+                        help="environment key; ODIADEV_PERF_ENV overrides the default (%(default)s)")
+    parser.add_argument("--baselines", type=int, default=DEFAULT_BASELINES,
+                        help="earlier commits pooled as the baseline (default: %(default)s)")
+    parser.add_argument("--alpha", type=float, default=DEFAULT_ALPHA, help="significance level (default: %(default)s)")
+    parser.add_argument("--min-change", type=float, default=0.0,
+                        help="ignore significant shifts of the median below this percent (default: %(default)s)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="repeat scenarios, record their metrics, then check the commit")
+    run.add_argument("tests", nargs="*", help="scenario id prefixes to run (e.g. TC005 TC009)")
+    run.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="runs per scenario (default: %(default)s)")
+    run.add_argument("--commit", default=None, help="record under this commit instead of HEAD")
+    run.add_argument("--headed", action="store_true", help="show the browser window")
+
+    check = commands.add_parser("check", help="test a commit's metrics against the baseline commits")
+    check.add_argument("--commit", default=None, help="commit to check (default: the latest recorded)")
+
+    report = commands.add_parser("report", help="write the HTML trend report")
+    report.add_argument("--output", default=str(REPORT_PATH), help="default: perf-trend-report.html in the suite")
+    args = parser.parse_args(argv)
+
+    history = History(args.db)
+    try:
+        if args.command == "report":
+            Path(args.output).write_text(
+                render_report(history, args.environment, args.baselines, args.alpha, args.min_change),
+                encoding="utf-8")
+            print(f"wrote {args.output}")
+            return 0
+
+        if args.command == "run":
+            paths = discover_scenarios(args.tests)
+            if not paths:
+                parser.error("no scenarios matched")
+            commit = args.commit or current_commit()
+            asyncio.run(run_repeated(paths, args.repeat, history, commit, args.environment,
+                                     headless=not args.headed))
+            scenarios = [scenario_id(p) for p in paths]
+        else:
+            commit = args.commit or history.latest_commit(args.environment)
+            if commit is None:
+                parser.error(f"no runs recorded for environment {args.environment}")
+            scenarios = history.scenarios(args.environment)
+
+        regressions = 0
+        for scenario in scenarios:
+            if commit not in history.commits(args.environment, scenario):
+                continue
+            result = compare(history, commit, args.environment, scenario,
+                             args.baselines, args.alpha, args.min_change)
+            print_comparison(result)
+            regressions += sum(row["verdict"] == "regressed" for row in result["metrics"])
+        return 1 if regressions else 0
+    finally:
+        history.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,209 @@
+"""Run the TC scenarios concurrently against one shared Chromium.
+
+Each TC0xx_*.py file exposes ``run_test(browser=None)``. This runner imports
+them, launches a single browser and runs every scenario in its own isolated
+``BrowserContext``, at most ``--concurrency`` at a time. The outcome is
+written back in the same shape as ``tmp/test_results.json``.
+
+Usage (from testsprite_tests/)::
+
+    python -m harness.runner                  # every scenario
+    python -m harness.runner TC005 TC009      # a subset
+    python -m harness.runner --concurrency 8 --output tmp/nightly.json
+    python -m harness.runner --stub-backend --stub-latency recorded
+    python -m harness.runner --recordings replay-fast
+"""
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import time
+import traceback
+from datetime import datetime, timezone
+from pathlib import Path
+
+from playwright import async_api
+
+from harness.browser import launch_browser
+from harness.waits import collect_timings
+
+SUITE_DIR = Path(__file__).resolve().parent.parent
+RESULTS_PATH = SUITE_DIR / "tmp" / "test_results.json"
+TIMINGS_PATH = SUITE_DIR / "tmp" / "step_timings.json"
+DURATIONS_PATH = SUITE_DIR / "tmp" / "durations.json"
+DEFAULT_CONCURRENCY = 4
+
+
+def discover_scenarios(selectors=None):
+    """Return the TC files in the suite, optionally filtered by id prefix."""
+    paths = sorted(SUITE_DIR.glob("TC[0-9][0-9][0-9]_*.py"))
+    if selectors:
+        paths = [p for p in paths if any(p.name.startswith(s) for s in selectors)]
+    return paths
+
+
+def scenario_id(path):
+    return path.name.split("_", 1)[0]
+
+
+def load_scenario(path):
+    """Import a TC file and return its ``run_test`` coroutine function."""
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.run_test
+
+
+async def run_scenario(path, browser, semaphore):
+    """Run one scenario and return an outcome dict (status, error, duration, steps)."""
+    async with semaphore:
+        steps = collect_timings()
+        started = time.perf_counter()
+        try:
+            run_test = load_scenario(path)
+            await run_test(browser)
+            status, error = "PASSED", ""
+        except AssertionError as e:
+            status, error = "FAILED", str(e) or "Assertion failed"
+        except Exception as e:
+            status, error = "FAILED", "".join(traceback.format_exception_only(type(e), e)).strip()
+        duration = time.perf_counter() - started
+
+    waited = sum(s["waited_ms"] for s in steps) / 1000
+    print(f"{status:6}  {scenario_id(path)}  {duration:6.1f}s  (waiting {waited:5.1f}s)  "
+          f"{error.splitlines()[0] if error else ''}")
+    return {"id": scenario_id(path), "status": status, "error": error, "duration": duration, "steps": steps}
+
+
+async def run_suite(paths, concurrency=DEFAULT_CONCURRENCY, headless=True):
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    async with async_api.async_playwright() as pw:
+        browser = await launch_browser(pw, shared=True, headless=headless)
+        try:
+            return await asyncio.gather(*(run_scenario(p, browser, semaphore) for p in paths))
+        finally:
+            await browser.close()
+
+
+def load_records(path=RESULTS_PATH):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+def merge_results(records, outcomes):
+    """Update ``test_results.json`` records in place from scenario outcomes.
+
+    Records are matched on the ``TC0xx`` prefix of their title so the
+    TestSprite metadata (ids, description, code) is preserved. Scenarios with
+    no existing record get a minimal one.
+    """
+    by_id = {r.get("title", "").split("-", 1)[0]: r for r in records}
+    now = datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+    for outcome in outcomes:
+        record = by_id.get(outcome["id"])
+        if record is None:
+            record = {"title": outcome["id"], "testType": "FRONTEND", "createFrom": "harness", "created": now}
+            records.append(record)
+            by_id[outcome["id"]] = record
+        record["testStatus"] = outcome["status"]
+        record["testError"] = outcome["error"]
+        record["modified"] = now
+    return records
+
+
+def write_records(records, path=RESULTS_PATH):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(records, f, indent=2)
+
+
+def write_timings(outcomes, path=TIMINGS_PATH):
+    """Write per-scenario duration and step wait/act times for profiling."""
+    timings = {
+        o["id"]: {"duration_s": round(o["duration"], 2), "steps": o["steps"]}
+        for o in outcomes
+    }
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(timings, f, indent=2)
+
+
+def load_durations(path=DURATIONS_PATH):
+    """Return ``{scenario id: smoothed duration in seconds}`` from past runs."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def record_durations(outcomes, path=DURATIONS_PATH, weight=0.3):
+    """Fold this run's durations into the history as a moving average."""
+    durations = load_durations(path)
+    for o in outcomes:
+        previous = durations.get(o["id"])
+        durations[o["id"]] = round(o["duration"] if previous is None
+                                   else previous + weight * (o["duration"] - previous), 2)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(durations, f, indent=2, sort_keys=True)
+
+
+def apply_stub_options(args):
+    """Export the backend flags so every context (and shard worker) sees them."""
+    if args.stub_backend:
+        os.environ["ODIADEV_STUB_BACKEND"] = "1"
+    if args.stub_latency:
+        os.environ["ODIADEV_STUB_LATENCY"] = args.stub_latency
+    if args.recordings:
+        os.environ["ODIADEV_RECORDINGS"] = args.recordings
+    if args.recordings_dir:
+        os.environ["ODIADEV_RECORDINGS_DIR"] = str(Path(args.recordings_dir).resolve())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("tests", nargs="*", help="scenario id prefixes to run (e.g. TC005 TC009)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="maximum scenarios running at once (default: %(default)s)")
+    parser.add_argument("--output", default=str(RESULTS_PATH),
+                        help="results file to update (default: tmp/test_results.json)")
+    parser.add_argument("--timings", default=str(TIMINGS_PATH),
+                        help="where to write step timings (default: tmp/step_timings.json)")
+    parser.add_argument("--stub-backend", action="store_true",
+                        help="serve /api/chat, /api/tts, /api/stt and /api/events from fixtures")
+    parser.add_argument("--stub-latency", metavar="MODE",
+                        help="stub latency for every route: zero, recorded, fixed or fixed:<ms>")
+    parser.add_argument("--recordings", choices=("record", "replay", "replay-fast"),
+                        help="record /api exchanges, or replay them with original timing or at full speed")
+    parser.add_argument("--recordings-dir", help="recording store (default: tmp/recordings)")
+    parser.add_argument("--headed", action="store_true", help="show the browser window")
+    args = parser.parse_args(argv)
+
+    apply_stub_options(args)
+    paths = discover_scenarios(args.tests)
+    if not paths:
+        parser.error("no scenarios matched")
+
+    started = time.perf_counter()
+    outcomes = asyncio.run(run_suite(paths, args.concurrency, headless=not args.headed))
+    elapsed = time.perf_counter() - started
+
+    records = load_records(args.output) or load_records()
+    write_records(merge_results(records, outcomes), args.output)
+    write_timings(outcomes, args.timings)
+    record_durations(outcomes)
+    passed = sum(o["status"] == "PASSED" for o in outcomes)
+    print(f"\n{passed}/{len(outcomes)} passed in {elapsed:.1f}s (concurrency {args.concurrency})")
+    return 0 if passed == len(outcomes) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
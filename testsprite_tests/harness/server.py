@@ -0,0 +1,265 @@
+"""Long-lived warm Chromium for repeated local scenario runs.
+
+Rerunning one scenario while iterating on the chat widget used to pay a
+cold Chromium launch every time. This server keeps one Chromium running
+with a DevTools endpoint and hands it out through a small HTTP control
+API; ``harness.browser.browser_context`` attaches to it over CDP when the
+server is up and falls back to launching its own browser when it is not.
+
+Each client opens a fresh ``BrowserContext``, so runs never share cookies,
+storage or permissions. The browser is recycled after ``--max-uses``
+leases, or when the resident memory of its process tree goes above
+``--max-rss-mb``. Recycling waits until no lease is outstanding.
+
+Control API (JSON over HTTP on 127.0.0.1)::
+
+    GET  /lease     -> {"endpoint": "http://127.0.0.1:<cdp port>", "lease": id, ...}
+    POST /release?lease=<id>
+    GET  /status
+
+Usage (from testsprite_tests/)::
+
+    python -m harness.server --max-uses 50 --max-rss-mb 1500
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import signal
+import subprocess
+import tempfile
+import urllib.request
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+from playwright import async_api
+
+from harness.browser import CHROMIUM_ARGS, SERVER_STATE_PATH as STATE_PATH
+
+DEFAULT_CONTROL_PORT = 9230
+DEFAULT_CDP_PORT = 9231
+
+
+def process_tree_rss(pid):
+    """Resident memory in bytes of ``pid`` and all its descendants.
+
+    Uses psutil when it is installed and /proc otherwise; returns 0 when
+    neither is available, which disables the memory-based recycle.
+    """
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+
+    if psutil is not None:
+        try:
+            root = psutil.Process(pid)
+            return sum(p.memory_info().rss for p in [root] + root.children(recursive=True))
+        except psutil.Error:
+            return 0
+
+    proc = Path("/proc")
+    if not proc.exists():
+        return 0
+    children = {}
+    rss = {}
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    for entry in proc.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+            statm = (entry / "statm").read_text().split()
+        except OSError:
+            continue
+        ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        children.setdefault(ppid, []).append(int(entry.name))
+        rss[int(entry.name)] = int(statm[1]) * page_size
+
+    total, stack = 0, [pid]
+    while stack:
+        current = stack.pop()
+        total += rss.get(current, 0)
+        stack.extend(children.get(current, []))
+    return total
+
+
+class WarmBrowser:
+    """A Chromium process exposed over CDP, recycled by use count or memory."""
+
+    def __init__(self, executable, cdp_port, max_uses, max_rss_bytes, headless=True):
+        self.executable = executable
+        self.cdp_port = cdp_port
+        self.max_uses = max_uses
+        self.max_rss_bytes = max_rss_bytes
+        self.headless = headless
+        self.process = None
+        self.profile_dir = None
+        self.generation = 0
+        self.uses = 0
+        self.leases = set()
+        self._next_lease = 0
+
+    @property
+    def endpoint(self):
+        return f"http://127.0.0.1:{self.cdp_port}"
+
+    async def start(self):
+        self.profile_dir = tempfile.mkdtemp(prefix="odiadev-warm-chromium-")
+        args = [
+            self.executable,
+            f"--remote-debugging-port={self.cdp_port}",
+            f"--user-data-dir={self.profile_dir}",
+            "--no-first-run",
+            "--no-default-browser-check",
+            *CHROMIUM_ARGS,
+        ]
+        if self.headless:
+            args.append("--headless=new")
+        self.process = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self.generation += 1
+        self.uses = 0
+        await self._wait_for_devtools()
+        print(f"warm browser #{self.generation} ready on {self.endpoint} (pid {self.process.pid})")
+
+    async def _wait_for_devtools(self, timeout=15.0):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while loop.time() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"Chromium exited during startup with code {self.process.returncode}")
+            try:
+                await asyncio.to_thread(urllib.request.urlopen, f"{self.endpoint}/json/version", timeout=0.5)
+                return
+            except OSError:
+                await asyncio.sleep(0.1)
+        raise RuntimeError("Chromium DevTools endpoint did not come up in time")
+
+    async def stop(self):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                await asyncio.to_thread(self.process.wait, 5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.process = None
+        if self.profile_dir:
+            shutil.rmtree(self.profile_dir, ignore_errors=True)
+            self.profile_dir = None
+
+    def rss(self):
+        return process_tree_rss(self.process.pid) if self.process else 0
+
+    def needs_recycle(self):
+        if self.process is None or self.process.poll() is not None:
+            return True
+        if self.max_uses and self.uses >= self.max_uses:
+            return True
+        return bool(self.max_rss_bytes) and self.rss() > self.max_rss_bytes
+
+    async def lease(self):
+        """Hand out the browser, recycling it first if it is due and idle."""
+        if not self.leases and self.needs_recycle():
+            await self.stop()
+            await self.start()
+        self.uses += 1
+        self._next_lease += 1
+        self.leases.add(self._next_lease)
+        return {"endpoint": self.endpoint, "lease": self._next_lease,
+                "generation": self.generation, "uses": self.uses}
+
+    def release(self, lease_id):
+        self.leases.discard(lease_id)
+
+    def status(self):
+        return {"endpoint": self.endpoint, "generation": self.generation, "uses": self.uses,
+                "active_leases": len(self.leases), "rss_mb": round(self.rss() / 2**20, 1),
+                "max_uses": self.max_uses, "max_rss_mb": round(self.max_rss_bytes / 2**20)}
+
+
+async def serve_control(warm, port):
+    """Serve the lease/release/status API until cancelled."""
+    lock = asyncio.Lock()
+
+    async def handle(reader, writer):
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            method, target = (request_line + ["", ""])[:2]
+            url = urlsplit(target)
+            async with lock:
+                if method == "GET" and url.path == "/lease":
+                    status, body = 200, await warm.lease()
+                elif method == "POST" and url.path == "/release":
+                    lease_id = parse_qs(url.query).get("lease", ["0"])[0]
+                    warm.release(int(lease_id) if lease_id.isdigit() else 0)
+                    status, body = 200, {"ok": True}
+                elif method == "GET" and url.path == "/status":
+                    status, body = 200, warm.status()
+                else:
+                    status, body = 404, {"error": "Not found"}
+        except Exception as e:
+            status, body = 500, {"error": str(e)}
+
+        payload = json.dumps(body).encode()
+        writer.write(
+            f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n"
+            f"Connection: close\r\n\r\n".encode() + payload
+        )
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", port)
+    async with server:
+        await server.serve_forever()
+
+
+async def run_server(args):
+    async with async_api.async_playwright() as pw:
+        executable = pw.chromium.executable_path
+
+    warm = WarmBrowser(executable, args.cdp_port, args.max_uses, args.max_rss_mb * 2**20,
+                       headless=not args.headed)
+    await warm.start()
+
+    STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    STATE_PATH.write_text(json.dumps({"control": f"http://127.0.0.1:{args.port}", "pid": os.getpid()}))
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:
+            pass
+
+    control = asyncio.create_task(serve_control(warm, args.port))
+    print(f"browser server listening on http://127.0.0.1:{args.port}")
+    try:
+        await stop.wait()
+    finally:
+        control.cancel()
+        await warm.stop()
+        STATE_PATH.unlink(missing_ok=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=DEFAULT_CONTROL_PORT, help="control API port")
+    parser.add_argument("--cdp-port", type=int, default=DEFAULT_CDP_PORT, help="Chromium DevTools port")
+    parser.add_argument("--max-uses", type=int, default=50, help="recycle after this many leases (0: never)")
+    parser.add_argument("--max-rss-mb", type=int, default=1500,
+                        help="recycle when the browser's memory exceeds this (0: never)")
+    parser.add_argument("--headed", action="store_true", help="show the browser window")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(run_server(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""Shard the TC scenarios across a pool of worker processes.
+
+One Chromium tops out at roughly one core, so ``harness.runner`` alone
+cannot use a 16-core CI box. This mode splits the scenarios (and, with
+``--repeat``, repeated iterations of them) into one shard per worker
+process. Each worker launches its own browser and runs its shard through
+``harness.runner.run_suite``.
+
+Shards are balanced by each scenario's historical duration from
+``tmp/durations.json`` (longest first onto the least-loaded worker), so the
+long TC006/TC012 runs are spread out instead of landing together.
+Scenarios with no history are assumed to take the median known duration.
+
+Usage (from testsprite_tests/)::
+
+    python -m harness.shard                       # one worker per CPU
+    python -m harness.shard --workers 8 --repeat 5 TC006 TC012
+"""
+import argparse
+import asyncio
+import heapq
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from harness import runner
+
+SUMMARY_PATH = runner.SUITE_DIR / "tmp" / "shard_summary.json"
+DEFAULT_DURATION = 30.0
+
+
+def plan_shards(jobs, workers, durations):
+    """Split ``(path, iteration)`` jobs into ``workers`` balanced shards.
+
+    Uses longest-processing-time-first: jobs sorted by expected duration
+    are each assigned to the shard with the smallest expected total.
+    Returns a list of ``(expected_seconds, jobs)`` tuples.
+    """
+    known = [d for d in durations.values() if d > 0]
+    fallback = statistics.median(known) if known else DEFAULT_DURATION
+
+    def expected(job):
+        return durations.get(runner.scenario_id(job[0]), fallback)
+
+    heap = [(0.0, i) for i in range(max(1, min(workers, len(jobs))))]
+    shards = [[] for _ in heap]
+    totals = [0.0 for _ in heap]
+    for job in sorted(jobs, key=expected, reverse=True):
+        total, i = heapq.heappop(heap)
+        shards[i].append(job)
+        totals[i] = total + expected(job)
+        heapq.heappush(heap, (totals[i], i))
+    return list(zip(totals, shards))
+
+
+def run_shard(shard_index, jobs, concurrency, headless):
+    """Worker entry point: run one shard on its own browser."""
+    if str(runner.SUITE_DIR) not in sys.path:
+        sys.path.insert(0, str(runner.SUITE_DIR))
+    started = time.perf_counter()
+    outcomes = asyncio.run(runner.run_suite([p for p, _ in jobs], concurrency, headless=headless))
+    for outcome, (_, iteration) in zip(outcomes, jobs):
+        outcome["iteration"] = iteration
+        outcome["shard"] = shard_index
+    return {"shard": shard_index, "elapsed": time.perf_counter() - started, "outcomes": outcomes}
+
+
+def combine_iterations(outcomes):
+    """Collapse repeated iterations into one outcome per scenario.
+
+    A scenario passes only if every iteration passed; the error of the first
+    failing iteration is kept. The duration is the mean across iterations.
+    """
+    grouped = {}
+    for o in outcomes:
+        grouped.setdefault(o["id"], []).append(o)
+
+    combined = []
+    for scenario, runs in sorted(grouped.items()):
+        failures = [r for r in runs if r["status"] != "PASSED"]
+        error = ""
+        if failures:
+            error = failures[0]["error"]
+            if len(runs) > 1:
+                error = f"{len(failures)}/{len(runs)} iterations failed: {error}"
+        combined.append({
+            "id": scenario,
+            "status": "FAILED" if failures else "PASSED",
+            "error": error,
+            "duration": statistics.mean(r["duration"] for r in runs),
+            "steps": runs[0]["steps"],
+        })
+    return combined
+
+
+def summarize(plan, shard_results, outcomes, elapsed):
+    """Timing summary: wall time, per-shard load and per-scenario spread."""
+    grouped = {}
+    for o in outcomes:
+        grouped.setdefault(o["id"], []).append(o["duration"])
+    return {
+        "wall_s": round(elapsed, 2),
+        "cpu_s": round(sum(o["duration"] for o in outcomes), 2),
+        "shards": [
+            {
+                "shard": r["shard"],
+                "expected_s": round(plan[r["shard"]][0], 2),
+                "elapsed_s": round(r["elapsed"], 2),
+                "jobs": [f'{o["id"]}#{o["iteration"]}' for o in r["outcomes"]],
+            }
+            for r in sorted(shard_results, key=lambda r: r["shard"])
+        ],
+        "scenarios": {
+            scenario: {
+                "runs": len(durations),
+                "mean_s": round(statistics.mean(durations), 2),
+                "min_s": round(min(durations), 2),
+                "max_s": round(max(durations), 2),
+            }
+            for scenario, durations in sorted(grouped.items())
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("tests", nargs="*", help="scenario id prefixes to run (e.g. TC006 TC012)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="worker processes, one browser each (default: CPU count)")
+    parser.add_argument("--repeat", type=int, default=1, help="iterations of each scenario")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="scenarios running at once inside each worker (default: %(default)s)")
+    parser.add_argument("--output", default=str(runner.RESULTS_PATH),
+                        help="results file to update (default: tmp/test_results.json)")
+    parser.add_argument("--summary", default=str(SUMMARY_PATH),
+                        help="where to write the timing summary (default: tmp/shard_summary.json)")
+    parser.add_argument("--stub-backend", action="store_true",
+                        help="serve /api/chat, /api/tts, /api/stt and /api/events from fixtures")
+    parser.add_argument("--stub-latency", metavar="MODE",
+                        help="stub latency for every route: zero, recorded, fixed or fixed:<ms>")
+    parser.add_argument("--recordings", choices=("record", "replay", "replay-fast"),
+                        help="record /api exchanges, or replay them with original timing or at full speed")
+    parser.add_argument("--recordings-dir", help="recording store (default: tmp/recordings)")
+    parser.add_argument("--headed", action="store_true", help="show the browser windows")
+    args = parser.parse_args(argv)
+
+    runner.apply_stub_options(args)
+    paths = runner.discover_scenarios(args.tests)
+    if not paths:
+        parser.error("no scenarios matched")
+
+    jobs = [(p, i) for i in range(max(1, args.repeat)) for p in paths]
+    plan = plan_shards(jobs, args.workers, runner.load_durations())
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=len(plan)) as pool:
+        futures = [
+            pool.submit(run_shard, i, shard, args.concurrency, not args.headed)
+            for i, (_, shard) in enumerate(plan)
+        ]
+        shard_results = [f.result() for f in futures]
+    elapsed = time.perf_counter() - started
+
+    outcomes = [o for r in shard_results for o in r["outcomes"]]
+    combined = combine_iterations(outcomes)
+
+    records = runner.load_records(args.output) or runner.load_records()
+    runner.write_records(runner.merge_results(records, combined), args.output)
+    runner.record_durations(outcomes)
+
+    summary = summarize(plan, shard_results, outcomes, elapsed)
+    Path(args.summary).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.summary, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+
+    passed = sum(o["status"] == "PASSED" for o in combined)
+    print(f"\n{passed}/{len(combined)} passed, {len(outcomes)} runs on {len(plan)} workers "
+          f"in {elapsed:.1f}s (sequential {summary['cpu_s']:.1f}s)")
+    return 0 if passed == len(combined) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
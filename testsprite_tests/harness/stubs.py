@@ -0,0 +1,211 @@
+"""Deterministic backend stubs for the widget's /api routes.
+
+``install_stubs(context)`` intercepts ``/api/chat``, ``/api/tts``,
+``/api/stt`` and ``/api/events`` with ``BrowserContext.route`` and answers
+from the JSON fixtures in ``testsprite_tests/fixtures``. Nothing leaves the
+machine, so the scenarios measure the widget rather than n8n or the
+upstream TTS, and the suite runs offline.
+
+Each fixture file declares the route's latency model:
+
+* ``zero``      answer immediately,
+* ``fixed``     wait ``fixed_ms`` before answering,
+* ``recorded``  draw from ``samples_ms`` (seeded, so runs are repeatable).
+
+The mode in the file can be overridden per route by the caller, or for
+every route with ``ODIADEV_STUB_LATENCY`` (``zero``, ``recorded``,
+``fixed`` or ``fixed:<ms>``). ``browser_context`` installs the stubs when
+``ODIADEV_STUB_BACKEND`` is set, which ``harness.runner --stub-backend``
+does for you.
+"""
+import asyncio
+import base64
+import json
+import os
+import random
+import re
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import parse_qsl, urlsplit
+
+FIXTURES_DIR = Path(__file__).resolve().parent.parent / "fixtures"
+STUBBED_ROUTES = ("chat", "tts", "stt", "events")
+ROUTE_PATTERN = re.compile(r"/api/(chat|tts|stt|events)(\?.*)?$")
+
+# MPEG-1 Layer III, 128 kbit/s, 44.1 kHz, mono. With all-zero side info each
+# frame decodes to silence, which is enough for playback code paths.
+_MP3_FRAME = bytes([0xFF, 0xFB, 0x90, 0xC4]) + bytes(413)
+
+
+# Mirrors the deterministic engine in api/_lib/stt.ts: one word per ~0.25 s of audio
+STT_BYTES_PER_WORD = 4000
+
+
+def silent_mp3(frames):
+    return _MP3_FRAME * max(1, frames)
+
+
+def stubs_enabled():
+    return os.environ.get("ODIADEV_STUB_BACKEND", "").lower() not in ("", "0", "false", "no")
+
+
+def load_fixture(name, fixtures_dir=FIXTURES_DIR):
+    with open(Path(fixtures_dir) / f"{name}.json", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def parse_latency(spec):
+    """Turn ``zero``/``recorded``/``fixed``/``fixed:250`` into a latency dict."""
+    mode, _, value = spec.partition(":")
+    latency = {"mode": mode}
+    if mode == "fixed" and value:
+        latency["fixed_ms"] = float(value)
+    return latency
+
+
+class LatencyModel:
+    def __init__(self, config, seed):
+        self.mode = config.get("mode", "zero")
+        self.fixed_ms = float(config.get("fixed_ms", 0))
+        self.samples_ms = list(config.get("samples_ms", [])) or [0.0]
+        self._rng = random.Random(seed)
+
+    def next_delay(self):
+        """Delay in seconds for the next response."""
+        if self.mode == "fixed":
+            return self.fixed_ms / 1000
+        if self.mode == "recorded":
+            return self._rng.choice(self.samples_ms) / 1000
+        return 0.0
+
+
+class BackendStubs:
+    """Serves the fixtures for one browser context and logs every call."""
+
+    def __init__(self, latency=None, fixtures_dir=FIXTURES_DIR):
+        override = os.environ.get("ODIADEV_STUB_LATENCY")
+        latency = dict(latency or {})
+        self.fixtures = {}
+        self.latency = {}
+        self.calls = []
+        self.stt_sessions = {}
+        for name in STUBBED_ROUTES:
+            fixture = load_fixture(name, fixtures_dir)
+            config = dict(fixture.get("latency", {}))
+            if override:
+                config.update(parse_latency(override))
+            if name in latency:
+                spec = latency[name]
+                config.update(parse_latency(spec) if isinstance(spec, str) else spec)
+            self.fixtures[name] = fixture
+            self.latency[name] = LatencyModel(config, seed=name)
+
+    async def install(self, context):
+        await context.route(ROUTE_PATTERN, self.handle)
+        return self
+
+    def _request_json(self, request):
+        if request.method == "GET":
+            return dict(parse_qsl(urlsplit(request.url).query))
+        try:
+            return request.post_data_json or {}
+        except ValueError:
+            return {}
+
+    def _streaming(self, request, payload):
+        """Mirror api/tts.ts: ?stream=1 or an audio Accept header gets raw audio."""
+        accept = request.headers.get("accept", "").lower()
+        return str(payload.get("stream", "")).lower() in ("1", "true") or accept.startswith("audio/")
+
+    def _audio(self, text):
+        audio = self.fixtures["tts"].get("audio", {})
+        return silent_mp3(max(audio.get("min_frames", 1), len(text) * audio.get("frames_per_char", 1)))
+
+    def _stt_stream(self, request):
+        """Streaming STT: partial transcripts per chunk, the full one on ``final``."""
+        query = dict(parse_qsl(urlsplit(request.url).query))
+        body = self._pick(self.fixtures["stt"], "")["body"]
+        words = body["text"].split()
+        if query.get("final"):
+            self.stt_sessions.pop(query["session"], None)
+            return {"text": body["text"], "final": True, "confidence": body.get("confidence", 0.95),
+                    "language": body.get("language", "en"), "session": query["session"]}
+        received = self.stt_sessions.get(query["session"], 0) + len(request.post_data_buffer or b"")
+        self.stt_sessions[query["session"]] = received
+        return {"text": " ".join(words[:received // STT_BYTES_PER_WORD]), "final": False, "confidence": 0.6,
+                "language": body.get("language", "en"), "seq": int(query.get("seq", 0)), "session": query["session"]}
+
+    def _pick(self, fixture, text):
+        text = text.lower()
+        for response in fixture["responses"]:
+            match = response.get("match")
+            if not match or any(m.lower() in text for m in match):
+                return response
+        return fixture["responses"][-1]
+
+    def _body(self, name, payload):
+        fixture = self.fixtures[name]
+        now = datetime.now(timezone.utc).isoformat()
+        if name == "chat" and isinstance(payload.get("batch"), list):
+            # Offline queue replay: one reply per queued message, in order
+            return {"results": [
+                {"key": item.get("key"), "sessionId": item.get("sessionId"), "timestamp": now,
+                 **self._pick(fixture, str(item.get("message", "")))["body"]}
+                for item in payload["batch"]
+            ]}
+        if name == "chat":
+            messages = payload.get("messages") or []
+            text = payload.get("message") or (messages[-1].get("content", "") if messages else "")
+            body = dict(self._pick(fixture, str(text))["body"])
+            body.setdefault("sessionId", payload.get("sessionId"))
+        elif name == "tts":
+            text = str(payload.get("text", ""))
+            body = dict(self._pick(fixture, text)["body"])
+            mp3 = self._audio(text)
+            body.update({
+                "audioUrl": f"data:audio/{body.get('format', 'mp3')};base64,{base64.b64encode(mp3).decode()}",
+                "voice_id": payload.get("voice_id", body.get("voice_id")),
+                "text": text[:100] + ("..." if len(text) > 100 else ""),
+                "size": len(mp3),
+            })
+        else:
+            body = dict(self._pick(fixture, json.dumps(payload))["body"])
+        body.setdefault("timestamp", now)
+        return body
+
+    async def handle(self, route):
+        request = route.request
+        name = ROUTE_PATTERN.search(urlsplit(request.url).path).group(1)
+        if request.method == "OPTIONS":
+            await route.fulfill(status=204, headers={
+                "Access-Control-Allow-Origin": "*",
+                "Access-Control-Allow-Methods": "GET,POST,OPTIONS",
+                "Access-Control-Allow-Headers": "Content-Type,Authorization",
+            })
+            return
+
+        delay = self.latency[name].next_delay()
+        if delay:
+            await asyncio.sleep(delay)
+        payload = self._request_json(request)
+        self.calls.append({"route": name, "method": request.method, "delay_ms": round(delay * 1000, 1)})
+        if name == "tts" and self._streaming(request, payload):
+            await route.fulfill(status=200, content_type="audio/mpeg",
+                                headers={"Access-Control-Allow-Origin": "*", "Cache-Control": "no-store"},
+                                body=self._audio(str(payload.get("text", ""))))
+            return
+        if name == "stt" and "session=" in urlsplit(request.url).query:
+            await route.fulfill(status=200, headers={"Access-Control-Allow-Origin": "*"},
+                                content_type="application/json", body=json.dumps(self._stt_stream(request)))
+            return
+        await route.fulfill(
+            status=self.fixtures[name].get("status", 200),
+            headers={"Access-Control-Allow-Origin": "*"},
+            content_type="application/json",
+            body=json.dumps(self._body(name, payload)),
+        )
+
+
+async def install_stubs(context, latency=None, fixtures_dir=FIXTURES_DIR):
+    """Route the widget's /api calls in ``context`` to the fixture store."""
+    return await BackendStubs(latency, fixtures_dir).install(context)
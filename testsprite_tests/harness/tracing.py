@@ -0,0 +1,366 @@
+"""Timed spans for every Playwright action, exported as Chrome trace JSON.
+
+Pass/fail says nothing about where a slow scenario spent its time. While a
+``Tracer`` is active, ``Locator.click``, ``Locator.fill``, ``Page.goto`` and
+``Page.expect_response`` each record a span carrying:
+
+* the intent: the scenario's comment above the call, or the call itself,
+* the selector, URL or response predicate it acted on,
+* the network requests started while it ran,
+* main-thread time: the renderer's ``TaskDuration`` over the span, with
+  script, layout and style broken out (CDP ``Performance.getMetrics``).
+
+Requests are traced on their own tracks for the whole life of the context,
+so an ``/api/chat`` or ``/api/tts`` call shows up even while the scenario is
+only waiting for it. Each scenario's trace is written to
+``tmp/traces/<TC>.trace.json``, which opens in ``chrome://tracing`` or
+https://ui.perfetto.dev, and a breakdown is printed: time in actions, main
+thread, and with each /api route in flight.
+
+Usage (from testsprite_tests/)::
+
+    python -m harness.tracing TC002
+    ODIADEV_STUB_BACKEND=1 python -m harness.tracing TC002 TC009 --output tmp/traces
+"""
+import argparse
+import asyncio
+import contextvars
+import functools
+import json
+import linecache
+import sys
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from playwright import async_api
+
+from harness.browser import launch_browser, observe_contexts
+from harness.runner import discover_scenarios, run_scenario, scenario_id
+from harness.waits import TRACKED_API
+
+SUITE_DIR = Path(__file__).resolve().parent.parent
+TRACE_DIR = SUITE_DIR / "tmp" / "traces"
+
+# Frames from these packages are skipped when looking for the scenario line
+_SKIPPED_FRAMES = (str(Path(__file__).resolve().parent), str(Path(async_api.__file__).resolve().parent.parent))
+
+MAIN_THREAD_METRICS = {
+    "TaskDuration": "main_thread_ms",
+    "ScriptDuration": "script_ms",
+    "LayoutDuration": "layout_ms",
+    "RecalcStyleDuration": "style_ms",
+}
+API_ROUTES = ("api/chat", "api/tts", "api/stt", "api/events")
+ACTIONS_TID = 1
+
+_active = contextvars.ContextVar("active_tracer", default=None)
+_installed = False
+
+
+def start_trace(name):
+    """Trace the Playwright actions of the current task; return the ``Tracer``."""
+    install()
+    tracer = Tracer(name)
+    _active.set(tracer)
+    observe_contexts(tracer)
+    return tracer
+
+
+def install():
+    """Wrap the traced Playwright methods; they call straight through when no tracer is active."""
+    global _installed
+    if _installed:
+        return
+    async_api.Locator.click = _traced_locator("click", async_api.Locator.click)
+    async_api.Locator.fill = _traced_locator("fill", async_api.Locator.fill)
+    async_api.Page.goto = _traced_goto(async_api.Page.goto)
+    async_api.Page.expect_response = _traced_expect_response(async_api.Page.expect_response)
+    _installed = True
+
+
+def _call_site():
+    """The frame of the scenario line that made the traced call."""
+    frame = outer = sys._getframe(2)
+    while frame and frame.f_code.co_filename.startswith(_SKIPPED_FRAMES):
+        frame = frame.f_back
+    return frame or outer
+
+
+def intent_of(frame):
+    """The comment block just above the line ``frame`` is on, else that line.
+
+    The generated scenarios put the step's comment above a ``frame = ...`` /
+    ``elem = ...`` pair, so up to two plain statements are skipped on the way.
+    """
+    filename, lineno = frame.f_code.co_filename, frame.f_lineno
+    comments = []
+    statements = 0
+    for number in range(lineno - 1, max(0, lineno - 8), -1):
+        text = linecache.getline(filename, number).strip()
+        if text.startswith("#"):
+            comments.insert(0, text.lstrip("# "))
+        elif comments or not text or statements == 2:
+            break
+        else:
+            statements += 1
+    return " ".join(comments) or linecache.getline(filename, lineno).strip()
+
+
+def _selector(locator):
+    return getattr(getattr(locator, "_impl_obj", None), "_selector", None) or repr(locator)
+
+
+def _short_url(url):
+    parts = urlsplit(url)
+    if parts.scheme == "data":
+        return url[:40] + "..."
+    return parts.path + (f"?{parts.query}" if parts.query else "")
+
+
+def _traced_locator(kind, method):
+    @functools.wraps(method)
+    async def traced(self, *args, **kwargs):
+        tracer = _active.get()
+        if tracer is None:
+            return await method(self, *args, **kwargs)
+        async with tracer.span(kind, self.page, _selector(self), intent_of(_call_site())):
+            return await method(self, *args, **kwargs)
+    return traced
+
+
+def _traced_goto(method):
+    @functools.wraps(method)
+    async def traced(self, url, *args, **kwargs):
+        tracer = _active.get()
+        if tracer is None:
+            return await method(self, url, *args, **kwargs)
+        async with tracer.span("goto", self, url, intent_of(_call_site())):
+            return await method(self, url, *args, **kwargs)
+    return traced
+
+
+def _traced_expect_response(method):
+    @functools.wraps(method)
+    def traced(self, url_or_predicate, *args, **kwargs):
+        manager = method(self, url_or_predicate, *args, **kwargs)
+        tracer = _active.get()
+        if tracer is None:
+            return manager
+        target = url_or_predicate if isinstance(url_or_predicate, str) else \
+            getattr(url_or_predicate, "pattern", None) or "<predicate>"
+        return _TracedExpectation(manager, tracer.span("expect_response", self, target, intent_of(_call_site())))
+    return traced
+
+
+class _TracedExpectation:
+    """``expect_response`` whose span runs from entering the block until the response arrived."""
+
+    def __init__(self, manager, span):
+        self.manager = manager
+        self.span = span
+
+    async def __aenter__(self):
+        await self.span.__aenter__()
+        return await self.manager.__aenter__()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        try:
+            suppress = await self.manager.__aexit__(exc_type, exc, tb)
+        except BaseException as error:
+            await self.span.__aexit__(type(error), error, error.__traceback__)
+            raise
+        await self.span.__aexit__(exc_type, exc, tb)
+        return suppress
+
+
+def _covered_ms(intervals):
+    """Wall time covered by the union of ``(start, end)`` intervals in microseconds, in ms."""
+    covered, reach = 0.0, None
+    for start, end in sorted(intervals):
+        if reach is None or start > reach:
+            covered += end - start
+            reach = end
+        elif end > reach:
+            covered += end - reach
+            reach = end
+    return covered / 1000
+
+
+class Tracer:
+    """Spans and requests of one scenario; also a ``browser_context`` observer."""
+
+    def __init__(self, name):
+        self.name = name
+        self.origin = time.perf_counter()
+        self.finished = None
+        self.spans = []
+        self.requests = []
+        self._pending = {}
+        self._sessions = {}
+
+    def _now(self):
+        """Microseconds since the trace started."""
+        return (time.perf_counter() - self.origin) * 1e6
+
+    async def attach(self, context):
+        context.on("request", self._on_request)
+        context.on("requestfinished", lambda request: self._on_request_done(request, False))
+        context.on("requestfailed", lambda request: self._on_request_done(request, True))
+
+    async def detach(self, context):
+        for page in context.pages:
+            session = self._sessions.pop(page, None)
+            if session:
+                try:
+                    await session.detach()
+                except async_api.Error:
+                    pass
+
+    def _on_request(self, request):
+        match = TRACKED_API.search(request.url)
+        record = {"method": request.method, "url": _short_url(request.url),
+                  "route": f"api/{match.group(1)}" if match else "other",
+                  "start": self._now(), "end": None, "failed": False}
+        self._pending[request] = record
+        self.requests.append(record)
+
+    def _on_request_done(self, request, failed):
+        record = self._pending.pop(request, None)
+        if record:
+            record["end"] = self._now()
+            record["failed"] = failed
+
+    async def _main_thread(self, page):
+        """Cumulative main-thread times of ``page``'s renderer in ms; empty if unavailable."""
+        if page is None or page.is_closed():
+            return {}
+        try:
+            session = self._sessions.get(page)
+            if session is None:
+                session = await page.context.new_cdp_session(page)
+                await session.send("Performance.enable")
+                self._sessions[page] = session
+            metrics = (await session.send("Performance.getMetrics"))["metrics"]
+        except async_api.Error:
+            return {}
+        return {MAIN_THREAD_METRICS[m["name"]]: m["value"] * 1000
+                for m in metrics if m["name"] in MAIN_THREAD_METRICS}
+
+    @asynccontextmanager
+    async def span(self, kind, page, target, intent):
+        before = await self._main_thread(page)
+        span = {"kind": kind, "intent": intent, "target": target, "start": self._now()}
+        first_request = len(self.requests)
+        try:
+            yield span
+        except BaseException as error:
+            span["error"] = "".join(str(error).splitlines()[:1]) or type(error).__name__
+            raise
+        finally:
+            span["end"] = self._now()
+            after = await self._main_thread(page)
+            # A cross-site navigation swaps the renderer and restarts its counters
+            span["main_thread"] = {name: round(max(0.0, value - before.get(name, 0.0)), 1)
+                                   for name, value in after.items()}
+            span["requests"] = [f"{r['method']} {r['url']}" for r in self.requests[first_request:]
+                                if r["start"] <= span["end"]]
+            self.spans.append(span)
+
+    def finish(self):
+        self.finished = self._now()
+
+    def chrome_trace(self, outcome=None):
+        """The trace as Chrome trace-event JSON (actions as complete events, requests as async ones)."""
+        end = self.finished or self._now()
+        tracks = {"actions": ACTIONS_TID}
+        for record in self.requests:
+            tracks.setdefault(record["route"], len(tracks) + 1)
+        events = [{"ph": "M", "name": "process_name", "pid": 1, "tid": 0, "args": {"name": self.name}}]
+        events += [{"ph": "M", "name": "thread_name", "pid": 1, "tid": tid, "args": {"name": name}}
+                   for name, tid in tracks.items()]
+        for span in self.spans:
+            args = {"intent": span["intent"], "target": span["target"], "requests": span["requests"],
+                    **span["main_thread"]}
+            if "error" in span:
+                args["error"] = span["error"]
+            events.append({"ph": "X", "cat": "action", "name": f"{span['kind']}: {span['intent'][:60]}",
+                           "pid": 1, "tid": ACTIONS_TID, "ts": round(span["start"], 1),
+                           "dur": round(span["end"] - span["start"], 1), "args": args})
+        for i, record in enumerate(self.requests):
+            common = {"cat": "network", "name": f"{record['method']} {record['url']}", "id": i,
+                      "pid": 1, "tid": tracks[record["route"]]}
+            finished = record["end"] if record["end"] is not None else end
+            events.append({**common, "ph": "b", "ts": round(record["start"], 1)})
+            events.append({**common, "ph": "e", "ts": round(finished, 1),
+                           "args": {"failed": record["failed"], "unfinished": record["end"] is None}})
+        return {"traceEvents": events, "displayTimeUnit": "ms",
+                "otherData": {"scenario": self.name, **({"status": outcome["status"], "error": outcome["error"]}
+                                                        if outcome else {})}}
+
+    def breakdown(self):
+        """Where the scenario's wall time went, in ms."""
+        end = self.finished or self._now()
+        spans = [(s["start"], s["end"]) for s in self.spans]
+        # Nested spans (a click inside expect_response) would count main-thread time twice
+        outer = [s for s in self.spans
+                 if not any(o is not s and o["start"] <= s["start"] and s["end"] <= o["end"] for o in self.spans)]
+        result = {"total_ms": end / 1000, "actions_ms": _covered_ms(spans),
+                  "main_thread_ms": sum(s["main_thread"].get("main_thread_ms", 0.0) for s in outer)}
+        for route in API_ROUTES:
+            intervals = [(r["start"], r["end"] if r["end"] is not None else end)
+                         for r in self.requests if r["route"] == route]
+            if intervals:
+                result[f"{route}_ms"] = _covered_ms(intervals)
+        return result
+
+
+def print_breakdown(tracer, slowest=5):
+    parts = tracer.breakdown()
+    routes = ", ".join(f"/{route} {parts[f'{route}_ms'] / 1000:.1f}s" for route in API_ROUTES if f"{route}_ms" in parts)
+    print(f"{tracer.name}  {parts['total_ms'] / 1000:.1f}s total: actions {parts['actions_ms'] / 1000:.1f}s "
+          f"(main thread {parts['main_thread_ms'] / 1000:.2f}s); in flight: {routes or 'no /api calls'}")
+    for span in sorted(tracer.spans, key=lambda s: s["start"] - s["end"])[:slowest]:
+        print(f"  {(span['end'] - span['start']) / 1000:8.0f} ms  {span['kind']:15} {span['intent'][:70]}")
+
+
+async def _traced_run(path, browser):
+    tracer = start_trace(scenario_id(path))
+    outcome = await run_scenario(path, browser, asyncio.Semaphore(1))
+    tracer.finish()
+    return tracer, outcome
+
+
+async def trace_scenarios(paths, output_dir, headless=True):
+    output_dir.mkdir(parents=True, exist_ok=True)
+    async with async_api.async_playwright() as pw:
+        browser = await launch_browser(pw, shared=True, headless=headless)
+        try:
+            for path in paths:
+                # Its own task, so the tracer does not leak into the next scenario
+                tracer, outcome = await asyncio.create_task(_traced_run(path, browser))
+                with open(output_dir / f"{tracer.name}.trace.json", "w", encoding="utf-8") as f:
+                    json.dump(tracer.chrome_trace(outcome), f)
+                print_breakdown(tracer)
+        finally:
+            await browser.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("tests", nargs="*", help="scenario id prefixes to trace (e.g. TC002)")
+    parser.add_argument("--output", default=str(TRACE_DIR), help="trace directory (default: tmp/traces)")
+    parser.add_argument("--headed", action="store_true", help="show the browser window")
+    args = parser.parse_args(argv)
+
+    paths = discover_scenarios(args.tests)
+    if not paths:
+        parser.error("no scenarios matched")
+    asyncio.run(trace_scenarios(paths, Path(args.output), headless=not args.headed))
+    print(f"\ntraces in {args.output}; open them in chrome://tracing or https://ui.perfetto.dev")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
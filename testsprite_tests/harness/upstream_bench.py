@@ -0,0 +1,210 @@
+"""Benchmark the API's upstream connection reuse against local stand-ins.
+
+Starts one stand-in upstream that answers the n8n webhook and the Render
+brain routes, counting the TCP connections it accepts. It then drives
+``/api/chat``, ``/api/events`` and ``/api/brain/qualify`` on a local API
+server that points at it. The report shows per-endpoint latency, the
+number of upstream connections opened per request and, with ``--api-pid``,
+the CPU seconds the API process used.
+
+Run it once with pooling on and once with ``UPSTREAM_KEEP_ALIVE=0`` and
+compare the two ``--output`` files. Start the API with the stand-in as its
+upstream, e.g.::
+
+    N8N_WEBHOOK_URL=http://localhost:9240/webhook BRAIN_BASE_URL=http://localhost:9240 vercel dev
+
+Pass ``--tls-cert``/``--tls-key`` to serve the stand-in over HTTPS, which
+is where handshakes really cost (start the API with
+``NODE_TLS_REJECT_UNAUTHORIZED=0`` for a self-signed certificate).
+
+Usage (from testsprite_tests/)::
+
+    python -m harness.upstream_bench --requests 2000 --concurrency 32 --api-pid 12345
+"""
+import argparse
+import asyncio
+import json
+import os
+import ssl
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from harness.loadgen import EndpointStats, HttpConnection
+
+OUTPUT_PATH = Path(__file__).resolve().parent.parent / "tmp" / "upstream_bench.json"
+DEFAULT_UPSTREAM_PORT = 9240
+DEFAULT_BASE_URL = "http://localhost:3000"  # vercel dev; the mock dev server has no upstreams
+
+ENDPOINTS = {
+    "chat": ("/api/chat", {"message": "How much does the voice agent cost?", "sessionId": "bench"}),
+    "events": ("/api/events", {"type": "bench", "sessionId": "bench"}),
+    "qualify": ("/api/brain/qualify", {"name": "Ada", "email": "ada@example.com",
+                                       "message": "We need a WhatsApp voice agent", "source": "website"}),
+}
+
+UPSTREAM_REPLIES = {
+    "/api/qualify": {"qualified": True, "score": 72, "notes": "stand-in"},
+    "/api/summarize": {"summary": "stand-in summary"},
+}
+
+
+class StandInUpstream(ThreadingHTTPServer):
+    """Keep-alive HTTP/1.1 server that counts connections and requests."""
+
+    daemon_threads = True
+
+    def __init__(self, port, latency_ms=0.0, tls=None):
+        super().__init__(("127.0.0.1", port), _StandInHandler)
+        self.latency = latency_ms / 1000
+        self.connections = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+        if tls:
+            context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+            context.load_cert_chain(*tls)
+            self.socket = context.wrap_socket(self.socket, server_side=True)
+
+    def count(self, field):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def snapshot(self):
+        with self._lock:
+            return {"connections": self.connections, "requests": self.requests}
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.server.count("connections")
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self.server.count("requests")
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        body = json.dumps(UPSTREAM_REPLIES.get(self.path, {"ok": True, "reply": "stand-in reply"})).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def process_cpu_seconds(pid):
+    """User + system CPU seconds of ``pid`` and its descendants (None if unknown)."""
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+
+    if psutil is not None:
+        try:
+            root = psutil.Process(pid)
+            return sum(sum(p.cpu_times()[:2]) for p in [root] + root.children(recursive=True))
+        except psutil.Error:
+            return None
+
+    try:
+        with open(f"/proc/{pid}/stat", encoding="ascii") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+    except OSError:
+        return None
+    # utime, stime, cutime, cstime (fields 14-17, counted after the command name)
+    return sum(int(v) for v in fields[11:15]) / os.sysconf("SC_CLK_TCK")
+
+
+async def drive(base_url, endpoints, requests, concurrency):
+    stats = {name: EndpointStats() for name in endpoints}
+    queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(endpoints[i % len(endpoints)])
+
+    async def worker():
+        conn = HttpConnection(base_url)
+        try:
+            while not queue.empty():
+                name = queue.get_nowait()
+                path, body = ENDPOINTS[name]
+                started = time.perf_counter()
+                try:
+                    status, _, _ = await conn.request("POST", path, body)
+                except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+                    status = "error"
+                stats[name].record(status, time.perf_counter() - started)
+        finally:
+            await conn.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return stats, time.perf_counter() - started
+
+
+def run(args):
+    tls = (args.tls_cert, args.tls_key) if args.tls_cert else None
+    upstream = StandInUpstream(args.upstream_port, args.upstream_latency_ms, tls)
+    threading.Thread(target=upstream.serve_forever, daemon=True).start()
+    try:
+        cpu_before = process_cpu_seconds(args.api_pid) if args.api_pid else None
+        stats, elapsed = asyncio.run(drive(args.base_url, args.endpoints, args.requests, args.concurrency))
+        cpu_after = process_cpu_seconds(args.api_pid) if args.api_pid else None
+        counts = upstream.snapshot()
+    finally:
+        upstream.shutdown()
+        upstream.server_close()
+
+    return {
+        "config": {k: v for k, v in vars(args).items() if k not in ("output",)},
+        "elapsed_s": round(elapsed, 3),
+        "upstream": {**counts, "connections_per_request": round(counts["connections"] / counts["requests"], 4)
+                     if counts["requests"] else None},
+        "api_cpu_s": round(cpu_after - cpu_before, 3) if cpu_before is not None and cpu_after is not None else None,
+        "endpoints": {name: s.export(elapsed) for name, s in stats.items()},
+    }
+
+
+def print_results(results):
+    upstream = results["upstream"]
+    print(f"upstream: {upstream['requests']} requests over {upstream['connections']} connections "
+          f"({upstream['connections_per_request']} per request)")
+    if results["api_cpu_s"] is not None:
+        print(f"api cpu:  {results['api_cpu_s']} s")
+    print(f"{'endpoint':10} {'req':>6} {'err%':>6} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8}")
+    for name, e in results["endpoints"].items():
+        cells = ["-" if e["latency"][k] is None else f"{e['latency'][k]:.1f}" for k in ("p50_ms", "p90_ms", "p99_ms")]
+        print(f"{name:10} {e['requests']:>6} {e['error_rate'] * 100:>6.1f} {cells[0]:>8} {cells[1]:>8} {cells[2]:>8}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL, help="API server (default: %(default)s)")
+    parser.add_argument("--endpoints", nargs="+", choices=sorted(ENDPOINTS), default=list(ENDPOINTS))
+    parser.add_argument("--requests", type=int, default=1000, help="total API requests (default: %(default)s)")
+    parser.add_argument("--concurrency", type=int, default=16, help="API requests in flight (default: %(default)s)")
+    parser.add_argument("--upstream-port", type=int, default=DEFAULT_UPSTREAM_PORT)
+    parser.add_argument("--upstream-latency-ms", type=float, default=5.0,
+                        help="stand-in processing time per request (default: %(default)s)")
+    parser.add_argument("--tls-cert", help="serve the stand-in over HTTPS with this certificate")
+    parser.add_argument("--tls-key", help="private key for --tls-cert")
+    parser.add_argument("--api-pid", type=int, help="API server process to measure CPU time of")
+    parser.add_argument("--output", default=str(OUTPUT_PATH), help="where to write the JSON report")
+    args = parser.parse_args(argv)
+
+    results = run(args)
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print_results(results)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
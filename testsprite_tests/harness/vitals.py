@@ -0,0 +1,188 @@
+"""Core Web Vitals across repeated page loads, reported as percentiles.
+
+A single cold ``page.goto`` is too noisy to gate a release on. This mode
+loads each target N times, every time in a fresh context on one shared
+browser, and reports p50/p90/p99 for:
+
+* TTFB  ``responseStart`` of the navigation entry,
+* FCP   ``first-contentful-paint``,
+* LCP   the last ``largest-contentful-paint`` entry before input,
+* CLS   the largest session window of ``layout-shift`` without recent input,
+* INP   the slowest ``event`` entry with an ``interactionId``.
+
+The observers are injected with ``add_init_script`` so they see the whole
+page lifetime. Targets are Home, Pricing and opening the chat widget (the
+only one with an interaction, so the only one reporting INP).
+
+Usage (from testsprite_tests/, with the app on localhost:5174)::
+
+    python -m harness.vitals --runs 20
+    python -m harness.vitals --runs 50 --targets widget_open --output tmp/vitals-widget.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+from pathlib import Path
+
+from playwright import async_api
+
+from harness.browser import browser_context, launch_browser
+
+BASE_URL = os.environ.get("ODIADEV_BASE_URL", "http://localhost:5174")
+OUTPUT_PATH = Path(__file__).resolve().parent.parent / "tmp" / "vitals.json"
+METRICS = ("ttfb", "fcp", "lcp", "cls", "inp")
+PERCENTILES = (50, 90, 99)
+
+# Upper bounds of Google's "good" range, checked against p90 with --gate.
+THRESHOLDS = {"ttfb": 800, "fcp": 1800, "lcp": 2500, "cls": 0.1, "inp": 200}
+
+VITALS_OBSERVER = """
+(() => {
+  const vitals = window.__odiadevVitals = { ttfb: null, fcp: null, lcp: null, cls: 0, inp: null }
+  const observe = (type, callback, options = {}) => {
+    try {
+      new PerformanceObserver(list => list.getEntries().forEach(callback))
+        .observe({ type, buffered: true, ...options })
+    } catch (e) { /* entry type unsupported */ }
+  }
+  observe('navigation', e => { vitals.ttfb = e.responseStart })
+  observe('paint', e => { if (e.name === 'first-contentful-paint') vitals.fcp = e.startTime })
+  observe('largest-contentful-paint', e => { vitals.lcp = e.renderTime || e.loadTime || e.startTime })
+  let windowValue = 0, windowStart = 0, windowLast = 0
+  observe('layout-shift', e => {
+    if (e.hadRecentInput) return
+    if (e.startTime - windowLast > 1000 || e.startTime - windowStart > 5000) {
+      windowValue = 0
+      windowStart = e.startTime
+    }
+    windowValue += e.value
+    windowLast = e.startTime
+    vitals.cls = Math.max(vitals.cls, windowValue)
+  })
+  observe('event', e => {
+    if (e.interactionId) vitals.inp = Math.max(vitals.inp || 0, e.duration)
+  }, { durationThreshold: 16 })
+})()
+"""
+
+
+async def _load(page, path):
+    await page.goto(BASE_URL + path, wait_until="load", timeout=15000)
+    try:
+        await page.wait_for_load_state("networkidle", timeout=5000)
+    except async_api.Error:
+        pass
+
+
+async def home(page):
+    await _load(page, "/")
+
+
+async def pricing(page):
+    await _load(page, "/pricing")
+
+
+async def widget_open(page):
+    await _load(page, "/")
+    await page.locator("button.fixed.rounded-full").first.click()
+    await page.locator('input[placeholder="Type your message..."]').first.wait_for(state="visible")
+    # Event timing entries are delivered after the next frame is presented.
+    await page.evaluate("new Promise(r => requestAnimationFrame(() => requestAnimationFrame(r)))")
+
+
+TARGETS = {"home": home, "pricing": pricing, "widget_open": widget_open}
+
+
+async def sample(browser, target):
+    """One fresh-context run of ``target``; returns its vitals dict."""
+    async with browser_context(browser) as context:
+        await context.add_init_script(VITALS_OBSERVER)
+        page = await context.new_page()
+        await TARGETS[target](page)
+        return await page.evaluate("({ ...window.__odiadevVitals })")
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of ``values`` (None when empty)."""
+    values = sorted(v for v in values if v is not None)
+    if not values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(values)))
+    return values[rank - 1]
+
+
+def summarize(samples):
+    summary = {}
+    for metric in METRICS:
+        values = [s.get(metric) for s in samples]
+        present = [v for v in values if v is not None]
+        summary[metric] = {f"p{p}": percentile(present, p) for p in PERCENTILES}
+        summary[metric]["n"] = len(present)
+    return summary
+
+
+async def collect(targets, runs, concurrency=1, headless=True):
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    async with async_api.async_playwright() as pw:
+        browser = await launch_browser(pw, shared=True, headless=headless)
+        try:
+            async def bounded(target):
+                async with semaphore:
+                    return await sample(browser, target)
+
+            results = {}
+            for target in targets:
+                samples = await asyncio.gather(*(bounded(target) for _ in range(runs)))
+                results[target] = {"runs": runs, "samples": samples, "summary": summarize(samples)}
+            return results
+        finally:
+            await browser.close()
+
+
+def gate(results, thresholds=THRESHOLDS):
+    """p90 values over their threshold, as human-readable strings."""
+    problems = []
+    for target, result in results.items():
+        for metric, limit in thresholds.items():
+            value = result["summary"][metric]["p90"]
+            if value is not None and value > limit:
+                problems.append(f"{target} {metric} p90 {value:.3g} > {limit}")
+    return problems
+
+
+def print_summary(results):
+    print(f"{'target':12} {'metric':6} {'p50':>9} {'p90':>9} {'p99':>9} {'n':>4}")
+    for target, result in results.items():
+        for metric in METRICS:
+            row = result["summary"][metric]
+            cells = ["-" if row[f"p{p}"] is None else f"{row[f'p{p}']:.3g}" for p in PERCENTILES]
+            print(f"{target:12} {metric:6} {cells[0]:>9} {cells[1]:>9} {cells[2]:>9} {row['n']:>4}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10, help="page loads per target (default: %(default)s)")
+    parser.add_argument("--targets", nargs="+", choices=sorted(TARGETS), default=list(TARGETS))
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="loads in flight at once; above 1 trades accuracy for speed")
+    parser.add_argument("--output", default=str(OUTPUT_PATH), help="where to write samples and percentiles")
+    parser.add_argument("--gate", action="store_true", help="exit non-zero when a p90 misses its threshold")
+    parser.add_argument("--headed", action="store_true", help="show the browser window")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(collect(args.targets, args.runs, args.concurrency, headless=not args.headed))
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print_summary(results)
+
+    problems = gate(results) if args.gate else []
+    for problem in problems:
+        print(f"FAIL  {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
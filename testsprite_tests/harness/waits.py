@@ -0,0 +1,173 @@
+"""Event-driven waits for the TC scenarios.
+
+The generated scenarios slept a fixed three seconds before every click and
+fill. ``WaitEngine`` replaces that with waits that return as soon as the
+widget is actually ready:
+
+* the target locator is visible (Playwright then checks the rest of its
+  actionability rules inside ``click``/``fill`` itself),
+* no ``/api/chat``, ``/api/tts``, ``/api/stt`` or ``/api/events`` request
+  started by the page is still in flight (streams are not waited on: an
+  SSE reply or streamed audio stays open as long as it is being consumed),
+* or, for ``mutation``, the DOM under a selector has changed.
+
+Every step records how long it spent waiting versus acting, so a scenario's
+time can be attributed step by step. When the runner is driving the suite
+the records are collected per scenario via ``collect_timings``.
+"""
+import asyncio
+import contextvars
+import re
+import sys
+import time
+
+from playwright import async_api
+
+TRACKED_API = re.compile(r"/api/(chat|tts|stt|events)\b")
+STREAM_QUERY = re.compile(r"[?&]stream=(1|true)\b")
+
+# Default per-action ceilings in milliseconds. Steps that wait on a model
+# reply or speech synthesis pass a larger ``timeout`` of their own.
+STEP_TIMEOUTS = {
+    "click": 5000,
+    "fill": 5000,
+    "mutation": 3000,
+    "settle": 10000,
+}
+
+_recorder = contextvars.ContextVar("wait_recorder", default=None)
+
+
+def collect_timings():
+    """Start collecting step timings for the current task; return the list."""
+    records = []
+    _recorder.set(records)
+    return records
+
+
+class WaitEngine:
+    """Readiness waits bound to one browser context."""
+
+    def __init__(self, context):
+        self.context = context
+        self.records = []
+        self._in_flight = set()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        context.on("request", self._on_request)
+        context.on("requestfinished", self._on_request_done)
+        context.on("requestfailed", self._on_request_done)
+        context.on("response", self._on_response)
+
+    def _on_request(self, request):
+        if TRACKED_API.search(request.url) and not self._is_stream(request):
+            self._in_flight.add(request)
+            self._idle.clear()
+
+    @staticmethod
+    def _is_stream(request):
+        return "text/event-stream" in request.headers.get("accept", "") or bool(STREAM_QUERY.search(request.url))
+
+    def _on_response(self, response):
+        # A server may stream even when the request did not ask in a way we can see
+        if response.headers.get("content-type", "").startswith("text/event-stream"):
+            self._on_request_done(response.request)
+
+    def _on_request_done(self, request):
+        self._in_flight.discard(request)
+        if not self._in_flight:
+            self._idle.set()
+
+    def _record(self, step, action, waited, acted, outcome="ok"):
+        record = {
+            "step": step,
+            "action": action,
+            "waited_ms": round(waited * 1000, 1),
+            "acted_ms": round(acted * 1000, 1),
+            "outcome": outcome,
+        }
+        self.records.append(record)
+        collected = _recorder.get()
+        if collected is not None:
+            collected.append(record)
+
+    async def settle(self, timeout=None, step="settle"):
+        """Wait until no tracked /api request is in flight.
+
+        Returns False when the timeout expires first, after recording the
+        timeout and naming the requests still open; an API call that never
+        completes should fail the step that depends on it, not here.
+        """
+        if self._idle.is_set():
+            return True
+        timeout = STEP_TIMEOUTS["settle"] if timeout is None else timeout
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout / 1000)
+            return True
+        except asyncio.TimeoutError:
+            self._record(step, "settle", time.perf_counter() - started, 0.0, "timeout")
+            pending = ", ".join(sorted(request.url for request in self._in_flight))
+            print(f"[waits] {step}: still waiting on {pending} after {timeout} ms", file=sys.stderr)
+            return False
+
+    async def _ready(self, step, locator, timeout):
+        # Settling and visibility share the step's own timeout
+        started = time.perf_counter()
+        await self.settle(timeout, step)
+        remaining = max(1, timeout - (time.perf_counter() - started) * 1000)
+        await locator.wait_for(state="visible", timeout=remaining)
+
+    async def _act(self, step, action, locator, timeout, perform):
+        timeout = STEP_TIMEOUTS[action] if timeout is None else timeout
+        started = time.perf_counter()
+        try:
+            await self._ready(step, locator, timeout)
+        except async_api.Error:
+            self._record(step, action, time.perf_counter() - started, 0.0, "timeout")
+            raise
+        ready = time.perf_counter()
+        try:
+            await perform(timeout)
+        except async_api.Error:
+            self._record(step, action, ready - started, time.perf_counter() - ready, "error")
+            raise
+        self._record(step, action, ready - started, time.perf_counter() - ready)
+
+    async def click(self, locator, step="", timeout=None):
+        await self._act(step, "click", locator, timeout,
+                        lambda t: locator.click(timeout=t))
+
+    async def fill(self, locator, value, step="", timeout=None):
+        await self._act(step, "fill", locator, timeout,
+                        lambda t: locator.fill(value, timeout=t))
+
+    async def mutation(self, page, step="", selector="body", timeout=None, since=None):
+        """Wait for the next DOM change under ``selector``.
+
+        ``since`` is the target's text as the caller last read it; if the
+        text already differs, the change landed before the observer was
+        attached and the wait returns at once instead of missing it.
+
+        Returns False (and records a timeout) if nothing changed in time; the
+        caller's assertions decide whether that matters.
+        """
+        timeout = STEP_TIMEOUTS["mutation"] if timeout is None else timeout
+        started = time.perf_counter()
+        changed = await page.evaluate(
+            """([selector, timeout, since]) => new Promise(resolve => {
+                const target = document.querySelector(selector) || document.body
+                if (since !== null && target.innerText !== since) return resolve(true)
+                const timer = setTimeout(() => { observer.disconnect(); resolve(false) }, timeout)
+                const observer = new MutationObserver(() => {
+                    clearTimeout(timer); observer.disconnect(); resolve(true)
+                })
+                observer.observe(target, { childList: true, subtree: true, characterData: true, attributes: true })
+            })""",
+            [selector, timeout, since],
+        )
+        self._record(step, "mutation", time.perf_counter() - started, 0.0, "ok" if changed else "timeout")
+        return changed
+
+    def total_waited_ms(self):
+        return round(sum(r["waited_ms"] for r in self.records), 1)
@@ -1,15 +1,91 @@
-import { defineConfig } from 'vite'
+import { createHash } from 'node:crypto'
+import fs from 'node:fs'
+import path from 'node:path'
+import { defineConfig, type Plugin, type Rollup } from 'vite'
 import react from '@vitejs/plugin-react'
 
+const PRECACHE_EXTENSIONS = /\.(js|css|html|webmanifest|svg|png|jpe?g|webp|woff2?)$/
+
+// Fills self.__PRECACHE_MANIFEST in dist/sw.js with the files this build
+// emitted (hashed chunks, index.html as "/", icons and avatars from public/).
+// The version is a hash of their contents, so a deploy that changes any of
+// them ships a new worker, which installs a fresh precache and drops the old.
+function precacheManifest(): Plugin {
+  let outDir = 'dist'
+  return {
+    name: 'odiadev-precache-manifest',
+    apply: 'build',
+    configResolved(config) {
+      outDir = path.resolve(config.root, config.build.outDir)
+    },
+    closeBundle() {
+      const swPath = path.join(outDir, 'sw.js')
+      if (!fs.existsSync(swPath)) return
+
+      const files = (fs.readdirSync(outDir, { recursive: true }) as string[])
+        .map(file => file.split(path.sep).join('/'))
+        .filter(file => PRECACHE_EXTENSIONS.test(file) && file !== 'sw.js' && !file.startsWith('.vite/'))
+        .sort()
+      const hash = createHash('sha256')
+      for (const file of files) {
+        hash.update(file).update(fs.readFileSync(path.join(outDir, file)))
+      }
+      const manifest = {
+        version: hash.digest('hex').slice(0, 12),
+        urls: files.map(file => (file === 'index.html' ? '/' : `/${file}`)),
+      }
+
+      const sw = fs.readFileSync(swPath, 'utf8')
+      fs.writeFileSync(swPath, sw.replace('self.__PRECACHE_MANIFEST', JSON.stringify(manifest)))
+    }
+  }
+}
+
+// The embeddable chat widget's own modules. The chat-widget chunk also takes
+// every module, ours or a dependency's, that nothing outside the widget
+// imports, so the widget budget in testsprite_tests/harness/bundle.py covers
+// everything the widget ships.
+const WIDGET_MODULES = /\/src\/(components\/chat|store\/chatStore|lib\/audio)/
+
+let appReachable: { graph: Rollup.GetModuleInfo; ids: Set<string> } | undefined
+
+// Modules reachable from an entry without passing through the widget
+function reachableFromApp({ getModuleIds, getModuleInfo }: Rollup.ManualChunkMeta): Set<string> {
+  if (appReachable?.graph === getModuleInfo) return appReachable.ids
+  const ids = new Set<string>()
+  const stack = [...getModuleIds()].filter(id => getModuleInfo(id)?.isEntry && !WIDGET_MODULES.test(id))
+  while (stack.length) {
+    const id = stack.pop()!
+    if (ids.has(id) || WIDGET_MODULES.test(id)) continue
+    ids.add(id)
+    const info = getModuleInfo(id)
+    if (info) stack.push(...info.importedIds, ...info.dynamicallyImportedIds)
+  }
+  appReachable = { graph: getModuleInfo, ids }
+  return ids
+}
+
 // https://vitejs.dev/config/
 export default defineConfig({
-  plugins: [react()],
+  plugins: [react(), precacheManifest()],
   server: {
     port: 5173,
     host: true
   },
   build: {
     outDir: 'dist',
-    sourcemap: true
+    sourcemap: true,
+    // dist/.vite/manifest.json lets testsprite_tests/harness/bundle.py map chunks to entries
+    manifest: true,
+    rollupOptions: {
+      output: {
+        // Keep the embeddable chat widget and the dashboard in their own chunks
+        // so their size can be budgeted separately from the marketing pages.
+        manualChunks(id, meta) {
+          if (id.includes('/src/pages/dashboard/')) return 'dashboard'
+          if (WIDGET_MODULES.test(id) || !reachableFromApp(meta).has(id)) return 'chat-widget'
+        }
+      }
+    }
   }
 })